@@ -13,8 +13,45 @@
 # limitations under the License.
 """
 This is the top level module from which all PennyLane-AQT device classes can be directly imported.
+
+The device classes and the :mod:`~.ops` module are imported lazily on first access, so that
+importing the package (e.g., during PennyLane's plugin discovery) does not load PennyLane,
+NumPy or the HTTP client.
 """
 
-from .simulator import AQTSimulatorDevice, AQTNoisySimulatorDevice
+import importlib
+from typing import TYPE_CHECKING
+
 from ._version import __version__
-from . import ops
+
+if TYPE_CHECKING:  # pragma: no cover
+    # the lazily imported attributes, declared for static analysis only
+    from . import ops
+    from .simulator import AQTNoisySimulatorDevice, AQTSimulatorDevice
+
+_LAZY_ATTRIBUTES = {
+    "AQTSimulatorDevice": ".simulator",
+    "AQTNoisySimulatorDevice": ".simulator",
+    "ops": None,
+}
+
+__all__ = ["AQTSimulatorDevice", "AQTNoisySimulatorDevice", "ops", "__version__"]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name = _LAZY_ATTRIBUTES[name]
+    if module_name is None:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+
+    # cache the attribute, so that later accesses bypass this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -21,10 +21,13 @@ API Client
 
 Tools to interface with online APIs.
 
+The ``requests`` package is only imported once the first request is made.
+
 Classes
 -------
 
 .. autosummary::
+   encode_request
    submit
    verify_valid_status
 
@@ -32,8 +35,8 @@ Code details
 ~~~~~~~~~~~~
 """
 
-import urllib
-import requests
+import gzip
+from urllib.parse import urlencode
 
 SUPPORTED_HTTP_REQUESTS = ["PUT", "POST"]
 VALID_STATUS_CODES = [200, 201, 202]
@@ -54,11 +57,27 @@ def verify_valid_status(response):
     Raises:
         requests.HTTPError: if the status is not valid
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     if response.status_code not in VALID_STATUS_CODES:
         raise requests.HTTPError(response, response.text)
 
 
-def submit(request_type, url, request, headers):
+def encode_request(request, compress=False):
+    """Form-encode the payload of a request.
+
+    Args:
+        request (dict): the payload
+        compress (bool): whether to compress the encoded payload with gzip
+
+    Returns:
+        bytes: the body of the request
+    """
+    body = urlencode(request).encode()
+    return gzip.compress(body) if compress else body
+
+
+def submit(request_type, url, request, headers, compress=False):
     """Submit a request to AQT's API.
 
     Args:
@@ -66,12 +85,25 @@ def submit(request_type, url, request, headers):
         url (str): the API's online URL
         request (str): JSON-formatted payload
         headers (dict): HTTP request header
+        compress (bool): whether to send the form-encoded payload compressed with gzip,
+            with the ``Content-Encoding: gzip`` header
 
     Returns:
         requests.models.Response: the response from the API
     """
     if request_type not in SUPPORTED_HTTP_REQUESTS:
         raise ValueError("""Invalid HTTP request method provided. Options are "PUT" or "POST".""")
+
+    import requests  # pylint: disable=import-outside-toplevel
+
+    if compress:
+        request = encode_request(request, compress=True)
+        headers = {
+            **headers,
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Content-Encoding": "gzip",
+        }
+
     if request_type == "PUT":
         return requests.put(url, request, headers=headers, timeout=DEFAULT_TIMEOUT)
     if request_type == "POST":
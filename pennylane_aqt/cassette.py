@@ -0,0 +1,249 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Cassettes
+=========
+
+**Module name:** :mod:`pennylane_aqt.cassette`
+
+.. currentmodule:: pennylane_aqt.cassette
+
+Record the jobs of a live run, and replay them offline.
+
+A :class:`Cassette` in ``"record"`` mode passes the requests of a device through to the
+AQT API, and stores the final response of every job, keyed by a hash of the job
+submission. The access token is not part of the hash, and is not stored. In
+``"replay"`` mode, the recorded responses are returned in the order they were recorded
+without any network access or polling, such that the run is reproduced at full local
+speed and without credentials.
+
+.. code-block:: python
+
+    with Cassette("run.cassette", mode="record") as cassette:
+        dev = qml.device("aqt.sim", wires=2, cassette=cassette)
+        ...
+
+Cassettes are gzip-compressed JSON files. Recorded jobs are written in batches of
+``flush_every`` jobs, and when the cassette is closed, at the latest when the interpreter
+exits.
+
+Classes
+-------
+
+.. autosummary::
+   Cassette
+
+Functions
+---------
+
+.. autosummary::
+   request_key
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+VERSION = 1
+MODES = ("record", "replay", "auto")
+
+
+def request_key(url, request):
+    """Hash identifying a job submission, independently of the host and the access token.
+
+    Args:
+        url (str): the URL the job is submitted to
+        request (dict): the payload of the submission
+
+    Returns:
+        str: the hexadecimal SHA-256 digest of the path of the URL and the payload
+    """
+    payload = {k: str(v) for k, v in request.items() if k != "access_token"}
+    key = json.dumps([urlparse(url).path.strip("/"), payload], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class _RecordedResponse:
+    """A response replayed from a cassette, with the interface of ``requests.Response``."""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    @property
+    def text(self):
+        """str: the body of the response"""
+        return self.body if isinstance(self.body, str) else json.dumps(self.body)
+
+    def json(self):
+        """The body of the response, decoded from JSON."""
+        return self.body if not isinstance(self.body, str) else json.loads(self.body)
+
+
+class Cassette:
+    """Recording of the job submissions of AQT devices and of their final responses.
+
+    Args:
+        path (str): the path of the cassette file
+        mode (str): ``"record"`` to record jobs, overwriting the file, ``"replay"`` to
+            replay a recorded file, or ``"auto"`` to replay the file if it exists and to
+            record it otherwise
+        flush_every (int): the number of finished jobs recorded before the file is written
+
+    Raises:
+        ValueError: if the mode is unknown, or if ``flush_every`` is not positive
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, path, mode="auto", flush_every=10):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode}. Options are {MODES}.")
+        if flush_every < 1:
+            raise ValueError(
+                f"The cassette must be written every job or less often. Got {flush_every}."
+            )
+
+        self.path = os.fspath(path)
+        if mode == "auto":
+            mode = "replay" if os.path.exists(self.path) else "record"
+        self.mode = mode
+
+        self.interactions = defaultdict(list)
+        self._replayed = defaultdict(int)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.flush_every = flush_every
+        self._unsaved = 0
+
+        if mode == "replay":
+            with gzip.open(self.path, "rt") as f:
+                self.interactions.update(json.load(f)["interactions"])
+        else:
+            atexit.register(self.close)
+
+    @property
+    def replaying(self):
+        """bool: whether the cassette replays recorded jobs"""
+        return self.mode == "replay"
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.interactions.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save(self):
+        """Write the recorded jobs to the cassette file."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        """Write the recorded jobs, replacing the file only once it is complete. The lock
+        must be held, such that concurrent jobs are not lost."""
+        data = {"version": VERSION, "interactions": dict(self.interactions)}
+        partial = f"{self.path}.partial"
+        with gzip.open(partial, "wt") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(partial, self.path)
+        self._unsaved = 0
+
+    def close(self):
+        """Write the jobs recorded since the last write, if any."""
+        atexit.unregister(self.close)
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def wrap(self, submit):
+        """Wrap a function submitting requests to the AQT API with the cassette.
+
+        Args:
+            submit (callable): the function submitting the requests, with the signature of
+                :func:`~.api_client.submit`
+
+        Returns:
+            callable: the function recording or replaying the requests
+        """
+
+        def wrapped(request_type, url, request, headers, **kwargs):
+            if self.replaying:
+                return self._replay(url, request)
+            response = submit(request_type, url, request, headers, **kwargs)
+            self._record(url, request, response)
+            return response
+
+        return wrapped
+
+    def _replay(self, url, request):
+        """The recorded final response of a job submission."""
+        if "data" not in request:
+            raise ValueError(f"Unexpected query of job {request.get('id')} in replay mode.")
+
+        key = request_key(url, request)
+        with self._lock:
+            entries = self.interactions.get(key, [])
+            idx = self._replayed[key]
+            if idx >= len(entries):
+                raise ValueError(
+                    f"No recorded response left for the job submission {key[:12]} "
+                    f"in cassette {self.path}."
+                )
+            self._replayed[key] += 1
+
+        entry = entries[idx]
+        return _RecordedResponse(entry["status_code"], entry["body"])
+
+    def _record(self, url, request, response):
+        """Record the response to a job submission or a job query, once the job finished.
+
+        Rejected requests, and responses that do not identify a job, are final responses.
+        """
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        finished = (
+            not 200 <= response.status_code < 300
+            or not isinstance(body, dict)
+            or "id" not in body
+            or body.get("status") == "finished"
+        )
+        entry = {"status_code": response.status_code, "body": body}
+
+        with self._lock:
+            if "data" in request:
+                # keep the order of the submissions, even if the jobs finish out of order
+                self.interactions[request_key(url, request)].append(entry)
+                if not finished:
+                    self._pending[body["id"]] = entry
+            elif finished and request.get("id") in self._pending:
+                self._pending.pop(request["id"]).update(entry)
+            else:
+                return
+
+            if finished:
+                self._unsaved += 1
+                if self._unsaved >= self.flush_every:
+                    self._save()
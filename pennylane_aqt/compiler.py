@@ -0,0 +1,562 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Compiler
+========
+
+**Module name:** :mod:`pennylane_aqt.compiler`
+
+.. currentmodule:: pennylane_aqt.compiler
+
+Tools to translate PennyLane operations into circuits of AQT-native gates.
+
+AQT circuits are lists of native gates of the form ``["X", 0.3, [0]]``,
+``["R", 0.5, 0.25, [1]]`` or ``["MS", 0.5, [0, 1]]``, where all angles are
+given in units of :math:`\pi`.
+
+Functions
+---------
+
+.. autosummary::
+   translate
+   schedule
+   compact_wires
+   estimate_resources
+   gate_matrix
+   circuit_matrix
+
+Code details
+~~~~~~~~~~~~
+"""
+
+from collections import Counter, defaultdict, namedtuple
+
+import numpy as np
+from pennylane.exceptions import DeviceError
+
+NativeGate = namedtuple("NativeGate", ["name", "wires", "params", "scale"])
+NativeGate.__doc__ = """A single AQT-native gate in the decomposition of a PennyLane operation.
+
+Args:
+    name (str): the AQT name of the gate
+    wires (tuple[int]): indices into the wires of the decomposed operation
+    params (tuple[tuple]): one ``(index, coeff, offset)`` triple per gate parameter, such
+        that the parameter is ``coeff * operation.parameters[index] + offset``. If ``index``
+        is ``None``, the parameter is the constant ``offset``.
+    scale (float): the parameters are divided by ``scale`` to convert them into the
+        AQT convention
+"""
+
+
+def _rot(name, param, wire=0):
+    """Native single-qubit rotation by ``param``, given as an ``(index, coeff, offset)`` triple."""
+    return NativeGate(name, (wire,), (param,), np.pi)
+
+
+def _fixed(name, angle, wire=0):
+    """Native single-qubit rotation by the constant ``angle``."""
+    return _rot(name, (None, 0.0, angle), wire)
+
+
+def _ms(param):
+    """Native MS gate on both wires of a two-qubit operation."""
+    return NativeGate("MS", (0, 1), (param,), np.pi)
+
+
+def _zz(param):
+    """ZZ rotation, given by an MS gate conjugated by Y rotations on both wires."""
+    return (
+        _fixed("Y", np.pi / 2, 0),
+        _fixed("Y", np.pi / 2, 1),
+        _ms(param),
+        _fixed("Y", -np.pi / 2, 0),
+        _fixed("Y", -np.pi / 2, 1),
+    )
+
+
+def _yy(param):
+    """YY rotation, given by an MS gate conjugated by Z rotations on both wires."""
+    return (
+        _fixed("Z", -np.pi / 2, 0),
+        _fixed("Z", -np.pi / 2, 1),
+        _ms(param),
+        _fixed("Z", np.pi / 2, 0),
+        _fixed("Z", np.pi / 2, 1),
+    )
+
+
+_ANGLE = (0, 1.0, 0.0)
+_HALF_ANGLE = (0, 0.5, 0.0)
+_MINUS_HALF_ANGLE = (0, -0.5, 0.0)
+
+_BASE_DECOMPOSITIONS = {
+    "RX": (_rot("X", _ANGLE),),
+    "RY": (_rot("Y", _ANGLE),),
+    "RZ": (_rot("Z", _ANGLE),),
+    "PauliX": (_fixed("X", np.pi),),
+    "PauliY": (_fixed("Y", np.pi),),
+    "PauliZ": (_fixed("Z", np.pi),),
+    "Hadamard": (_fixed("X", np.pi), _fixed("Y", -np.pi / 2)),
+    "S": (_fixed("Z", np.pi / 2),),
+    "CNOT": (
+        _fixed("Y", np.pi / 2, 0),
+        NativeGate("MS", (0, 1), ((None, 0.0, np.pi / 2),), np.pi),
+        _fixed("X", -np.pi / 2, 0),
+        _fixed("X", -np.pi / 2, 1),
+        _fixed("Y", -np.pi / 2, 0),
+    ),
+    # the custom AQT gates are already parametrized in units of pi
+    "R": (NativeGate("R", (0,), ((0, 1.0, 0.0), (1, 1.0, 0.0)), 1.0),),
+    "MS": (NativeGate("MS", (0, 1), ((0, np.pi, 0.0),), np.pi),),
+    # single-qubit gates, which are equal to Z-Y-Z Euler rotations up to a global phase
+    "T": (_fixed("Z", np.pi / 4),),
+    "SX": (_fixed("X", np.pi / 2),),
+    "PhaseShift": (_rot("Z", _ANGLE),),
+    "U1": (_rot("Z", _ANGLE),),
+    "Rot": (_rot("Z", (0, 1.0, 0.0)), _rot("Y", (1, 1.0, 0.0)), _rot("Z", (2, 1.0, 0.0))),
+    "U2": (_rot("Z", (1, 1.0, 0.0)), _fixed("Y", np.pi / 2), _rot("Z", (0, 1.0, 0.0))),
+    "U3": (_rot("Z", (2, 1.0, 0.0)), _rot("Y", (0, 1.0, 0.0)), _rot("Z", (1, 1.0, 0.0))),
+    # two-qubit gates, using a single MS gate for each two-qubit Pauli rotation
+    "IsingXX": (_ms(_ANGLE),),
+    "IsingYY": _yy(_ANGLE),
+    "IsingZZ": _zz(_ANGLE),
+    "CZ": (*_zz((None, 0.0, -np.pi / 2)), _fixed("Z", np.pi / 2, 0), _fixed("Z", np.pi / 2, 1)),
+    "CY": (
+        _fixed("Y", np.pi / 2, 0),
+        _fixed("Z", -np.pi / 2, 1),
+        _ms((None, 0.0, np.pi / 2)),
+        _fixed("Y", -np.pi / 2, 0),
+        _fixed("Z", np.pi / 2, 1),
+        _fixed("Y", -np.pi / 2, 1),
+        _fixed("Z", -np.pi / 2, 0),
+    ),
+    "ControlledPhaseShift": (
+        *_zz(_MINUS_HALF_ANGLE),
+        _rot("Z", _HALF_ANGLE, 0),
+        _rot("Z", _HALF_ANGLE, 1),
+    ),
+    "CRX": (
+        _fixed("Y", np.pi / 2, 0),
+        _ms(_MINUS_HALF_ANGLE),
+        _fixed("Y", -np.pi / 2, 0),
+        _rot("X", _HALF_ANGLE, 1),
+    ),
+    "CRY": (
+        _fixed("Y", np.pi / 2, 0),
+        _fixed("Z", -np.pi / 2, 1),
+        _ms(_MINUS_HALF_ANGLE),
+        _fixed("Y", -np.pi / 2, 0),
+        _fixed("Z", np.pi / 2, 1),
+        _rot("Y", _HALF_ANGLE, 1),
+    ),
+    "CRZ": (*_zz(_MINUS_HALF_ANGLE), _rot("Z", _HALF_ANGLE, 1)),
+    "SWAP": (
+        _ms((None, 0.0, np.pi / 2)),
+        *_yy((None, 0.0, np.pi / 2)),
+        *_zz((None, 0.0, np.pi / 2)),
+    ),
+    "ISWAP": (_ms((None, 0.0, -np.pi / 2)), *_yy((None, 0.0, -np.pi / 2))),
+}
+
+# adjoints that are not obtained by reversing and negating the decomposition
+_ADJOINT_DECOMPOSITIONS = {
+    "Hadamard": (_fixed("Y", np.pi / 2), _fixed("X", np.pi)),
+    "CNOT": _BASE_DECOMPOSITIONS["CNOT"],
+    # R(t, p)^dagger = R(-t, p), as the rotation axis is unchanged
+    "R": (NativeGate("R", (0,), ((0, -1.0, 0.0), (1, 1.0, 0.0)), 1.0),),
+}
+
+
+def _basis_state(operation):
+    """Decomposition of a ``BasisState`` operation, which depends on the state itself."""
+    state = np.asarray(operation.parameters[0])
+    return tuple(_fixed("X", np.pi, i) for i, bit in enumerate(state) if bit == 1)
+
+
+def _adjoint(decomposition):
+    """Adjoint of a decomposition, given by the reversed sequence of negated native gates."""
+    return tuple(
+        gate._replace(params=tuple((idx, -coeff, -offset) for idx, coeff, offset in gate.params))
+        for gate in reversed(decomposition)
+    )
+
+
+def _build_decompositions():
+    """Build the full decomposition table, including the adjoint of every operation."""
+    table = dict(_BASE_DECOMPOSITIONS)
+    for name, decomposition in _BASE_DECOMPOSITIONS.items():
+        table[f"Adjoint({name})"] = _ADJOINT_DECOMPOSITIONS.get(name, _adjoint(decomposition))
+    table["BasisState"] = _basis_state
+    table["Adjoint(BasisState)"] = _basis_state
+    return table
+
+
+DECOMPOSITIONS = _build_decompositions()
+"""dict[str, tuple[NativeGate] or callable]: decompositions of the supported PennyLane
+operations into AQT-native gates. Decompositions that depend on more than the numeric
+parameters of an operation are given as a function of the operation."""
+
+BASIS_ROTATIONS = {"X": [["Y", -0.5]], "Y": [["X", 0.5]], "Z": []}
+"""dict[str, list[list]]: the single-qubit gates rotating the eigenbasis of each Pauli
+operator into the computational basis, without their wires."""
+
+
+def translate(operations, wire_map, decompositions=None, batch_size=None):
+    """Translate a sequence of PennyLane operations into a circuit of AQT-native gates.
+
+    The whole sequence is translated in a single pass over ``operations``. The
+    parameters of all native gates are converted to the AQT convention at once.
+
+    If ``batch_size`` is given, the operations may use parameter broadcasting. The gate
+    structure is then translated once and filled with each of the ``batch_size``
+    parameter sets, giving one circuit per parameter set.
+
+    Args:
+        operations (Iterable[~.Operation]): the operations to translate
+        wire_map (dict): map from the wire labels of the operations to device wire labels
+        decompositions (dict): the decomposition table to use; defaults to
+            :data:`DECOMPOSITIONS`
+        batch_size (int): the batch size of broadcasted operations, if any
+
+    Returns:
+        list[list]: the AQT circuit, e.g., ``[["X", 0.3, [0]], ["MS", 0.5, [0, 1]]]``, or a
+        list of ``batch_size`` such circuits if ``batch_size`` is given
+
+    Raises:
+        DeviceError: if an operation has no known decomposition
+    """
+    if decompositions is None:
+        decompositions = DECOMPOSITIONS
+
+    gates = []
+    coeffs = []
+    offsets = []
+    values = []
+    scales = []
+
+    for operation in operations:
+        decomposition = decompositions.get(operation.name)
+        if decomposition is None:
+            raise DeviceError(f"Operation {operation.name} is not supported on AQT devices.")
+        if callable(decomposition):
+            decomposition = decomposition(operation)
+
+        parameters = operation.data
+        wires = [wire_map[w] for w in operation.wires]
+
+        for gate in decomposition:
+            gates.append((gate.name, [wires[i] for i in gate.wires], len(gate.params)))
+            for idx, coeff, offset in gate.params:
+                coeffs.append(coeff)
+                offsets.append(offset)
+                values.append(0.0 if idx is None else parameters[idx])
+                scales.append(gate.scale)
+
+    # AQT convention: all gates differ from PennyLane by factor of pi
+    coeffs, offsets, scales = np.array(coeffs), np.array(offsets), np.array(scales)
+    if batch_size is None:
+        values = np.array(values, dtype=np.float64)
+        return _assemble(gates, ((coeffs * values + offsets) / scales).tolist())
+
+    # one row of parameter values per batch element
+    values = np.array([np.broadcast_to(v, (batch_size,)) for v in values], dtype=np.float64)
+    values = values.reshape(-1, batch_size).T
+    angles = (coeffs * values + offsets) / scales
+    return [_assemble(gates, row) for row in angles.tolist()]
+
+
+def _assemble(gates, angles):
+    """Assemble an AQT circuit from the gate structure and the flat list of gate parameters."""
+    circuit = []
+    start = 0
+    for name, wires, num_params in gates:
+        stop = start + num_params
+        circuit.append([name, *angles[start:stop], wires])
+        start = stop
+
+    return circuit
+
+
+def _is_identity(angle, tol):
+    """Whether a native gate with the given angle is proportional to the identity.
+
+    All native gates are of the form :math:`\\exp(-i t \\pi G / 2)` with :math:`G^2 = I`,
+    which is proportional to the identity for even :math:`t`.
+    """
+    return abs(angle - 2 * np.round(angle / 2)) < tol
+
+
+def _wrap(angle):
+    """Wrap an angle (in units of pi) into the interval (-1, 1], up to a global phase."""
+    return float(angle - 2 * np.ceil((angle - 1) / 2))
+
+
+class _GateDAG:
+    """Dependency graph of the gates of an AQT circuit, where each gate depends on the
+    previous gates on each of its wires."""
+
+    def __init__(self):
+        self.gates = []
+        self.preds = []
+        self.succs = []
+        self.last = {}
+
+    def add(self, gate):
+        """Add a gate after the current last gates on its wires."""
+        idx = len(self.gates)
+        self.gates.append(list(gate))
+        self.preds.append({w: self.last.get(w) for w in gate[-1]})
+        self.succs.append(dict.fromkeys(gate[-1]))
+        for w, pred in self.preds[idx].items():
+            if pred is not None:
+                self.succs[pred][w] = idx
+            self.last[w] = idx
+
+    def remove(self, idx):
+        """Remove a gate, connecting its predecessors and successors on each wire."""
+        for w in self.gates[idx][-1]:
+            pred, succ = self.preds[idx][w], self.succs[idx][w]
+            if pred is not None:
+                self.succs[pred][w] = succ
+            if succ is not None:
+                self.preds[succ][w] = pred
+            else:
+                self.last[w] = pred
+        self.gates[idx] = None
+
+    def last_non_commuting(self, wire):
+        """The last gate on ``wire``, skipping X rotations, which commute with MS gates."""
+        idx = self.last.get(wire)
+        while idx is not None and self.gates[idx][0] == "X":
+            idx = self.preds[idx][wire]
+        return idx
+
+
+def _merge_target(dag, gate, tol):
+    """The gate in ``dag`` that ``gate`` can be merged into, if any."""
+    name, wires = gate[0], gate[-1]
+
+    if name == "MS":
+        idx = dag.last_non_commuting(wires[0])
+        if idx is None or idx != dag.last_non_commuting(wires[1]):
+            return None
+        target = dag.gates[idx]
+        return idx if target[0] == "MS" and set(target[-1]) == set(wires) else None
+
+    idx = dag.last.get(wires[0])
+    if idx is None:
+        return None
+    target = dag.gates[idx]
+    if target[0] != name:
+        return None
+    # rotations about the same axis commute and can be merged
+    if name == "R" and not _is_identity(target[2] - gate[2], tol):
+        return None
+    return idx
+
+
+def schedule(circuit, tol=1e-10):
+    r"""Schedule an AQT circuit into layers of entangling gates and merge redundant gates.
+
+    The gates are arranged in a dependency graph, in which
+
+    * consecutive rotations about the same axis on the same wire are merged into a
+      single rotation,
+
+    * consecutive MS gates on the same pair of wires are merged into a single MS gate with
+      the summed angle. As X rotations commute with MS gates, they may be interleaved
+      with the merged MS gates, and
+
+    * gates proportional to the identity are removed.
+
+    The MS gates are then scheduled into as few layers of MS gates on disjoint wires as
+    possible, with all single-qubit gates between two such layers compacted into a single
+    block. The returned circuit is equal to ``circuit`` up to a global phase.
+
+    **Example**
+
+    >>> circuit = [["MS", 0.5, [0, 1]], ["X", 0.2, [1]], ["MS", 0.25, [1, 0]]]
+    >>> schedule(circuit)
+    [['MS', 0.75, [0, 1]], ['X', 0.2, [1]]]
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        tol (float): tolerance below which angles are considered to vanish
+
+    Returns:
+        list[list]: the scheduled AQT circuit
+    """
+    dag = _GateDAG()
+
+    for gate in circuit:
+        idx = _merge_target(dag, gate, tol)
+        if idx is None:
+            dag.add(gate)
+            continue
+
+        target = dag.gates[idx]
+        target[1] = _wrap(target[1] + gate[1])
+        if _is_identity(target[1], tol):
+            dag.remove(idx)
+
+    # the MS layer of each MS gate, and the block of single-qubit gates
+    # between two MS layers of each single-qubit gate
+    wire_layers = defaultdict(int)
+    keys = {}
+    for idx, gate in enumerate(dag.gates):
+        if gate is None:
+            continue
+        wires = gate[-1]
+        if len(wires) == 1:
+            keys[idx] = 2 * wire_layers[wires[0]]
+            continue
+        layer = max(wire_layers[w] for w in wires) + 1
+        for w in wires:
+            wire_layers[w] = layer
+        keys[idx] = 2 * layer - 1
+
+    return [dag.gates[idx] for idx in sorted(keys, key=lambda idx: (keys[idx], idx))]
+
+
+def compact_wires(circuit, min_wires=1):
+    """Relabel the wires of an AQT circuit with a dense range, dropping the idle wires.
+
+    **Example**
+
+    >>> compact_wires([["X", 0.5, [3]], ["MS", 0.5, [1, 3]]])
+    ([['X', 0.5, [1]], ['MS', 0.5, [0, 1]]], [1, 3])
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        min_wires (int): the minimum number of wires of the compacted circuit; idle wires
+            are kept until the circuit has this many wires
+
+    Returns:
+        tuple[list[list], list[int]]: the compacted circuit, and the original wire of each
+        wire of the compacted circuit
+    """
+    active = {w for gate in circuit for w in gate[-1]}
+    idle = (w for w in range(max(active, default=-1) + min_wires + 1) if w not in active)
+    while len(active) < min_wires:
+        active.add(next(idle))
+
+    wires = sorted(active)
+    dense = {w: i for i, w in enumerate(wires)}
+    compacted = [[*gate[:-1], [dense[w] for w in gate[-1]]] for gate in circuit]
+    return compacted, wires
+
+
+def estimate_resources(circuit, gate_durations):
+    """Estimate the resources needed to execute a single shot of an AQT circuit.
+
+    Gates acting on disjoint wires are assumed to be executed in parallel, such that the
+    duration of the circuit is given by its critical path.
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        gate_durations (dict[str, float]): the duration (in seconds) of each native gate
+
+    Returns:
+        dict: the number of gates of each type (``"gate_counts"``), the total number of gates
+        (``"num_gates"``), the number of layers of two-qubit gates (``"two_qubit_depth"``) and
+        the duration (in seconds) of the circuit (``"duration"``)
+    """
+    counts = Counter({name: 0 for name in ("X", "Y", "Z", "R", "MS")})
+    two_qubit_depth = defaultdict(int)
+    finish_time = defaultdict(float)
+
+    for gate in circuit:
+        name, wires = gate[0], gate[-1]
+        counts[name] += 1
+
+        start = max(finish_time[w] for w in wires)
+        for w in wires:
+            finish_time[w] = start + gate_durations[name]
+
+        if len(wires) > 1:
+            depth = max(two_qubit_depth[w] for w in wires) + 1
+            for w in wires:
+                two_qubit_depth[w] = depth
+
+    return {
+        "gate_counts": dict(counts),
+        "num_gates": len(circuit),
+        "two_qubit_depth": max(two_qubit_depth.values(), default=0),
+        "duration": max(finish_time.values(), default=0.0),
+    }
+
+
+def gate_matrix(gate):
+    """The matrix of an AQT-native gate.
+
+    Args:
+        gate (list): the native gate, e.g., ``["MS", 0.5, [0, 1]]``
+
+    Returns:
+        array[complex]: the matrix of the gate
+    """
+    name, theta = gate[0], gate[1] * np.pi / 2
+    c, s = np.cos(theta), np.sin(theta)
+
+    if name == "X":
+        return np.array([[c, -1j * s], [-1j * s, c]])
+    if name == "Y":
+        return np.array([[c, -s], [s, c]], dtype=complex)
+    if name == "Z":
+        return np.diag([np.exp(-1j * theta), np.exp(1j * theta)])
+    if name == "R":
+        phase = np.exp(1j * np.pi * gate[2])
+        return np.array([[c, -1j * s / phase], [-1j * s * phase, c]])
+    if name == "MS":
+        return np.array(
+            [[c, 0, 0, -1j * s], [0, c, -1j * s, 0], [0, -1j * s, c, 0], [-1j * s, 0, 0, c]]
+        )
+    raise ValueError(f"Unknown AQT gate {name}.")
+
+
+def apply_gate(state, gate, wire_order):
+    """Apply an AQT-native gate to a state tensor.
+
+    Args:
+        state (array[complex]): tensor whose leading axes correspond to the wires in
+            ``wire_order``; any further axes are left untouched
+        gate (list): the native gate
+        wire_order (list): the wire labels of the leading axes of ``state``
+
+    Returns:
+        array[complex]: the new state tensor
+    """
+    axes = [wire_order.index(w) for w in gate[-1]]
+    num_wires = len(axes)
+    matrix = gate_matrix(gate).reshape([2] * 2 * num_wires)
+    state = np.tensordot(matrix, state, axes=(list(range(num_wires, 2 * num_wires)), axes))
+    return np.moveaxis(state, list(range(num_wires)), axes)
+
+
+def circuit_matrix(circuit, wire_order):
+    """The unitary matrix of an AQT circuit.
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        wire_order (list): the wire labels, where the first wire corresponds to the most
+            significant bit of the matrix indices
+
+    Returns:
+        array[complex]: the unitary matrix of the circuit
+    """
+    dim = 2 ** len(wire_order)
+    unitary = np.eye(dim, dtype=complex).reshape([2] * len(wire_order) + [dim])
+    for gate in circuit:
+        unitary = apply_gate(unitary, gate, wire_order)
+    return unitary.reshape(dim, dim)
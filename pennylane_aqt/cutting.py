@@ -0,0 +1,345 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Circuit cutting
+===============
+
+**Module name:** :mod:`pennylane_aqt.cutting`
+
+.. currentmodule:: pennylane_aqt.cutting
+
+Cut AQT circuits into fragments acting on fewer qubits, and reconstruct the expectation
+values of Pauli Z words from the results of the fragments.
+
+A wire cut splits a wire into an upstream and a downstream segment, which are placed on
+different qubits. Since the identity channel on a qubit decomposes as
+
+.. math::
+
+    \rho = \frac{1}{2} \sum_{P \in \{I, X, Y, Z\}} \mathrm{Tr}(P \rho) P,
+
+the upstream segment is measured in the eigenbases of :math:`X`, :math:`Y` and
+:math:`Z`, and the downstream segment is prepared in the states :math:`|0\rangle`,
+:math:`|1\rangle`, :math:`|+\rangle` and :math:`|+i\rangle`, whose projectors span the
+Pauli operators. The segments connected by MS gates form the fragments, which are
+executed independently, in every combination of the bases and states of their cuts. The
+results of each fragment form a tensor with one axis of dimension four per cut, and the
+expectation value of the uncut circuit is the contraction of the tensors of all
+fragments over the axes of the cuts. The fragments only end with measurements, such that
+they do not need mid-circuit measurements.
+
+The number of fragment circuits grows as :math:`3^{k_\text{out}} 4^{k_\text{in}}` with
+the numbers of cuts leaving and entering each fragment, and the variance of the
+reconstructed values grows exponentially with the number of cuts, so circuits should be
+cut at a small number of wires.
+
+Classes
+-------
+
+.. autosummary::
+   Fragment
+
+Functions
+---------
+
+.. autosummary::
+   find_wire_cuts
+   fragment_circuit
+   fragment_tensor
+   contract
+   parity
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import itertools
+import string
+
+import numpy as np
+
+from .compiler import BASIS_ROTATIONS
+
+# the gates preparing |0>, |1>, |+> and |+i> from |0>
+PREPARATIONS = ([], [["X", 1.0]], [["Y", 0.5]], [["X", -0.5]])
+
+# the measurement bases of the outputs of the fragments, in the order of their axes
+MEASUREMENT_BASES = ("Z", "X", "Y")
+
+# the Pauli operators I, X, Y and Z in terms of the projectors onto the prepared states
+PAULI_FROM_STATES = np.array(
+    [[1, 1, 0, 0], [-1, -1, 2, 0], [-1, -1, 0, 2], [1, -1, 0, 0]], dtype=float
+)
+
+# the measurement basis of the Pauli operators I, X, Y and Z, as an index of MEASUREMENT_BASES
+PAULI_BASES = (0, 1, 2, 0)
+
+
+class Fragment:
+    """A fragment of a cut circuit.
+
+    Args:
+        circuit (list[list]): the gates of the fragment, acting on the qubits
+            ``0, ..., num_qubits - 1``
+        num_qubits (int): the number of qubits of the fragment
+        inputs (list[tuple[int, int]]): the index of each cut entering the fragment, and the
+            qubit prepared by it
+        outputs (list[tuple[int, int]]): the index of each cut leaving the fragment, and the
+            qubit measured by it
+        wires (dict[int, int]): the qubit of each wire of the uncut circuit that ends in the
+            fragment
+    """
+
+    def __init__(self, circuit, num_qubits, inputs, outputs, wires):
+        self.circuit = circuit
+        self.num_qubits = num_qubits
+        self.inputs = inputs
+        self.outputs = outputs
+        self.wires = wires
+
+    def variants(self):
+        """The circuits of the fragment, for every combination of the prepared states of
+        its inputs and of the measurement bases of its outputs.
+
+        Returns:
+            list[list[list]]: the circuits, with the states of the inputs varying slowest
+            and the bases of the outputs varying fastest
+        """
+        circuits = []
+        combinations = itertools.product(
+            *[range(len(PREPARATIONS))] * len(self.inputs),
+            *[range(len(MEASUREMENT_BASES))] * len(self.outputs),
+        )
+        for combination in combinations:
+            states, bases = combination[: len(self.inputs)], combination[len(self.inputs) :]
+            circuit = []
+            for (_, qubit), state in zip(self.inputs, states):
+                circuit += [[*gate, [qubit]] for gate in PREPARATIONS[state]]
+            circuit += self.circuit
+            for (_, qubit), basis in zip(self.outputs, bases):
+                rotations = BASIS_ROTATIONS[MEASUREMENT_BASES[basis]]
+                circuit += [[*gate, [qubit]] for gate in rotations]
+            circuits.append(circuit)
+        return circuits
+
+    def __repr__(self):
+        return (
+            f"<Fragment: num_qubits={self.num_qubits}, inputs={len(self.inputs)}, "
+            f"outputs={len(self.outputs)}>"
+        )
+
+
+def parity(values):
+    """Parity of the number of set bits of each integer in an array.
+
+    Args:
+        values (array[int]): non-negative integers of at most 64 bits
+
+    Returns:
+        array[int]: ``1`` for the integers with an odd number of set bits, and ``0`` otherwise
+    """
+    if hasattr(np, "bitwise_count"):
+        return (np.bitwise_count(values) & 1).astype(values.dtype)
+    for shift in (32, 16, 8, 4, 2, 1):  # pragma: no cover
+        values = values ^ (values >> shift)
+    return values & 1  # pragma: no cover
+
+
+def _segments(circuit, cuts):
+    """The segment of each gate on each of its wires, and the components of the segments
+    connected by two-qubit gates."""
+    positions = {}
+    for wire, position in cuts:
+        positions.setdefault(wire, []).append(position)
+
+    parent = {}
+
+    def find(node):
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    gate_segments = []
+    for idx, gate in enumerate(circuit):
+        segments = [(w, sum(p <= idx for p in positions.get(w, ()))) for w in gate[-1]]
+        for segment in segments:
+            find(segment)
+        for segment in segments[1:]:
+            parent[find(segment)] = find(segments[0])
+        gate_segments.append(segments)
+
+    # segments without gates, between two cuts on the same wire or after a cut at the end
+    for wire, wire_positions in positions.items():
+        for segment in range(len(wire_positions) + 1):
+            find((wire, segment))
+
+    components = {}
+    for segment in parent:
+        components.setdefault(find(segment), []).append(segment)
+    return gate_segments, list(components.values())
+
+
+def fragment_circuit(circuit, cuts):
+    """Cut a circuit into fragments at wire cuts.
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        cuts (Sequence[tuple[int, int]]): the wire and the position of each cut, which
+            separates the gates on the wire before the gate at this position from the
+            following gates
+
+    Returns:
+        list[Fragment]: the fragments of the circuit
+    """
+    cuts = list(cuts)
+    gate_segments, components = _segments(circuit, cuts)
+
+    # the index of each cut, by the wire and upstream segment it leaves
+    cut_indices = {}
+    for wire in {w for w, _ in cuts}:
+        wire_cuts = sorted((p, i) for i, (w, p) in enumerate(cuts) if w == wire)
+        for segment, (_, i) in enumerate(wire_cuts):
+            cut_indices[(wire, segment)] = i
+
+    fragments = []
+    for component in sorted(components, key=min):
+        qubits = {segment: q for q, segment in enumerate(sorted(component))}
+        fragment_gates = [
+            [*gate[:-1], [qubits[s] for s in segments]]
+            for gate, segments in zip(circuit, gate_segments)
+            if segments[0] in qubits
+        ]
+
+        inputs, outputs, wires = [], [], {}
+        for (wire, segment), qubit in qubits.items():
+            if segment > 0:
+                inputs.append((cut_indices[(wire, segment - 1)], qubit))
+            if (wire, segment) in cut_indices:
+                outputs.append((cut_indices[(wire, segment)], qubit))
+            else:
+                wires[wire] = qubit
+        fragments.append(
+            Fragment(fragment_gates, len(qubits), sorted(inputs), sorted(outputs), wires)
+        )
+    return fragments
+
+
+def find_wire_cuts(circuit, max_qubits, max_cuts=2):
+    """Find the wire cuts splitting a circuit into fragments of at most a given number of
+    qubits, with the fewest fragment circuits.
+
+    The cuts are searched exhaustively among the positions between consecutive two-qubit
+    gates on each wire, with as few cuts as possible.
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        max_qubits (int): the maximum number of qubits of a fragment
+        max_cuts (int): the maximum number of cuts
+
+    Returns:
+        list[tuple[int, int]]: the wire and the position of each cut
+
+    Raises:
+        ValueError: if the circuit cannot be cut into small enough fragments
+    """
+    two_qubit_gates = {}
+    for idx, gate in enumerate(circuit):
+        if len(gate[-1]) > 1:
+            for wire in gate[-1]:
+                two_qubit_gates.setdefault(wire, []).append(idx)
+    candidates = [(w, idx) for w, indices in two_qubit_gates.items() for idx in indices[1:]]
+
+    for num_cuts in range(max_cuts + 1):
+        best, best_cost = None, None
+        for cuts in itertools.combinations(candidates, num_cuts):
+            _, components = _segments(circuit, cuts)
+            if max(map(len, components), default=0) > max_qubits:
+                continue
+
+            cost = 0
+            for fragment in fragment_circuit(circuit, cuts):
+                cost += 4 ** len(fragment.inputs) * 3 ** len(fragment.outputs)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = list(cuts), cost
+        if best is not None:
+            return best
+
+    raise ValueError(
+        f"The circuit cannot be cut into fragments of at most {max_qubits} qubits with at "
+        f"most {max_cuts} wire cuts."
+    )
+
+
+def fragment_tensor(fragment, samples, masks):
+    """The tensor of the results of a fragment.
+
+    Args:
+        fragment (Fragment): the fragment
+        samples (Sequence[list[int]]): the samples of each circuit of
+            :meth:`Fragment.variants`, with qubit 0 in the least significant bit
+        masks (Sequence[int]): the bit masks of the wires of the Pauli Z words to estimate,
+            on the wires of the uncut circuit
+
+    Returns:
+        array[float]: the estimated expectation values of the Pauli Z words on the wires of
+        each mask that end in the fragment, times the Pauli operators of its outputs, for
+        the Pauli operators of its inputs, of shape ``(len(masks),) + (4,) * num_cuts``,
+        with the axes of the inputs before the axes of the outputs
+    """
+    num_inputs, num_outputs = len(fragment.inputs), len(fragment.outputs)
+    codes = np.asarray(samples, dtype=np.int64).reshape(
+        (len(PREPARATIONS),) * num_inputs + (len(MEASUREMENT_BASES),) * num_outputs + (-1,)
+    )
+
+    local_masks = np.zeros(len(masks), dtype=np.int64)
+    for wire, qubit in fragment.wires.items():
+        local_masks |= np.array([(mask >> wire & 1) << qubit for mask in masks], dtype=np.int64)
+
+    tensor = np.empty((len(masks),) + (len(PREPARATIONS),) * (num_inputs + num_outputs))
+    for paulis in itertools.product(range(4), repeat=num_outputs):
+        bases = tuple(PAULI_BASES[p] for p in paulis)
+        output_mask = sum(1 << q for (_, q), p in zip(fragment.outputs, paulis) if p != 0)
+        fragment_codes = codes[(Ellipsis, *bases, slice(None))]
+
+        bits = fragment_codes[..., None, :] & (local_masks[:, None] | output_mask)
+        means = (1 - 2 * parity(bits)).mean(axis=-1)
+        tensor[(Ellipsis, *paulis)] = np.moveaxis(means, -1, 0)
+
+    # express the prepared states of the inputs as Pauli operators
+    for axis in range(1, num_inputs + 1):
+        tensor = np.moveaxis(np.tensordot(PAULI_FROM_STATES, tensor, axes=(1, axis)), 0, axis)
+    return tensor
+
+
+def contract(fragments, tensors, num_cuts):
+    """Contract the tensors of the fragments of a cut circuit.
+
+    Args:
+        fragments (Sequence[Fragment]): the fragments
+        tensors (Sequence[array[float]]): the tensor of each fragment, as returned by
+            :func:`fragment_tensor`
+        num_cuts (int): the number of cuts
+
+    Returns:
+        array[float]: the reconstructed expectation value of each Pauli Z word
+    """
+    letters = string.ascii_letters[1:]
+    operands = []
+    for fragment, tensor in zip(fragments, tensors):
+        cuts = [i for i, _ in fragment.inputs] + [i for i, _ in fragment.outputs]
+        operands += [tensor, "a" + "".join(letters[i] for i in cuts)]
+
+    subscripts = ",".join(operands[1::2]) + "->a"
+    return np.einsum(subscripts, *operands[::2], optimize=True) / 2**num_cuts
@@ -21,15 +21,158 @@ This module contains an abstract base class for constructing AQT devices for Pen
 
 import os
 import json
-from time import sleep
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time
+from types import MappingProxyType
 
 import numpy as np
 from pennylane.exceptions import DeviceError
 from pennylane.devices import QubitDevice
-from pennylane.ops import Adjoint
+from pennylane.measurements import (
+    ClassicalShadowMP,
+    CountsMP,
+    ExpectationMP,
+    ProbabilityMP,
+    SampleMP,
+    ShadowExpvalMP,
+    VarianceMP,
+)
+from pennylane.wires import Wires
 
 from ._version import __version__
-from .api_client import verify_valid_status, submit
+from .api_client import encode_request, verify_valid_status, submit
+from .cassette import Cassette
+from .compiler import DECOMPOSITIONS, compact_wires, estimate_resources, schedule, translate
+from .cutting import contract, find_wire_cuts, fragment_circuit, fragment_tensor, parity
+from .mitigation import (
+    ReadoutCalibration,
+    expval_weights,
+    extrapolate,
+    fold_ms_gates,
+    tensored_inverse,
+)
+from .shadows import (
+    basis_circuit,
+    draw_recipes,
+    group_recipes,
+    median_of_means,
+    pauli_expvals,
+    pauli_words,
+)
+from .synthesis import fuse_single_qubit_gates, resynthesize_two_qubit_blocks
+from .telemetry import LATENCY_HISTORY, JobHandle
+
+
+def _freeze_operation_map(operation_map):
+    """Precompute the capability structures of a device from its operation map.
+
+    Args:
+        operation_map (dict[str, str or None]): map from the supported PennyLane operation
+            names to the AQT op names, or ``None`` if the operation is not native to AQT
+
+    Returns:
+        tuple[mappingproxy, frozenset[str], mappingproxy, mappingproxy]: the read-only
+        operation map, the set of supported operation names, the map from PennyLane
+        operation names to native AQT op names, and the decomposition table of the
+        supported operations
+    """
+    missing = [name for name in operation_map if name not in DECOMPOSITIONS]
+    if missing:
+        raise ValueError(f"No decomposition into AQT-native gates found for {missing}.")
+
+    native_names = {name: aqt_name for name, aqt_name in operation_map.items() if aqt_name}
+    decompositions = {name: DECOMPOSITIONS[name] for name in operation_map}
+    return (
+        MappingProxyType(dict(operation_map)),
+        frozenset(operation_map),
+        MappingProxyType(native_names),
+        MappingProxyType(decompositions),
+    )
+
+
+def _expand_samples(samples, wires):
+    """Expand the integer samples of a compacted circuit to the wires of the device.
+
+    Args:
+        samples (list[int]): the samples, with the state of wire ``i`` of the compacted
+            circuit in bit ``i``
+        wires (list[int]): the device wire of each wire of the compacted circuit
+
+    Returns:
+        list[int]: the samples on the device wires, with the idle wires in state zero
+    """
+    codes = np.asarray(samples, dtype=np.int64)
+    expanded = np.zeros_like(codes)
+    for i, wire in enumerate(wires):
+        expanded |= ((codes >> i) & 1) << wire
+    return expanded.tolist()
+
+
+def _shadow_measurement(measurements):
+    """The first classical shadow measurement of a sequence of measurements, if any."""
+    shadows = (ClassicalShadowMP, ShadowExpvalMP)
+    return next((m for m in measurements if isinstance(m, shadows)), None)
+
+
+class ExecutionContext:
+    """The state of the executions of an AQT device in one thread.
+
+    Each thread executing circuits on a device has its own context, such that a device can
+    serve concurrent executions, e.g., the QNodes evaluated by a thread pool. The device
+    exposes the attributes of the context of the current thread as its own attributes.
+
+    Args:
+        shots (int): the number of shots
+        shot_vector (list[~.ShotCopies]): the shot vector, if any
+        raw_shot_sequence (Sequence[int]): the shots as given for a shot vector, if any
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    def __init__(self, shots=None, shot_vector=None, raw_shot_sequence=None):
+        self._shots = shots
+        self._shot_vector = shot_vector
+        self._raw_shot_sequence = raw_shot_sequence
+
+        self.circuit = []
+        self.circuit_json = ""
+        self.samples = None
+        self._samples = None
+        self._qubit_maps = None
+        self.zne_samples = None
+        self._zne_factors = None
+        self.standard_errors = None
+        self._cut_means = None
+        self.shadow_bits = None
+        self.shadow_recipes = None
+        self._measurements = None
+        self._multiplexed = deque()
+        self._parity_cache = {}
+
+
+class _ContextAttribute:
+    """An attribute of a device stored in the execution context of the current thread."""
+
+    def __set_name__(self, owner, name):
+        self.name = name  # pylint: disable=attribute-defined-outside-init
+
+    def __get__(self, device, owner=None):
+        if device is None:
+            return self
+        return getattr(device.context, self.name)
+
+    def __set__(self, device, value):
+        setattr(device.context, self.name, value)
+
+
+def _count_last_axis(indices, dim):
+    """Relative counts of the integers in ``[0, dim)`` along the last axis of an array."""
+    leading = indices.shape[:-1]
+    rows = indices.reshape(-1, indices.shape[-1])
+    offsets = dim * np.arange(len(rows))[:, None]
+    counts = np.bincount((rows + offsets).ravel(), minlength=len(rows) * dim)
+    return counts.reshape(leading + (dim,)) / indices.shape[-1]
 
 
 class AQTDevice(QubitDevice):
@@ -37,8 +180,8 @@ class AQTDevice(QubitDevice):
 
     Args:
         wires (int or Iterable[Number, str]]): Number of subsystems represented by the device,
-            or iterable that contains unique labels for the subsystems as numbers (i.e., ``[-1, 0, 2]``)
-            or strings (``['ancilla', 'q1', 'q2']``).
+            or iterable that contains unique labels for the subsystems as numbers
+            (i.e., ``[-1, 0, 2]``) or strings (``['ancilla', 'q1', 'q2']``).
         shots (int): number of circuit evaluations/random samples used
             to estimate expectation values of observables
         api_key (str): The AQT API key. If not provided, the environment
@@ -46,9 +189,89 @@ class AQTDevice(QubitDevice):
         retry_delay (float): The time (in seconds) to wait between requests
             to the remote server when checking for completion of circuit
             execution.
+        gate_durations (dict[str, float]): The durations (in seconds) of the native
+            gates and of the state preparation and readout of a single shot
+            (``"measure"``) used by :meth:`estimate`. Overrides the entries of
+            :attr:`GATE_DURATIONS`.
+        optimize (bool): Whether to optimize the compiled circuits before submission, by
+            re-synthesizing two-qubit blocks with as few MS gates as possible, fusing
+            runs of single-qubit gates, merging redundant gates and scheduling the MS
+            gates into as few layers as possible. The optimized circuits are equal up to
+            a global phase.
+        cache_size (int): The maximum number of results kept in an in-memory LRU cache,
+            keyed by the compiled circuit and the number of shots. Executing a circuit
+            found in the cache returns its previous samples instead of submitting a new
+            job, so repeated executions are not statistically independent. Disabled
+            by default.
+        compress (bool): Whether to compress job submissions with gzip.
+        precision (int): If given, the gate parameters (in units of :math:`\pi`) are rounded
+            to this number of decimal places, and the circuits are serialized without
+            whitespace. The rounding error, :math:`\pi/2 \cdot 10^{-\text{precision}}`
+            radians, should stay below the angle resolution of the backend.
+        compact (bool): Whether to submit the circuits on the wires they act on only. The
+            active wires are relabelled with a dense range, the job is submitted with the
+            smallest number of qubits, and the idle wires are reported in state zero. As
+            this moves the circuits onto other physical qubits of noisy backends, and does
+            not sample the readout errors of idle wires, it defaults to ``COMPACT_WIRES``,
+            which is only enabled for the ideal simulator.
+        multiplex (bool): Whether to pack the circuits of a batch onto disjoint wires of
+            shared jobs. The circuits are executed in parallel, and the samples of each
+            circuit are split from the samples of its job.
+        multiplex_qubits (int): The maximum number of qubits of a multiplexed job. Defaults
+            to the number of device wires.
+        readout_mitigation (bool): Whether to mitigate readout errors in expectation values
+            and variances of Pauli words and in probabilities. The confusion matrix of each
+            qubit is calibrated with two jobs preparing all qubits in state zero and one,
+            and the calibration is reused until it expires.
+        readout_calibration_ttl (float): The time (in seconds) after which the readout
+            calibration is repeated. By default, the calibration does not expire.
+        zne_scales (Sequence[float]): If given, the expectation values and variances of
+            Pauli words are mitigated by zero-noise extrapolation. The compiled circuits
+            are executed with the noise of their MS gates amplified by each of these
+            factors, by folding the MS gates, and the results are extrapolated to zero
+            noise. Other measurements use the samples of the smallest factor.
+        zne_method (str): The extrapolation method of zero-noise extrapolation, either
+            ``"linear"``, ``"richardson"`` or ``"exponential"``.
+        cassette (~.Cassette or str): A cassette recording the jobs of the device, or
+            replaying recorded jobs without network access. A path opens a cassette in
+            ``"auto"`` mode, which replays the file if it exists and records it otherwise.
+            No API key is needed to replay a cassette.
+        target_error (float): If given, the shots are allocated adaptively: jobs of ``shots``
+            shots are submitted in rounds, and the running means and variances of the
+            expectation values of Pauli words are updated after each round, until their
+            standard errors reach this target or the shot ceiling is hit. The samples
+            then hold the shots of all rounds, and ``standard_errors`` the achieved
+            standard error of each measurement. Samples and counts are not supported,
+            since their number of shots would differ from the shots of the tape.
+        max_shots (int): The maximum number of shots per circuit of adaptive shot
+            allocation, which must be at least ``shots``. Defaults to
+            :attr:`MAX_ADAPTIVE_ROUNDS` rounds of ``shots`` shots.
+        cut_qubits (int): If given, compiled circuits acting on more wires are cut into
+            fragments of at most this many qubits, which are executed as concurrent jobs,
+            and the expectation values and variances of Pauli words are reconstructed from
+            the results of the fragments. Other measurements are not supported for cut
+            circuits.
+        max_cuts (int): The maximum number of wire cuts of a circuit.
+        shadow_bases (int): If given, the snapshots of classical shadows are spread evenly
+            over this many random measurement bases, instead of drawing the bases of each
+            snapshot. This bounds the number of jobs of wide circuits, whose snapshots
+            rarely share their bases. The expectation values of ``qml.shadow_expval`` are
+            then reweighted by the fraction of the snapshots measuring each Pauli word,
+            and each word must be measured by at least one of the bases. The bits and
+            bases returned by ``qml.classical_shadow`` are not uniformly random, and
+            :class:`~pennylane.ClassicalShadow` estimates from them are biased.
+
+    The state of each execution, such as ``circuit``, ``circuit_json``, ``samples`` and the
+    shots, is kept in the :class:`ExecutionContext` of the executing thread, so a single
+    device can execute circuits from several threads concurrently, sharing its
+    configuration, result cache and readout calibration. Changing the shots of the device,
+    as QNodes do for the shots of their tapes, affects the current thread, and the threads
+    that have not used the device yet, which start with the shots last set on the device.
+    The threads that already used the device keep their shots, and the shots a QNode sets
+    for its tapes are restored after their execution.
     """
 
-    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
     name = "Alpine Quantum Technologies PennyLane plugin"
     pennylane_requires = ">=0.44.0"
     version = __version__
@@ -56,6 +279,7 @@ class AQTDevice(QubitDevice):
     _capabilities = {
         "model": "qubit",
         "tensor_observables": True,
+        "supports_broadcasting": True,
     }
 
     short_name = "aqt.base_device"
@@ -72,6 +296,24 @@ class AQTDevice(QubitDevice):
         "Hadamard": None,
         "S": None,
         "CNOT": None,
+        "T": None,
+        "SX": None,
+        "PhaseShift": None,
+        "U1": None,
+        "Rot": None,
+        "U2": None,
+        "U3": None,
+        "CZ": None,
+        "CY": None,
+        "ControlledPhaseShift": None,
+        "CRX": None,
+        "CRY": None,
+        "CRZ": None,
+        "SWAP": None,
+        "ISWAP": None,
+        "IsingXX": None,
+        "IsingYY": None,
+        "IsingZZ": None,
         # additional operations not native to PennyLane but present in AQT
         "R": "R",
         "MS": "MS",
@@ -85,25 +327,223 @@ class AQTDevice(QubitDevice):
         "Adjoint(Hadamard)": None,
         "Adjoint(S)": None,
         "Adjoint(CNOT)": None,
+        "Adjoint(T)": None,
+        "Adjoint(SX)": None,
+        "Adjoint(PhaseShift)": None,
+        "Adjoint(U1)": None,
+        "Adjoint(Rot)": None,
+        "Adjoint(U2)": None,
+        "Adjoint(U3)": None,
+        "Adjoint(CZ)": None,
+        "Adjoint(CY)": None,
+        "Adjoint(ControlledPhaseShift)": None,
+        "Adjoint(CRX)": None,
+        "Adjoint(CRY)": None,
+        "Adjoint(CRZ)": None,
+        "Adjoint(SWAP)": None,
+        "Adjoint(ISWAP)": None,
+        "Adjoint(IsingXX)": None,
+        "Adjoint(IsingYY)": None,
+        "Adjoint(IsingZZ)": None,
         "Adjoint(R)": None,
         "Adjoint(MS)": None,
+        "Adjoint(BasisState)": None,
     }
+    # read-only capability structures, precomputed once per class from ``_operation_map``
+    _frozen = _freeze_operation_map(_operation_map)
+    _operation_map, _supported_operations, _native_names, _decompositions = _frozen
+    del _frozen
 
     BASE_HOSTNAME = "https://gateway.aqt.eu/marmot"
     TARGET_PATH = ""
     HTTP_METHOD = "PUT"
 
-    def __init__(self, wires, shots=None, api_key=None, retry_delay=1):
+    # the state of the executions, kept per thread
+    circuit = _ContextAttribute()
+    circuit_json = _ContextAttribute()
+    samples = _ContextAttribute()
+    zne_samples = _ContextAttribute()
+    standard_errors = _ContextAttribute()
+    shadow_bits = _ContextAttribute()
+    shadow_recipes = _ContextAttribute()
+    _samples = _ContextAttribute()
+    _qubit_maps = _ContextAttribute()
+    _zne_factors = _ContextAttribute()
+    _cut_means = _ContextAttribute()
+    _measurements = _ContextAttribute()
+    _multiplexed = _ContextAttribute()
+    _parity_cache = _ContextAttribute()
+    _shots = _ContextAttribute()
+    _shot_vector = _ContextAttribute()
+    _raw_shot_sequence = _ContextAttribute()
+
+    # maximum number of jobs of a broadcasted execution that are submitted concurrently
+    MAX_CONCURRENT_JOBS = 8
 
+    # whether circuits are submitted on their active wires only by default, which keeps the
+    # physical qubits of noisy backends unless the backend is ideal
+    COMPACT_WIRES = False
+
+    # maximum number of rounds of adaptive shot allocation if no shot ceiling is given
+    MAX_ADAPTIVE_ROUNDS = 100
+
+    # number of handles of recently submitted jobs kept in ``jobs``
+    MAX_JOB_HANDLES = 100
+
+    # default durations (in seconds) used to estimate execution times; Z rotations are virtual
+    GATE_DURATIONS = MappingProxyType(
+        {"X": 20e-6, "Y": 20e-6, "Z": 0.0, "R": 20e-6, "MS": 250e-6, "measure": 1.5e-3}
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_operation_map" in cls.__dict__:
+            (
+                cls._operation_map,
+                cls._supported_operations,
+                cls._native_names,
+                cls._decompositions,
+            ) = _freeze_operation_map(cls._operation_map)
+
+    def __init__(
+        self,
+        wires,
+        shots=None,
+        api_key=None,
+        retry_delay=1,
+        *,
+        gate_durations=None,
+        optimize=False,
+        cache_size=0,
+        compress=False,
+        precision=None,
+        compact=None,
+        multiplex=False,
+        multiplex_qubits=None,
+        readout_mitigation=False,
+        readout_calibration_ttl=None,
+        zne_scales=None,
+        zne_method="richardson",
+        cassette=None,
+        target_error=None,
+        max_shots=None,
+        cut_qubits=None,
+        max_cuts=2,
+        shadow_bases=None,
+    ):  # pylint: disable=too-many-arguments,too-many-statements
+
+        self._local = threading.local()
+        # the shots that threads start with, see the ``shots`` setter
+        self._default_shots = (None, None, None)
         super().__init__(wires=wires, shots=shots)
         self.shots = shots
         self._retry_delay = retry_delay
+        self.gate_durations = {**self.GATE_DURATIONS, **(gate_durations or {})}
+        self.optimize = optimize
+        self.compress = compress
+        self.compact = self.COMPACT_WIRES if compact is None else compact
+        self.multiplex = multiplex
+        self.multiplex_qubits = multiplex_qubits or self.num_wires
+
+        if precision is not None and precision < 0:
+            raise ValueError(f"The precision must be non-negative. Got {precision}.")
+        self.precision = precision
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self.readout_mitigation = readout_mitigation
+        self.readout_calibration_ttl = readout_calibration_ttl
+        self._readout_calibration = None
+        self._calibration_lock = threading.Lock()
+
+        if zne_scales is not None and (len(zne_scales) < 2 or min(zne_scales) < 1):
+            raise ValueError(
+                f"Zero-noise extrapolation needs at least two scale factors of at least 1. "
+                f"Got {zne_scales}."
+            )
+        if zne_method not in ("linear", "richardson", "exponential"):
+            raise ValueError(f"Unknown extrapolation method {zne_method}.")
+        self.zne_scales = zne_scales
+        self.zne_method = zne_method
+
+        if target_error is not None and target_error <= 0:
+            raise ValueError(f"The target standard error must be positive. Got {target_error}.")
+        if target_error is not None and zne_scales:
+            raise ValueError(
+                "Adaptive shot allocation cannot be combined with zero-noise extrapolation."
+            )
+        if max_shots is not None and (max_shots <= 0 or (self.shots and max_shots < self.shots)):
+            raise ValueError(
+                f"The maximum number of shots must be positive and at least the number of shots. "
+                f"Got {max_shots}."
+            )
+        self.target_error = target_error
+        self.max_shots = max_shots
+
+        if cut_qubits is not None and (zne_scales or target_error or readout_mitigation):
+            raise ValueError(
+                "Circuit cutting cannot be combined with error mitigation or adaptive shot "
+                "allocation."
+            )
+        self.cut_qubits = cut_qubits
+        self.max_cuts = max_cuts
+
+        if shadow_bases is not None and shadow_bases < 1:
+            raise ValueError(f"The number of shadow bases must be positive. Got {shadow_bases}.")
+        self.shadow_bases = shadow_bases
+
+        if cassette is not None and not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self.cassette = cassette
+
+        self.jobs = deque(maxlen=self.MAX_JOB_HANDLES)
+        self.latency_history = LATENCY_HISTORY
 
         self._api_key = api_key
         self.set_api_configs()
 
         self.reset()
 
+    @property
+    def context(self):
+        """The execution context of the current thread, which holds the state of its
+        executions.
+
+        Returns:
+            ExecutionContext: the context, created on first use in each thread
+        """
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = ExecutionContext(*self._default_shots)
+        return context
+
+    def _executor(self, num_jobs):
+        """A thread pool submitting up to :attr:`MAX_CONCURRENT_JOBS` of ``num_jobs`` jobs
+        concurrently, whose threads share the execution context of the current thread."""
+
+        def enter_context(context):
+            self._local.context = context
+
+        num_workers = max(min(num_jobs, self.MAX_CONCURRENT_JOBS), 1)
+        return ThreadPoolExecutor(num_workers, initializer=enter_context, initargs=(self.context,))
+
+    @QubitDevice.shots.setter
+    def shots(self, shots):
+        QubitDevice.shots.fset(self, shots)
+        # the shots set outside of an execution, i.e., without measurements being processed,
+        # are also the shots of the threads that did not use the device yet
+        if self._measurements is None:
+            self._default_shots = (self._shots, self._shot_vector, self._raw_shot_sequence)
+
+    @classmethod
+    def capabilities(cls):
+        # ``QubitDevice`` reports that broadcasting is not supported, whatever the subclass
+        return {**super().capabilities(), "supports_broadcasting": True}
+
     def batch_transform(self, circuit):
         """Transform the batch of circuits"""
         if not circuit.shots:
@@ -112,10 +552,57 @@ class AQTDevice(QubitDevice):
             )
         return super().batch_transform(circuit)
 
+    def batch_execute(self, circuits, **kwargs):
+        """Execute a batch of circuits.
+
+        If the device multiplexes circuits, the unbroadcasted circuits of the batch are first
+        packed onto disjoint wires of as few jobs as possible, and the jobs are submitted
+        concurrently. The circuits are then executed one by one as usual, with the samples
+        split from the samples of their jobs instead of being submitted again.
+        """
+        if not self.multiplex or self.zne_scales or self.target_error or len(circuits) < 2:
+            return super().batch_execute(circuits, **kwargs)
+
+        self._multiplexed = deque(self._run_multiplexed(circuits))
+        try:
+            return super().batch_execute(circuits, **kwargs)
+        finally:
+            self._multiplexed = deque()
+
+    def execute(self, circuit, **kwargs):
+        shadow = _shadow_measurement(circuit.measurements) is not None
+        special = self.target_error is not None or self.cut_qubits is not None or shadow
+        if special and circuit.shots.has_partitioned_shots:
+            if shadow:
+                raise DeviceError("Classical shadows do not support shot vectors.")
+            feature = "Circuit cutting" if self.target_error is None else "Adaptive shot allocation"
+            raise DeviceError(f"{feature} does not support shot vectors.")
+        if self.target_error is not None and any(
+            isinstance(m, (SampleMP, CountsMP)) for m in circuit.measurements
+        ):
+            # the samples of all rounds would not match the shots of the tape
+            raise DeviceError("Adaptive shot allocation does not support samples or counts.")
+
+        # the measurements of the tape, which classical shadows, adaptive shot allocation
+        # and circuit cutting need before the circuit is executed, and which decide whether
+        # the samples are unpacked into bits
+        self._measurements = circuit.measurements
+        try:
+            return super().execute(circuit, **kwargs)
+        finally:
+            self._measurements = None
+
     def reset(self):
         """Reset the device and reload configurations."""
         self.circuit = []
         self.circuit_json = ""
+        self._qubit_maps = None
+        self.zne_samples = None
+        self._zne_factors = None
+        self.standard_errors = None
+        self._cut_means = None
+        self.shadow_bits = None
+        self.shadow_recipes = None
         self.samples = None
 
     def set_api_configs(self):
@@ -124,7 +611,9 @@ class AQTDevice(QubitDevice):
         """
         self._api_key = self._api_key or os.getenv("AQT_TOKEN")
         if not self._api_key:
-            raise ValueError("No valid api key for AQT platform found.")
+            if not (self.cassette and self.cassette.replaying):
+                raise ValueError("No valid api key for AQT platform found.")
+            self._api_key = ""
         self.header = {"Ocp-Apim-Subscription-Key": self._api_key, "SDK": "pennylane"}
         self.data = {"access_token": self._api_key, "no_qubits": self.num_wires}
         self.hostname = "/".join([self.BASE_HOSTNAME, self.TARGET_PATH])
@@ -140,32 +629,54 @@ class AQTDevice(QubitDevice):
         return self._retry_delay
 
     @retry_delay.setter
-    def retry_delay(self, time):
+    def retry_delay(self, delay):
         """Changes the devices's ``retry_delay`` property.
 
         Args:
-            time (float): time (in seconds) to wait between calls to remote server
+            delay (float): time (in seconds) to wait between calls to remote server
 
         Raises:
             DeviceError: if the retry delay is not a positive number
         """
-        if time <= 0:
+        if delay <= 0:
             raise DeviceError(
-                "The specified retry delay needs to be positive. Got {}.".format(time)
+                "The specified retry delay needs to be positive. Got {}.".format(delay)
             )
 
-        self._retry_delay = float(time)
+        self._retry_delay = float(delay)
 
     @property
     def operations(self):
         """Get the supported set of operations.
 
         Returns:
-            set[str]: the set of PennyLane operation names the device supports
+            frozenset[str]: the set of PennyLane operation names the device supports
         """
-        return set(self._operation_map.keys())
+        return self._supported_operations
+
+    def apply(self, operations, **kwargs):  # pylint: disable=too-many-branches
+        """Compile the operations, submit them as a job and wait for the samples.
+
+        If the operations use parameter broadcasting, one circuit is compiled for each
+        parameter set and the circuits are submitted as concurrent jobs. ``circuit`` and
+        ``circuit_json`` then hold the list of circuits, and ``samples`` the list of
+        samples of each job.
+
+        If the device compacts the circuits, ``circuit_json`` holds the submitted circuits,
+        acting on a dense range of wires, while ``circuit`` acts on the device wires.
+
+        With zero-noise extrapolation, the folded circuits of all scale factors are
+        submitted concurrently, and ``zne_samples`` holds the samples of each scale factor.
 
-    def apply(self, operations, **kwargs):
+        With adaptive shot allocation, the circuits are submitted in rounds until the target
+        standard error is reached, as described in :meth:`_run_adaptive`.
+
+        Circuits acting on more than ``cut_qubits`` wires are cut into fragments, as
+        described in :meth:`_apply_cut`, and ``samples`` is ``None``.
+
+        Tapes measuring a classical shadow are executed in random bases, as described in
+        :meth:`_apply_shadow`, and ``samples`` is ``None``.
+        """
         rotations = kwargs.pop("rotations", [])
 
         for i, operation in enumerate(operations):
@@ -175,25 +686,416 @@ class AQTDevice(QubitDevice):
                         operation.name
                     )
                 )
-            self._apply_operation(operation)
 
-        # diagonalize observables
-        for operation in rotations:
-            self._apply_operation(operation)
+        prepared = self._multiplexed.popleft() if self._multiplexed else None
+        if prepared is not None:
+            self.circuit, self.circuit_json, self.samples, self._qubit_maps = prepared
+            return
+
+        batch_size = next((op.batch_size for op in operations if op.batch_size), None)
+
+        shadow = _shadow_measurement(self._measurements or [])
+        if shadow is not None:
+            if batch_size is not None:
+                raise DeviceError("Classical shadows do not support parameter broadcasting.")
+            self._apply_shadow(self.compile([*operations, *rotations]), shadow)
+            return
+
+        # compile the operations and the rotations diagonalizing the observables
+        if batch_size is None:
+            self.circuit += self.compile([*operations, *rotations])
+            circuits = [self.circuit]
+        else:
+            self.circuit = self.compile([*operations, *rotations], batch_size=batch_size)
+            circuits = self.circuit
+
+        if self.zne_scales:
+            self._apply_zne(circuits, batched=batch_size is not None)
+            return
+
+        if self.cut_qubits is not None and len(compact_wires(circuits[0])[1]) > self.cut_qubits:
+            self._apply_cut(circuits, batched=batch_size is not None)
+            return
+
+        if self.target_error is not None:
+            jobs = [self._prepare_job(circuit) for circuit in circuits]
+            samples, self.standard_errors = self._run_adaptive(jobs)
+            if batch_size is None:
+                (self.circuit_json, wires, _), (self.samples,) = jobs[0], samples
+                (self.standard_errors,) = self.standard_errors
+                self._qubit_maps = self._qubit_map(wires)
+            else:
+                self.circuit_json = [circuit_json for circuit_json, _, _ in jobs]
+                self.samples = samples
+                self._qubit_maps = np.stack([self._qubit_map(w) for _, w, _ in jobs])
+            return
+
+        if batch_size is None:
+            self.circuit_json, wires, num_gates = self._prepare_job(self.circuit)
+            self.samples = self._run_job(self.circuit_json, wires, num_gates)
+            self._qubit_maps = self._qubit_map(wires)
+            return
+
+        self.circuit_json, wires, num_gates = zip(*map(self._prepare_job, self.circuit))
+        self.circuit_json = list(self.circuit_json)
+        with self._executor(batch_size) as executor:
+            self.samples = list(executor.map(self._run_job, self.circuit_json, wires, num_gates))
+        self._qubit_maps = np.stack([self._qubit_map(w) for w in wires])
+
+    def _apply_zne(self, circuits, batched):
+        """Execute compiled circuits with their MS gates folded by each noise scale factor.
+
+        Args:
+            circuits (list[list[list]]): the compiled circuits
+            batched (bool): whether the circuits are the parameter sets of a broadcasted tape
+        """
+        folded = [fold_ms_gates(c, scale) for scale in self.zne_scales for c in circuits]
+        jobs = [self._prepare_job(circuit) for circuit in folded]
+        with self._executor(len(jobs)) as executor:
+            samples = list(executor.map(self._run_job, *zip(*jobs)))
+
+        # the factors the MS gates were actually multiplied by, for the first circuit
+        num_ms = [sum(gate[0] == "MS" for gate in circuit) for circuit in folded[:: len(circuits)]]
+        self._zne_factors = [n / num_ms[0] for n in num_ms] if num_ms[0] else self.zne_scales
+
+        num_circuits = len(circuits)
+        per_scale = [samples[i : i + num_circuits] for i in range(0, len(samples), num_circuits)]
+        json_per_scale = [
+            [circuit_json for circuit_json, _, _ in jobs[i : i + num_circuits]]
+            for i in range(0, len(jobs), num_circuits)
+        ]
+        wires = [w for _, w, _ in jobs[:num_circuits]]
 
+        first = int(np.argmin(self.zne_scales))
+        if batched:
+            self.zne_samples = per_scale
+            self.circuit_json = json_per_scale[first]
+            self._qubit_maps = np.stack([self._qubit_map(w) for w in wires])
+        else:
+            self.zne_samples = [s[0] for s in per_scale]
+            self.circuit_json = json_per_scale[first][0]
+            self._qubit_maps = self._qubit_map(wires[0])
+        self.samples = self.zne_samples[first]
+
+    def _run_adaptive(self, jobs):
+        """Execute serialized circuits in rounds until the expectation values of the Pauli
+        words of the current tape reach the target standard error.
+
+        Each round submits ``shots`` shots of every circuit as concurrent jobs, bypassing the
+        result cache, and updates the running sums of the eigenvalues of the Pauli words
+        and of their squares. The rounds stop once the standard errors of all expectation
+        values of all circuits are at most :attr:`target_error`, or once the shot ceiling
+        is hit. Tapes without expectation values of Pauli words are executed in one round.
+
+        Args:
+            jobs (list[tuple[str, list[int], int]]): the serialized circuits, their wires and
+                their numbers of gates
+
+        Returns:
+            tuple[list[list[int]], array[float]]: the samples of all rounds of each circuit,
+            and the standard error of each measurement of each circuit, which is ``nan``
+            for measurements that are not expectation values of Pauli words
+        """
+        words = [
+            self._pauli_word(m.obs) if isinstance(m, ExpectationMP) and m.obs is not None else None
+            for m in self._measurements or []
+        ]
+        measured = [i for i, word in enumerate(words) if word is not None]
+        masks = [words[i][0] for i in measured]
+        coeffs = np.abs([words[i][1] for i in measured])
+        max_shots = (
+            self.MAX_ADAPTIVE_ROUNDS * self.shots if self.max_shots is None else self.max_shots
+        )
+        inverses = [self._readout_inverses(qubit_maps=self._qubit_map(w)) for _, w, _ in jobs]
+        samples = [[] for _ in jobs]
+        sums = np.zeros((len(jobs), len(masks)))
+        sums_sq = np.zeros((len(jobs), len(masks)))
+        shots = 0
+        with self._executor(len(jobs)) as executor:
+            while True:
+                round_shots = min(self.shots, max_shots - shots)
+                repetitions = [round_shots] * len(jobs)
+                results = executor.map(self._submit_job, *zip(*jobs), repetitions)
+                for i, new_samples in enumerate(results):
+                    samples[i] += list(new_samples)
+                    if masks:
+                        codes = np.asarray(new_samples, dtype=np.int64)
+                        signs = self._parity_signs(codes, masks, inverses[i])
+                        sums[i] += signs.sum(axis=-1)
+                        sums_sq[i] += (signs**2).sum(axis=-1)
+                shots += round_shots
+
+                variances = (sums_sq - sums**2 / shots) / max(shots - 1, 1)
+                errors = coeffs * np.sqrt(np.maximum(variances, 0) / shots)
+                if shots >= max_shots or np.all(errors <= self.target_error):
+                    break
+
+        standard_errors = np.full((len(jobs), len(words)), np.nan)
+        standard_errors[:, measured] = errors
+        return samples, standard_errors
+
+    def _apply_cut(self, circuits, batched):
+        """Execute compiled circuits by cutting them into fragments of at most ``cut_qubits``
+        qubits.
+
+        The circuits are compacted onto their active wires and cut at the wire cuts with the
+        fewest fragment circuits. The fragment circuits of all circuits are submitted as
+        concurrent jobs, and the expectation values of the Pauli words of the current tape
+        are reconstructed by contracting the tensors of the fragments.
+
+        Args:
+            circuits (list[list[list]]): the compiled circuits
+            batched (bool): whether the circuits are the parameter sets of a broadcasted tape
+
+        Raises:
+            DeviceError: if the tape measures anything else than expectation values and
+            variances of Pauli words, or if the circuits cannot be cut into fragments of at
+            most ``cut_qubits`` qubits with at most ``max_cuts`` cuts
+        """
+        words = [
+            self._pauli_word(m.obs) if isinstance(m, (ExpectationMP, VarianceMP)) else None
+            for m in self._measurements or []
+        ]
+        if not words or None in words:
+            raise DeviceError(
+                "Circuit cutting only supports expectation values and variances of Pauli words."
+            )
+        masks = sorted({mask for mask, _ in words})
+
+        compacted = [compact_wires(circuit) for circuit in circuits]
+        # the circuits of a broadcasted tape share their gates, and thus their cuts
+        try:
+            cuts = find_wire_cuts(compacted[0][0], self.cut_qubits, self.max_cuts)
+        except ValueError as e:
+            raise DeviceError(str(e)) from e
+        fragments = [fragment_circuit(circuit, cuts) for circuit, _ in compacted]
+        variants = [[fragment.variants() for fragment in frags] for frags in fragments]
+
+        self.circuit_json = []
+        job_wires = []
+        num_gates = []
+        for frags, frag_variants in zip(fragments, variants):
+            for fragment, circuits_ in zip(frags, frag_variants):
+                self.circuit_json += [self.serialize(c, self.precision) for c in circuits_]
+                job_wires += [list(range(fragment.num_qubits))] * len(circuits_)
+                num_gates += [len(c) for c in circuits_]
+
+        with self._executor(len(job_wires)) as executor:
+            jobs = executor.map(self._run_job, self.circuit_json, job_wires, num_gates)
+            samples = iter(list(jobs))
+
+        means = []
+        for (_, wires), frags, frag_variants in zip(compacted, fragments, variants):
+            # the masks on the compacted wires, as idle wires are in state zero
+            compacted_masks = [
+                sum(1 << i for i, wire in enumerate(wires) if mask >> wire & 1) for mask in masks
+            ]
+            tensors = [
+                fragment_tensor(fragment, [next(samples) for _ in circuits_], compacted_masks)
+                for fragment, circuits_ in zip(frags, frag_variants)
+            ]
+            means.append(contract(frags, tensors, len(cuts)))
+
+        means = np.array(means)
+        self._cut_means = dict(zip(masks, means.T if batched else means[0]))
+
+    def _apply_shadow(self, circuit, measurement):
+        """Measure a classical shadow of a compiled circuit.
+
+        The random bases of the snapshots are drawn from the seed of the measurement, and
+        the snapshots measured in the same bases are submitted as the repetitions of a
+        single job, appending the basis rotations to the compiled circuit. The jobs of
+        all distinct bases are submitted concurrently, bypassing the result cache.
+        ``shadow_recipes`` and ``shadow_bits`` then hold the basis and the measured bit of
+        each snapshot and measured wire.
+
+        Args:
+            circuit (list[list]): the compiled circuit
+            measurement (~.ClassicalShadowMP or ~.ShadowExpvalMP): the shadow measurement
+        """
+        wires = self.map_wires(measurement.wires).tolist()
+        recipes = draw_recipes(self.shots, len(wires), measurement.seed, self.shadow_bases)
+        bases, counts, order = group_recipes(recipes)
+
+        jobs = [self._prepare_job(basis_circuit(circuit, basis, wires)) for basis in bases]
+        self.circuit = circuit
+        self.circuit_json = [circuit_json for circuit_json, _, _ in jobs]
+        with self._executor(len(jobs)) as executor:
+            samples = executor.map(self._submit_job, *zip(*jobs), counts.tolist())
+            codes = np.concatenate([np.asarray(s, dtype=np.int64) for s in samples])
+
+        bits = np.empty_like(recipes)
+        bits[order] = (codes[:, None] >> np.array(wires)) & 1
+        self.shadow_recipes, self.shadow_bits = recipes, bits
+
+    def _prepare_job(self, circuit):
+        """Serialize a circuit for submission, compacting its wires if enabled.
+
+        Returns:
+            tuple[str, list[int], int]: the serialized circuit, the device wire of each of
+            its wires, and its number of gates
+        """
+        if self.compact:
+            circuit, wires = compact_wires(circuit)
+        else:
+            wires = list(range(self.num_wires))
+        return self.serialize(circuit, self.precision), wires, len(circuit)
+
+    def _qubit_map(self, wires, offset=0):
+        """The qubit of a job measuring each device wire, or -1 for wires not submitted.
+
+        Args:
+            wires (list[int]): the device wire of each qubit of a circuit
+            offset (int): the qubit of the job the first qubit of the circuit is placed on
+        """
+        qubit_map = np.full(self.num_wires, -1)
+        qubit_map[wires] = offset + np.arange(len(wires))
+        return qubit_map
+
+    def _run_multiplexed(self, circuits):
+        """Execute the circuits of a batch packed onto disjoint wires of shared jobs.
+
+        The circuits are compacted onto their active wires, and assigned in order to the
+        first job with enough free qubits. Broadcasted tapes and tapes measuring classical
+        shadows are not multiplexed.
+
+        Returns:
+            list[tuple or None]: for each circuit, its compiled circuit, the serialized job
+            it was executed in, its samples and the qubit of the job measuring each of its
+            wires, or ``None`` if it cannot be multiplexed
+        """
+        compiled = [None] * len(circuits)
+        jobs = []  # the number of qubits and the indices of the circuits of each job
+        for i, tape in enumerate(circuits):
+            if tape.batch_size is not None or _shadow_measurement(tape.measurements):
+                continue
+            self.check_validity(tape.operations, tape.observables)
+            circuit = self.compile([*tape.operations, *self._get_diagonalizing_gates(tape)])
+            compacted, wires = compact_wires(circuit)
+            if len(wires) > self.multiplex_qubits:
+                continue
+
+            compiled[i] = (circuit, compacted, wires)
+            job = next((job for job in jobs if job[0] + len(wires) <= self.multiplex_qubits), None)
+            if job is None:
+                job = [0, []]
+                jobs.append(job)
+            job[0] += len(wires)
+            job[1].append(i)
+
+        job_circuits, job_gates = [], []
+        for num_qubits, indices in jobs:
+            offset, combined = 0, []
+            for i in indices:
+                _, compacted, wires = compiled[i]
+                combined += [[*gate[:-1], [w + offset for w in gate[-1]]] for gate in compacted]
+                offset += len(wires)
+            job_circuits.append(self.serialize(combined, self.precision))
+            job_gates.append(len(combined))
+
+        with self._executor(len(jobs)) as executor:
+            job_wires = [list(range(num_qubits)) for num_qubits, _ in jobs]
+            job_samples = list(executor.map(self._run_job, job_circuits, job_wires, job_gates))
+
+        results = [None] * len(circuits)
+        for (_, indices), circuit_json, samples in zip(jobs, job_circuits, job_samples):
+            codes = np.asarray(samples, dtype=np.int64)
+            offset = 0
+            for i in indices:
+                circuit, _, wires = compiled[i]
+                codes_i = (codes >> offset) & ((1 << len(wires)) - 1)
+                samples_i = _expand_samples(codes_i, wires)
+                results[i] = (circuit, circuit_json, samples_i, self._qubit_map(wires, offset))
+                offset += len(wires)
+        return results
+
+    def _run_job(self, circuit_json, wires, num_gates):
+        """Submit a serialized circuit as a job and poll until its samples are available.
+
+        If the result cache is enabled, the samples of a circuit executed before with the
+        same number of shots are returned without submitting a job.
+
+        Args:
+            circuit_json (str): the serialized AQT circuit
+            wires (list[int]): the device wire of each wire of the circuit
+            num_gates (int): the number of gates of the circuit
+
+        Returns:
+            list[int]: the sampled computational basis states of the device wires
+
+        Raises:
+            ValueError: if the job failed
+        """
+        if not self.cache_size:
+            return self._submit_job(circuit_json, wires, num_gates)
+
+        key = (circuit_json, tuple(wires), self.shots)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+
+        samples = self._submit_job(circuit_json, wires, num_gates)
+
+        with self._cache_lock:
+            self._cache[key] = samples
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return samples
+
+    def clear_cache(self):
+        """Remove all results from the result cache and reset its hit and miss counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def _submit_job(self, circuit_json, wires, num_gates, shots=None):
+        """Submit a serialized circuit of ``num_gates`` gates as a job, bypassing the result
+        cache.
+
+        The job runs ``shots`` shots, which defaults to the shots of the device. Its handle is
+        added to ``jobs``, and its queue and execution times to the latency history.
+        """
+        shots = self.shots if shots is None else shots
         # create circuit job for submission
-        self.circuit_json = self.serialize(self.circuit)
-        self.data["repetitions"] = self.shots
-        job_submission = {**self.data, "data": self.circuit_json}
-        response = submit(self.HTTP_METHOD, self.hostname, job_submission, self.header)
+        job_submission = {
+            **self.data,
+            "no_qubits": len(wires),
+            "repetitions": shots,
+            "data": circuit_json,
+        }
+        # replayed jobs finish immediately, and say nothing about the backend
+        tracked = shots is not None and not (self.cassette and self.cassette.replaying)
+        prediction = None
+        if tracked:
+            prediction = self.latency_history.predict(self.hostname, num_gates, shots)
+        submitted = time()
+
+        send = submit if self.cassette is None else self.cassette.wrap(submit)
+        response = send(
+            self.HTTP_METHOD, self.hostname, job_submission, self.header, compress=self.compress
+        )
 
         # poll for completed job
         verify_valid_status(response)
         job = response.json()
+        handle = JobHandle(job["id"], self.hostname, num_gates, shots, prediction, submitted)
+        handle.update(job["status"])
+        self.jobs.append(handle)
+
         job_query_data = {"id": job["id"], "access_token": self._api_key}
         while job["status"] != "finished":
-            job = submit(self.HTTP_METHOD, self.hostname, job_query_data, self.header).json()
-            sleep(self.retry_delay)
+            sleep(self._poll_delay(handle))
+            job = send(self.HTTP_METHOD, self.hostname, job_query_data, self.header).json()
+            handle.update(job["status"])
+
+        if tracked:
+            # the queries following a long sleep only bound the queue and execution times;
+            # the resolution allows for the latency of the queries
+            self.latency_history.record(handle, resolution=2 * self.retry_delay)
 
         error_msg = job.get("ERROR", None)
 
@@ -202,68 +1104,164 @@ class AQTDevice(QubitDevice):
                 f"Something went wrong with the request, got the error message: {error_msg}"
             )
 
-        self.samples = job["samples"]
+        if wires == list(range(self.num_wires)):
+            return job["samples"]
+        return _expand_samples(job["samples"], wires)
 
-    def _apply_operation(self, operation):
+    def _poll_delay(self, job):
+        """The time to wait before polling a job.
+
+        A queued job is polled from one retry delay before its predicted start, and a
+        running job from one retry delay before its predicted completion, every retry
+        delay. The start and the completion are thus observed within a retry delay, and
+        the job is recorded precisely in the latency history.
         """
-        Add the specified operation to ``self.circuit`` with the native AQT op name.
+        target = job.predicted_start if job.started is None else job.eta
+        if target is None:
+            return self.retry_delay
+        return max(target - time() - self.retry_delay, self.retry_delay)
+
+    @property
+    def readout_calibration(self):
+        """The readout calibration used for readout mitigation, which is taken if there is no
+        calibration yet or if it expired.
+
+        Returns:
+            ~.ReadoutCalibration: the confusion matrices of the qubits
+        """
+        # concurrent executions wait for a single calibration
+        with self._calibration_lock:
+            calibration = self._readout_calibration
+            if calibration is None or calibration.expired(self.readout_calibration_ttl):
+                calibration = self.calibrate_readout()
+        return calibration
+
+    def calibrate_readout(self):
+        """Calibrate the readout of the qubits.
+
+        Two jobs are submitted, preparing all qubits in state zero and in state one, and the
+        confusion matrix of each qubit is estimated from their samples. The jobs bypass the
+        result cache.
+
+        Returns:
+            ~.ReadoutCalibration: the confusion matrices of the qubits
+        """
+        num_qubits = max(self.num_wires, self.multiplex_qubits if self.multiplex else 0)
+        qubits = list(range(num_qubits))
+        all_ones = [["X", 1.0, [q]] for q in qubits]
+
+        samples_zero = self._submit_job(self.serialize([], self.precision), qubits, 0)
+        samples_one = self._submit_job(
+            self.serialize(all_ones, self.precision), qubits, len(all_ones)
+        )
+        self._readout_calibration = ReadoutCalibration.from_samples(
+            samples_zero, samples_one, num_qubits
+        )
+        return self._readout_calibration
+
+    def _readout_inverses(self, leading_shape=(), qubit_maps=None):
+        """The inverse confusion matrices of the readout of each device wire in the current
+        samples, or ``None`` if readout errors are not mitigated.
+
+        Wires that were not submitted are exactly in state zero, and are not corrected.
 
         Args:
-            operation[pennylane.operation.Operation]: the operation instance to be applied
+            leading_shape (tuple[int]): the shape of the samples, without the shot axis
+            qubit_maps (array[int]): the qubit measuring each device wire; defaults to the
+                qubits of the current samples
+
+        Returns:
+            array[float]: the inverse confusion matrices, of shape
+            ``leading_shape + (num_wires, 2, 2)``
         """
-        op_name = operation.name
-        if isinstance(operation, Adjoint):
-            op_name = operation.base.name
+        if not self.readout_mitigation:
+            return None
 
-        if len(operation.parameters) == 1:
-            par = operation.parameters[0]
-        elif len(operation.parameters) == 2:
-            par = operation.parameters
-        else:
-            par = None
+        if qubit_maps is None:
+            qubit_maps = self._qubit_maps
+        if qubit_maps is None:
+            qubit_maps = np.arange(self.num_wires)
+        qubit_maps = np.broadcast_to(qubit_maps, leading_shape + (self.num_wires,))
+        # the index -1 of the wires that were not submitted selects the identity
+        inverses = np.concatenate([self.readout_calibration.inverses, np.eye(2)[None]])
+        return inverses[qubit_maps]
 
-        # translate operation wire labels to the one's used by the device
-        device_wires = self.map_wires(operation.wires)
-        device_wire_labels = device_wires.tolist()
+    def compile(self, operations, batch_size=None):
+        """Compile a sequence of PennyLane operations into a circuit of AQT-native gates.
 
-        if op_name == "R":
-            if isinstance(operation, Adjoint):
-                par = [-p for p in par]
-            self.circuit.append([op_name, par[0], par[1], device_wire_labels])
-            return
-        if op_name == "BasisState":
-            for bit, label in zip(par, device_wire_labels):
-                if bit == 1:
-                    self._append_op_to_queue("RX", np.pi, device_wire_labels=[label])
-            return
-        if op_name == "Hadamard":
-            if isinstance(operation, Adjoint):
-                self._append_op_to_queue("RY", np.pi / 2, device_wire_labels)
-                self._append_op_to_queue("RX", np.pi, device_wire_labels)
-            else:
-                self._append_op_to_queue("RX", np.pi, device_wire_labels)
-                self._append_op_to_queue("RY", -np.pi / 2, device_wire_labels)
-            return
-        if op_name == "CNOT":
-            self._append_op_to_queue("RY", np.pi / 2, [device_wire_labels[0]])
-            self._append_op_to_queue("MS", np.pi / 2, device_wire_labels)
-            self._append_op_to_queue("RX", -np.pi / 2, [device_wire_labels[0]])
-            self._append_op_to_queue("RX", -np.pi / 2, [device_wire_labels[1]])
-            self._append_op_to_queue("RY", -np.pi / 2, [device_wire_labels[0]])
-            return
-        if op_name == "S":
-            op_name = "RZ"
-            par = 0.5 * np.pi
-        elif op_name in ("PauliX", "PauliY", "PauliZ"):
-            op_name = "R{}".format(op_name[-1])
-            par = np.pi
-        elif op_name == "MS":
-            par *= np.pi
+        Args:
+            operations (list[~.Operation]): the operations to compile
+            batch_size (int): the batch size of broadcasted operations, if any
+
+        Returns:
+            list[list]: the AQT circuit, or a list of ``batch_size`` AQT circuits if
+            ``batch_size`` is given
+        """
+        circuits = translate(operations, self.wire_map, self._decompositions, batch_size)
+        if batch_size is None:
+            return self._optimize(circuits)
+        return [self._optimize(circuit) for circuit in circuits]
+
+    def _optimize(self, circuit):
+        """Optimize a compiled circuit if the device is set to do so."""
+        if self.optimize:
+            circuit = resynthesize_two_qubit_blocks(circuit)
+            circuit = fuse_single_qubit_gates(circuit)
+            circuit = schedule(circuit)
+        return circuit
+
+    def estimate(self, tape):
+        """Estimate the cost of executing a tape on the device, without submitting it.
+
+        The tape is expanded, compiled and serialized exactly as for an execution.
+
+        **Example**
+
+        >>> dev = AQTSimulatorDevice(2, shots=100, api_key="...")
+        >>> tape = qml.tape.QuantumScript([qml.CNOT([0, 1])], [qml.expval(qml.Z(0))])
+        >>> dev.estimate(tape)["gate_counts"]
+        {'X': 2, 'Y': 2, 'Z': 0, 'R': 0, 'MS': 1}
 
-        if isinstance(operation, Adjoint):
-            par *= -1
+        Args:
+            tape (~.tape.QuantumScript): the tape to estimate
+
+        Returns:
+            dict: the number of native gates of each type (``"gate_counts"``), the total number
+            of native gates (``"num_gates"``), the number of layers of two-qubit gates
+            (``"two_qubit_depth"``), the duration (in seconds) of a single shot
+            (``"shot_duration"``), the number of shots (``"shots"``), the duration (in
+            seconds) of all shots (``"duration"``), and the size (in bytes) of the job
+            submission (``"payload_size"``), after compression if enabled. The total
+            duration is ``None`` if the number of shots is unknown.
+        """
+        tape = self.expand_fn(tape)
+        circuit = self.compile([*tape.operations, *self._get_diagonalizing_gates(tape)])
+        shots = tape.shots.total_shots or self.shots
+
+        resources = estimate_resources(circuit, self.gate_durations)
+        resources["shot_duration"] = resources["duration"] + self.gate_durations["measure"]
+        resources["shots"] = shots
+        resources["duration"] = shots * resources["shot_duration"] if shots else None
 
-        self._append_op_to_queue(op_name, par, device_wire_labels)
+        circuit_json, wires, _ = self._prepare_job(circuit)
+        job_submission = {
+            **self.data,
+            "no_qubits": len(wires),
+            "repetitions": shots,
+            "data": circuit_json,
+        }
+        resources["payload_size"] = len(encode_request(job_submission, self.compress))
+
+        return resources
+
+    def _apply_operation(self, operation):
+        """
+        Add the specified operation to ``self.circuit`` with the native AQT op name.
+
+        Args:
+            operation[pennylane.operation.Operation]: the operation instance to be applied
+        """
+        self.circuit += translate([operation], self.wire_map, self._decompositions)
 
     def _append_op_to_queue(self, op_name, par, device_wire_labels):
         """
@@ -272,26 +1270,252 @@ class AQTDevice(QubitDevice):
         Args:
             op_name[str]: the PennyLane name of the op
             par[float]: the numeric parameter value for the op
-            device_wire_labels[list[int]]: wire labels on the device which the op is to be applied on
+            device_wire_labels[list[int]]: wire labels on the device which the op is to be
+                applied on
         """
-        if not op_name in self.operations:
-            raise DeviceError("Operation {} is not supported on AQT devices.")
+        if op_name not in self._native_names:
+            raise DeviceError("Operation {} is not supported on AQT devices.".format(op_name))
         par = par / np.pi  # AQT convention: all gates differ from PennyLane by factor of pi
-        aqt_op_name = self._operation_map[op_name]
+        aqt_op_name = self._native_names[op_name]
         self.circuit.append([aqt_op_name, par, device_wire_labels])
 
     @staticmethod
-    def serialize(circuit):
+    def serialize(circuit, precision=None):
         """
         Serialize ``circuit`` to a valid AQT-formatted JSON string.
 
         Args:
              circuit[list[list]]: a list of lists of the form
                  [["X", 0.3, [0]], ["Z", 0.1, [2]], ...]
+             precision[int]: if given, the number of decimal places the gate parameters are
+                 rounded to, in which case the JSON string contains no whitespace
+        """
+        if precision is None:
+            return json.dumps(circuit)
+
+        # adding 0.0 turns negative zeros into zeros
+        circuit = [
+            [gate[0], *(round(float(p), precision) + 0.0 for p in gate[1:-1]), gate[-1]]
+            for gate in circuit
+        ]
+        return json.dumps(circuit, separators=(",", ":"))
+
+    def _sample_codes(self, shot_range=None, samples=None):
+        """The integer samples returned by AQT, with wire 0 in the least significant bit."""
+        codes = np.asarray(self.samples if samples is None else samples, dtype=np.int64)
+        return codes if shot_range is None else codes[..., slice(*shot_range)]
+
+    def _pauli_word(self, observable):
+        """The bit mask of the wires and the coefficient of a Pauli word observable.
+
+        Returns:
+            tuple[int, float] or None: the mask and the coefficient, or ``None`` if the
+            observable is not a real multiple of a Pauli word
+        """
+        pauli_rep = getattr(observable, "pauli_rep", None)
+        if pauli_rep is None or len(pauli_rep) != 1:
+            return None
+
+        ((word, coeff),) = pauli_rep.items()
+        if np.imag(coeff) != 0:
+            return None
+
+        mask = 0
+        for wire in word:
+            mask |= 1 << self.wire_map[wire]
+        return mask, float(np.real(coeff))
+
+    def _parity_means(self, masks, shot_range=None, bin_size=None):
+        """Estimate the expectation values of the Pauli Z words on the wires of each mask.
+
+        After the diagonalizing rotations, the eigenvalue of a Pauli word for a sample is
+        given by the parity of the sampled bits on its wires. With readout mitigation, each
+        sampled bit is instead weighted according to the inverse confusion matrix of its wire.
+
+        With zero-noise extrapolation, the expectation values are estimated at each noise
+        scale factor and extrapolated to zero noise. For cut circuits, the expectation values
+        reconstructed from the fragments are returned.
+
+        Returns:
+            array[float]: the expectation values, with the masks along the first axis
+        """
+        if self._cut_means is not None:
+            return np.array([self._cut_means[mask] for mask in masks])
+
+        if self.zne_samples is None:
+            return self._estimate_parities(self._sample_codes(shot_range), masks, bin_size)
+
+        codes = self._sample_codes(shot_range, self.zne_samples)
+        means = self._estimate_parities(codes, masks, bin_size)
+        return extrapolate(self._zne_factors, np.moveaxis(means, 1, 0), self.zne_method)
+
+    def _estimate_parities(self, codes, masks, bin_size=None):
+        """Estimate the expectation values of the Pauli Z words on the wires of each mask
+        from integer samples."""
+        signs = self._parity_signs(codes, masks, self._readout_inverses(codes.shape[:-1]))
+
+        if bin_size is None:
+            return np.moveaxis(signs.mean(axis=-1), -1, 0)
+        # bins follow ``QubitDevice.sample``, which reshapes the samples into (bin_size, -1)
+        binned = signs.reshape(signs.shape[:-1] + (bin_size, -1)).mean(axis=-2)
+        return np.moveaxis(binned, -2, 0)
+
+    def _parity_signs(self, codes, masks, inverses=None):
+        """The eigenvalue of the Pauli Z word on the wires of each mask for each sample, or
+        its readout-weighted estimate if inverse confusion matrices are given.
+
+        Returns:
+            array[float]: the eigenvalues, of shape ``codes.shape[:-1] + (len(masks), shots)``
+        """
+        if inverses is None:
+            return 1 - 2 * parity(codes[..., None, :] & np.asarray(masks)[:, None])
+        weights = expval_weights(inverses)
+        return np.stack([self._weighted_signs(codes, weights, mask) for mask in masks], -2)
+
+    def _weighted_signs(self, codes, weights, mask):
+        """The product of the weights of the sampled bits on the wires of a mask."""
+        signs = np.ones(codes.shape)
+        for wire in range(self.num_wires):
+            if mask >> wire & 1:
+                bits = (codes >> wire) & 1
+                signs *= np.take_along_axis(weights[..., wire, :], bits, axis=-1)
+        return signs
+
+    def statistics(self, circuit, shot_range=None, bin_size=None):
+        # estimate all Pauli word expectation values and variances in a single pass
+        words = {
+            self._pauli_word(m.obs)
+            for m in circuit.measurements
+            if isinstance(m, (ExpectationMP, VarianceMP)) and m.obs is not None
+        }
+        masks = sorted({word[0] for word in words if word is not None})
+        if masks:
+            means = self._parity_means(masks, shot_range, bin_size)
+            self._parity_cache = dict(zip(masks, means))
+
+        try:
+            return super().statistics(circuit, shot_range=shot_range, bin_size=bin_size)
+        finally:
+            self._parity_cache = {}
+
+    def _pauli_mean(self, mask, shot_range, bin_size):
+        """Estimated expectation value of the Pauli Z word on the wires of a mask."""
+        cache = self._parity_cache
+        if mask in cache:
+            return cache[mask]
+        return self._parity_means([mask], shot_range, bin_size)[0]
+
+    def expval(self, observable, shot_range=None, bin_size=None):
+        word = self._pauli_word(observable)
+        if word is None or (self.samples is None and self._cut_means is None):
+            return super().expval(observable, shot_range=shot_range, bin_size=bin_size)
+
+        mask, coeff = word
+        return np.squeeze(coeff * self._pauli_mean(mask, shot_range, bin_size))
+
+    def var(self, observable, shot_range=None, bin_size=None):
+        word = self._pauli_word(observable)
+        if word is None or (self.samples is None and self._cut_means is None):
+            return super().var(observable, shot_range=shot_range, bin_size=bin_size)
+
+        mask, coeff = word
+        mean = self._pauli_mean(mask, shot_range, bin_size)
+        return np.squeeze(coeff**2 * (1 - mean**2))
+
+    def classical_shadow(self, obs, circuit):
+        """The measured bits and the bases of the snapshots of a classical shadow.
+
+        The snapshots were measured in bulk by :meth:`_apply_shadow`, with one job per
+        distinct basis.
+
+        Args:
+            obs (~.ClassicalShadowMP): the classical shadow measurement
+            circuit (~.tape.QuantumScript): the executed tape
+
+        Returns:
+            array[int8]: the bits and the bases, of shape ``(2, shots, len(obs.wires))``
         """
-        return json.dumps(circuit)
+        return self._cast(self._stack([self.shadow_bits, self.shadow_recipes]), dtype=np.int8)
+
+    def shadow_expval(self, obs, circuit):
+        """Estimate expectation values from the snapshots of a classical shadow.
+
+        The Pauli words of all observables are estimated from all snapshots at once, and
+        their median of means is taken over ``obs.k`` parts of the snapshots. If the
+        snapshots are spread over ``shadow_bases`` bases, the snapshots measuring each word
+        are reweighted by the inverse of their fraction.
+
+        Args:
+            obs (~.ShadowExpvalMP): the classical shadow expectation value measurement
+            circuit (~.tape.QuantumScript): the executed tape
+
+        Returns:
+            float or array[float]: the expectation value of the observable, or of each
+            observable of a list
+        """
+        observables = obs.H if isinstance(obs.H, (list, tuple)) else [obs.H]
+        coeffs, words = zip(*(pauli_words(o, obs.wires) for o in observables))
+        estimates = pauli_expvals(
+            self.shadow_bits,
+            self.shadow_recipes,
+            np.concatenate(words),
+            reweight=self.shadow_bases is not None,
+        )
+        terms = np.concatenate(coeffs) * median_of_means(estimates, obs.k)
+
+        splits = np.cumsum([len(c) for c in coeffs])[:-1]
+        expvals = [part.sum() for part in np.split(terms, splits)]
+        return np.array(expvals) if isinstance(obs.H, (list, tuple)) else expvals[0]
+
+    def estimate_probability(self, wires=None, shot_range=None, bin_size=None):
+        if self.samples is None:
+            return super().estimate_probability(wires, shot_range=shot_range, bin_size=bin_size)
+
+        device_wires = self.map_wires(Wires(wires or self.wires))
+        codes = self._sample_codes(shot_range)
+
+        # basis state indices on the given wires, with the first wire in the most significant bit
+        indices = np.zeros_like(codes)
+        for wire in device_wires:
+            indices = (indices << 1) | ((codes >> wire) & 1)
+
+        dim = 2 ** len(device_wires)
+        inverses = self._readout_inverses(codes.shape[:-1])
+        if bin_size is None:
+            prob = _count_last_axis(indices, dim)
+            if inverses is not None:
+                prob = tensored_inverse(prob, inverses[..., list(device_wires), :, :])
+        else:
+            binned = indices.reshape(indices.shape[:-1] + (-1, bin_size))
+            prob = _count_last_axis(binned, dim)
+            if inverses is not None:
+                prob = tensored_inverse(prob, inverses[..., None, list(device_wires), :, :])
+            prob = np.swapaxes(prob, -1, -2)
+
+        return self._asarray(prob, dtype=self.R_DTYPE)
+
+    def _from_codes(self, measurement):
+        """Whether a measurement is estimated from the integer samples directly, without
+        unpacking them into bits."""
+        if isinstance(measurement, ProbabilityMP):
+            return measurement.mv is None
+        if isinstance(measurement, (ExpectationMP, VarianceMP)) and measurement.obs is not None:
+            return self._pauli_word(measurement.obs) is not None
+        return False
 
     def generate_samples(self):
+        """The bits of the samples of each wire, with the wires along the last axis.
+
+        If the executed tape only measures expectation values and variances of Pauli words and
+        probabilities, which are estimated from the integer samples by :meth:`statistics` and
+        :meth:`estimate_probability`, the samples are not unpacked and ``None`` is returned.
+        """
+        if self.samples is None:
+            # cut circuits have no samples of all wires
+            return None
+        if self._measurements is not None and all(map(self._from_codes, self._measurements)):
+            return None
         # AQT indexes in reverse scheme to PennyLane, so we have to specify "F" ordering
-        samples_array = np.stack(np.unravel_index(self.samples, [2] * self.num_wires, order="F")).T
-        return samples_array
+        samples = np.stack(np.unravel_index(self.samples, [2] * self.num_wires, order="F"))
+        # the wires are the last axis, after the broadcasting and shot axes
+        return np.moveaxis(samples, 0, -1)
@@ -0,0 +1,234 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Error mitigation
+================
+
+**Module name:** :mod:`pennylane_aqt.mitigation`
+
+.. currentmodule:: pennylane_aqt.mitigation
+
+Tools to mitigate readout errors and gate errors of AQT circuits.
+
+Readout errors are assumed to be independent between qubits. The readout errors of
+qubit :math:`q` are described by its confusion matrix :math:`A_q`, whose entry
+:math:`(i, j)` is the probability to measure :math:`i` if the qubit is prepared in state
+:math:`j`. The confusion matrix of all qubits is the tensor product
+:math:`A = \bigotimes_q A_q`, such that measured probabilities are corrected by applying
+:math:`A^{-1} = \bigotimes_q A_q^{-1}` one qubit at a time, without building the full
+matrix. The expectation value of a product of Pauli Z operators is corrected by
+weighting each shot with the product of the entries of :math:`(1, -1) A_q^{-1}` of the
+measured bits.
+
+Gate errors are mitigated by zero-noise extrapolation. The noise of the MS gates, which
+dominates the errors of the native circuits, is amplified by folding each MS gate into
+:math:`MS (MS^\dagger MS)^k`, and the expectation values at several noise scales are
+extrapolated to zero noise.
+
+Classes
+-------
+
+.. autosummary::
+   ReadoutCalibration
+
+Functions
+---------
+
+.. autosummary::
+   tensored_inverse
+   expval_weights
+   fold_ms_gates
+   extrapolate
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import time
+
+import numpy as np
+
+
+class ReadoutCalibration:
+    """Confusion matrices of the readout of each qubit.
+
+    Args:
+        matrices (array[float]): the confusion matrices, of shape ``(num_qubits, 2, 2)``
+        timestamp (float): the time the calibration was taken, as returned by
+            :func:`time.time`; defaults to now
+    """
+
+    def __init__(self, matrices, timestamp=None):
+        self.matrices = np.asarray(matrices, dtype=float)
+        self.inverses = np.linalg.inv(self.matrices)
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @classmethod
+    def from_samples(cls, samples_zero, samples_one, num_qubits):
+        """Estimate the confusion matrices from the samples of the calibration circuits.
+
+        Args:
+            samples_zero (list[int]): samples of all qubits prepared in state zero, with
+                qubit 0 in the least significant bit
+            samples_one (list[int]): samples of all qubits prepared in state one
+            num_qubits (int): the number of qubits
+
+        Returns:
+            ReadoutCalibration: the calibration
+        """
+        shifts = np.arange(num_qubits)
+        flip_zero = ((np.asarray(samples_zero)[:, None] >> shifts) & 1).mean(axis=0)
+        flip_one = 1 - ((np.asarray(samples_one)[:, None] >> shifts) & 1).mean(axis=0)
+
+        matrices = np.empty((num_qubits, 2, 2))
+        matrices[:, 0, 0] = 1 - flip_zero
+        matrices[:, 1, 0] = flip_zero
+        matrices[:, 0, 1] = flip_one
+        matrices[:, 1, 1] = 1 - flip_one
+        return cls(matrices)
+
+    @property
+    def num_qubits(self):
+        """int: the number of calibrated qubits"""
+        return len(self.matrices)
+
+    def age(self):
+        """float: the time (in seconds) since the calibration was taken"""
+        return time.time() - self.timestamp
+
+    def expired(self, ttl):
+        """Whether the calibration is older than a time to live.
+
+        Args:
+            ttl (float): the time to live (in seconds), or ``None`` for no expiry
+
+        Returns:
+            bool: whether the calibration expired
+        """
+        return ttl is not None and self.age() > ttl
+
+
+def tensored_inverse(probs, inverses):
+    """Apply the tensor product of the inverse confusion matrices of some qubits to
+    probability vectors.
+
+    Args:
+        probs (array[float]): probability vectors along the last axis, of length
+            ``2 ** k``, with the first qubit in the most significant bit
+        inverses (array[float]): the inverse confusion matrices of the ``k`` qubits, of
+            shape ``(..., k, 2, 2)``, where the leading dimensions match those of ``probs``
+
+    Returns:
+        array[float]: the corrected quasi-probability vectors, which sum to one but may
+        have negative entries
+    """
+    num_qubits = inverses.shape[-3]
+    leading = probs.shape[:-1]
+    tensor = np.reshape(probs, leading + (2,) * num_qubits)
+
+    for q in range(num_qubits):
+        # broadcast the inverses of qubit q over the axes of the other qubits
+        inverse = inverses[..., q, :, :]
+        inverse = inverse.reshape(inverse.shape[:-2] + (1,) * (num_qubits - 1) + (2, 2))
+        tensor = np.moveaxis(tensor, len(leading) + q, -1)
+        tensor = np.matmul(inverse, tensor[..., None])[..., 0]
+        tensor = np.moveaxis(tensor, -1, len(leading) + q)
+
+    return tensor.reshape(probs.shape)
+
+
+def expval_weights(inverses):
+    """The weights of the measured bits in the corrected expectation value of Pauli Z.
+
+    Args:
+        inverses (array[float]): inverse confusion matrices, of shape ``(..., 2, 2)``
+
+    Returns:
+        array[float]: the weights of the measured bits ``0`` and ``1``, of shape ``(..., 2)``
+    """
+    return np.array([1.0, -1.0]) @ inverses
+
+
+def fold_ms_gates(circuit, scale):
+    """Amplify the noise of the MS gates of an AQT circuit by unitary folding.
+
+    Each MS gate is replaced by :math:`MS (MS^\\dagger MS)^k`, which multiplies its number of
+    MS gates by :math:`2k + 1`. Scale factors that are not odd integers are approximated by
+    folding the first MS gates of the circuit once more than the others.
+
+    **Example**
+
+    >>> fold_ms_gates([["MS", 0.5, [0, 1]]], 3)
+    [['MS', 0.5, [0, 1]], ['MS', -0.5, [0, 1]], ['MS', 0.5, [0, 1]]]
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        scale (float): the factor by which to multiply the number of MS gates, at least 1
+
+    Returns:
+        list[list]: the folded circuit
+
+    Raises:
+        ValueError: if the scale factor is smaller than 1
+    """
+    if scale < 1:
+        raise ValueError(f"The noise scale factors must be at least 1. Got {scale}.")
+
+    num_ms = sum(gate[0] == "MS" for gate in circuit)
+    num_folds = int((scale - 1) * num_ms / 2 + 0.5)
+
+    folded = []
+    idx = 0
+    for gate in circuit:
+        folded.append(gate)
+        if gate[0] != "MS":
+            continue
+        folds = num_folds // num_ms + (idx < num_folds % num_ms)
+        folded += [["MS", -gate[1], gate[-1]], gate] * folds
+        idx += 1
+    return folded
+
+
+def extrapolate(scales, values, method="richardson"):
+    """Extrapolate values measured at several noise scales to zero noise.
+
+    Args:
+        scales (Sequence[float]): the noise scale factors
+        values (array[float]): the values at each scale factor, along the first axis
+        method (str): ``"linear"`` for a least-squares linear fit, ``"richardson"`` for the
+            polynomial through all values, or ``"exponential"`` for a least-squares fit of
+            :math:`a e^{b s}`, assuming that the values do not change sign
+
+    Returns:
+        array[float]: the extrapolated values, with the shape of the values at a single
+        scale factor
+
+    Raises:
+        ValueError: if the extrapolation method is unknown
+    """
+    values = np.asarray(values, dtype=float)
+    flat = values.reshape(len(scales), -1)
+
+    if method == "linear":
+        res = np.polyfit(scales, flat, 1)[-1]
+    elif method == "richardson":
+        res = np.polyfit(scales, flat, len(scales) - 1)[-1]
+    elif method == "exponential":
+        signs = np.where(flat[np.argmin(scales)] < 0, -1.0, 1.0)
+        log_values = np.log(np.maximum(np.abs(flat), np.finfo(float).tiny))
+        res = signs * np.exp(np.polyfit(scales, log_values, 1)[-1])
+    else:
+        raise ValueError(f"Unknown extrapolation method {method}.")
+
+    return res.reshape(values.shape[1:])
@@ -0,0 +1,365 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Mock AQT gateway
+================
+
+**Module name:** :mod:`pennylane_aqt.mock_server`
+
+.. currentmodule:: pennylane_aqt.mock_server
+
+A local stand-in for the AQT gateway, for offline integration tests and load tests.
+
+The server implements the job submission and polling requests of the AQT API, and executes
+the submitted circuits with a local NumPy state-vector simulator. It can be run in a
+background thread with :class:`MockAQTServer`, or as a subprocess with
+
+.. code-block:: console
+
+    python -m pennylane_aqt.mock_server --port 8080 --latency 0.5
+
+The devices are pointed at the server by overriding :attr:`~.AQTDevice.BASE_HOSTNAME` with
+its URL, e.g., ``"http://127.0.0.1:8080"``, while they are created, such as with
+``unittest.mock.patch.object`` or the ``monkeypatch`` fixture of pytest.
+
+Classes
+-------
+
+.. autosummary::
+   MockAQTServer
+
+Functions
+---------
+
+.. autosummary::
+   simulate
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from .compiler import apply_gate
+
+MAX_REPETITIONS = 200
+MAX_QUBITS = 11
+
+# pending connections accepted by the server, which must exceed the jobs submitted and
+# polled concurrently by the devices, e.g., ``AQTDevice.MAX_CONCURRENT_JOBS`` per thread
+REQUEST_QUEUE_SIZE = 128
+
+
+def simulate(circuit, num_wires, repetitions, rng=None):
+    """Sample an AQT circuit on a NumPy state-vector simulator.
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        num_wires (int): the number of qubits
+        repetitions (int): the number of samples
+        rng (numpy.random.Generator): the random number generator used for sampling
+
+    Returns:
+        list[int]: the sampled computational basis states, with the state of qubit 0 in
+        the least significant bit
+
+    Raises:
+        ValueError: if the circuit contains unknown gates
+    """
+    rng = rng or np.random.default_rng()
+    wire_order = list(range(num_wires))
+
+    state = np.zeros([2] * num_wires, dtype=complex)
+    state[(0,) * num_wires] = 1.0
+    for gate in circuit:
+        state = apply_gate(state, gate, wire_order)
+
+    # Fortran ordering puts qubit 0 into the least significant bit
+    probs = np.abs(state.ravel(order="F")) ** 2
+    return rng.choice(len(probs), size=repetitions, p=probs / probs.sum()).tolist()
+
+
+class _Job:
+    """A submitted job and its result."""
+
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes,too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def __init__(self, circuit, num_wires, repetitions, error, ready_at, seed):
+        self.id = str(uuid.uuid4())
+        self.circuit = circuit
+        self.num_wires = num_wires
+        self.repetitions = repetitions
+        self.error = error
+        self.ready_at = ready_at
+        self.seed = seed
+        self.samples = None
+        # serializes the simulation of the job, which runs outside of the server lock
+        self.lock = threading.Lock()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Handler of the requests to the mock gateway."""
+
+    server_version = "MockAQTGateway"
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Handle job submissions and queries."""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        request = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        status, body = self.server.mock.handle(self.path, request)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if status < 400 else "text/plain")
+        self.end_headers()
+        self.wfile.write((json.dumps(body) if status < 400 else body).encode())
+
+    do_POST = do_PUT
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence the logging of every request."""
+
+
+class _GatewayHTTPServer(ThreadingHTTPServer):
+    """HTTP server with a connection backlog large enough for concurrent job submissions."""
+
+    request_queue_size = REQUEST_QUEUE_SIZE
+    daemon_threads = True
+
+
+class MockAQTServer:
+    """Local stand-in for the AQT gateway.
+
+    Jobs are submitted with a request containing the serialized circuit in ``data``, and
+    are answered with a job ``id`` and the status ``"queued"``. Queries with the job ``id``
+    return the status ``"queued"`` until the queue latency has passed, and then the status
+    ``"finished"`` together with the ``samples``. If the latency is zero, jobs are finished
+    immediately on submission.
+
+    Args:
+        host (str): the address to bind to
+        port (int): the port to bind to; a free port is chosen if ``0``
+        latency (float): the time (in seconds) a job stays queued after its submission
+        max_repetitions (int): the maximum number of repetitions of a job
+        max_qubits (int): the maximum number of qubits of a job
+        seed (int): seed of the random number generator used for sampling
+
+    **Example**
+
+    >>> with MockAQTServer(latency=0.1) as server:
+    ...     with patch.object(AQTDevice, "BASE_HOSTNAME", server.url):
+    ...         dev = qml.device("aqt.sim", wires=2, api_key="any", retry_delay=0.05)
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        max_repetitions=MAX_REPETITIONS,
+        max_qubits=MAX_QUBITS,
+        seed=None,
+    ):
+        self.latency = latency
+        self.max_repetitions = max_repetitions
+        self.max_qubits = max_qubits
+
+        self.jobs = {}
+        self.num_requests = 0
+        self._errors = deque()
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+        self._server = _GatewayHTTPServer((host, port), _RequestHandler)
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """str: the base URL of the server, to be used as ``BASE_HOSTNAME`` of a device"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        """Serve requests in the current thread until :meth:`stop` is called."""
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def inject_error(self, message="Injected error", status_code=None, count=1):
+        """Make the next submitted jobs fail.
+
+        Args:
+            message (str): the error message
+            status_code (int): if given, the submission is rejected with this HTTP status
+                code; otherwise, the job is accepted and finishes with the ``ERROR`` message
+            count (int): the number of submissions to fail
+        """
+        with self._lock:
+            self._errors.extend([(message, status_code)] * count)
+
+    def handle(self, path, request):  # pylint: disable=unused-argument
+        """Handle a request to the gateway.
+
+        Args:
+            path (str): the path of the request
+            request (dict[str, str]): the form-encoded payload of the request
+
+        Returns:
+            tuple[int, dict or str]: the HTTP status code, and the JSON response or the error
+            message
+        """
+        with self._lock:
+            self.num_requests += 1
+
+        if not request.get("access_token"):
+            return 401, "No access token provided!"
+        if "data" in request:
+            return self._submit(request)
+        if "id" in request:
+            return self._query(request["id"])
+        return 400, "Invalid request!"
+
+    def _submit(self, request):
+        """Validate and queue a job submission."""
+        with self._lock:
+            message, status_code = self._errors.popleft() if self._errors else (None, None)
+        if status_code is not None:
+            return status_code, message
+
+        try:
+            repetitions = int(request.get("repetitions", ""))
+        except ValueError:
+            repetitions = 0
+        if not 0 < repetitions <= self.max_repetitions:
+            return 400, "Invalid number of repetitions provided!"
+
+        try:
+            num_wires = int(request.get("no_qubits", ""))
+        except ValueError:
+            num_wires = 0
+        if not 0 < num_wires <= self.max_qubits:
+            return 400, "Invalid number of qubits provided!"
+
+        try:
+            circuit = json.loads(request["data"])
+            for gate in circuit:
+                if not all(0 <= w < num_wires for w in gate[-1]):
+                    raise ValueError(f"Invalid wires {gate[-1]}.")
+        except (ValueError, TypeError, IndexError):
+            return 400, "Invalid circuit provided!"
+
+        with self._lock:
+            # each job samples from its own seed, such that jobs are simulated concurrently
+            seed = int(self._rng.integers(2**63))
+            job = _Job(
+                circuit, num_wires, repetitions, message, time.monotonic() + self.latency, seed
+            )
+            self.jobs[job.id] = job
+
+        if self.latency <= 0:
+            return self._query(job.id)
+        return 200, {"id": job.id, "status": "queued"}
+
+    def _query(self, job_id):
+        """Report the status of a job, running it once its queue latency has passed."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return 404, "Unknown job id!"
+        if time.monotonic() < job.ready_at:
+            return 200, {"id": job.id, "status": "queued"}
+
+        if job.error:
+            return 200, {"id": job.id, "status": "finished", "ERROR": job.error}
+
+        with job.lock:
+            if job.samples is None:
+                rng = np.random.default_rng(job.seed)
+                try:
+                    job.samples = simulate(job.circuit, job.num_wires, job.repetitions, rng)
+                except (ValueError, TypeError) as e:
+                    job.error = str(e)
+                    return 200, {"id": job.id, "status": "finished", "ERROR": job.error}
+
+        return 200, {
+            "id": job.id,
+            "status": "finished",
+            "no_qubits": job.num_wires,
+            "repetitions": job.repetitions,
+            "samples": job.samples,
+        }
+
+
+def main(args=None):
+    """Run the mock gateway until interrupted."""
+    parser = argparse.ArgumentParser(description="Mock AQT gateway for offline testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--max-repetitions", type=int, default=MAX_REPETITIONS)
+    parser.add_argument("--max-qubits", type=int, default=MAX_QUBITS)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(args)
+
+    server = MockAQTServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        max_repetitions=args.max_repetitions,
+        max_qubits=args.max_qubits,
+        seed=args.seed,
+    )
+    print(f"Serving the mock AQT gateway at {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
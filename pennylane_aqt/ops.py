@@ -16,6 +16,8 @@ This module contains custom AQT operations, designed to be used in PennyLane
 QNodes when using the PennyLane-AQT devices.
 """
 
+import numpy as np
+import pennylane as qml
 from pennylane.operation import Operation
 
 
@@ -28,21 +30,67 @@ class R(Operation):
                            -i e^{ip\pi}\sin(t\tfrac{\pi}{2}) & \cos(t\tfrac{\pi}{2})
                        \end{bmatrix}
 
+    It is a rotation by the angle :math:`t\pi` about an axis in the XY-plane with the azimuthal
+    angle :math:`p\pi`, :math:`R(t, p) = RZ(p\pi) RX(t\pi) RZ(-p\pi)`.
+
     For further details, see the `AQT API docs <https://www.aqt.eu/aqt-gate-definitions/>`_.
 
     **Details:**
 
     * Number of wires: 1
-    * Number of parameters: 1
+    * Number of parameters: 2
+    * Number of dimensions per parameter: (0, 0)
+    * Gradient recipe: parameter-shift rules with the frequencies :math:`\{\pi\}` for
+      :math:`t` and :math:`\{\pi, 2\pi\}` for :math:`p`
 
     Args:
+        t (float): the rotation angle, in units of :math:`\pi`
+        p (float): the azimuthal angle of the rotation axis, in units of :math:`\pi`
         wires (int): the subsystem the gate acts on
     """
 
     num_params = 2
     num_wires = 1
+    ndim_params = (0, 0)
     par_domain = "R"
     grad_method = "A"
+    parameter_frequencies = [(np.pi,), (np.pi, 2 * np.pi)]
+
+    @staticmethod
+    def compute_matrix(t, p):  # pylint: disable=arguments-differ
+        r"""Canonical matrix of the gate, supporting parameter broadcasting.
+
+        Args:
+            t (tensor_like or float): the rotation angle, in units of :math:`\pi`
+            p (tensor_like or float): the azimuthal angle, in units of :math:`\pi`
+
+        Returns:
+            tensor_like: canonical matrix
+        """
+        # R(t, p) = RZ(p pi - pi / 2) RY(t pi) RZ(pi / 2 - p pi)
+        return qml.Rot.compute_matrix(np.pi / 2 - np.pi * p, np.pi * t, np.pi * p - np.pi / 2)
+
+    @staticmethod
+    def compute_decomposition(t, p, wires):  # pylint: disable=arguments-differ
+        r"""Decomposition of the gate into Z and X rotations.
+
+        Args:
+            t (tensor_like or float): the rotation angle, in units of :math:`\pi`
+            p (tensor_like or float): the azimuthal angle, in units of :math:`\pi`
+            wires (Any, Wires): the subsystem the gate acts on
+
+        Returns:
+            list[Operator]: decomposition into lower level operations
+        """
+        return [
+            qml.RZ(-np.pi * p, wires=wires),
+            qml.RX(np.pi * t, wires=wires),
+            qml.RZ(np.pi * p, wires=wires),
+        ]
+
+    def adjoint(self):
+        t, p = self.parameters
+        return R(-t, p, wires=self.wires)
 
 
 class MS(Operation):
@@ -56,18 +104,60 @@ class MS(Operation):
                           -i\sin(t\tfrac{\pi}{2}) & 0 & 0 & \cos(t\tfrac{\pi}{2})
                       \end{bmatrix}
 
+    It is equal to the Ising XX coupling gate :math:`MS(t) = \exp(-i t\tfrac{\pi}{2} X \otimes X)`.
+
     For further details, see the `AQT API docs <https://www.aqt.eu/aqt-gate-definitions/>`_.
 
     **Details:**
 
     * Number of wires: 2
     * Number of parameters: 1
+    * Number of dimensions per parameter: (0,)
+    * Gradient recipe:
+      :math:`\frac{d}{dt}f(MS(t)) = \frac{\pi}{2}\left[f(MS(t + 1/2)) - f(MS(t - 1/2))\right]`
+      where :math:`f` is an expectation value depending on :math:`MS(t)`
 
     Args:
-        wires (int): the subsystem the gate acts on
+        t (float): the rotation angle, in units of :math:`\pi`
+        wires (Sequence[int]): the subsystems the gate acts on
     """
 
     num_params = 1
     num_wires = 2
+    ndim_params = (0,)
     par_domain = "R"
     grad_method = "A"
+    parameter_frequencies = [(np.pi,)]
+
+    def generator(self):
+        return qml.Hamiltonian(
+            [-np.pi / 2], [qml.PauliX(wires=self.wires[0]) @ qml.PauliX(wires=self.wires[1])]
+        )
+
+    @staticmethod
+    def compute_matrix(t):  # pylint: disable=arguments-differ
+        r"""Canonical matrix of the gate, supporting parameter broadcasting.
+
+        Args:
+            t (tensor_like or float): the rotation angle, in units of :math:`\pi`
+
+        Returns:
+            tensor_like: canonical matrix
+        """
+        return qml.IsingXX.compute_matrix(np.pi * t)
+
+    @staticmethod
+    def compute_decomposition(t, wires):  # pylint: disable=arguments-differ
+        r"""Decomposition of the gate into an Ising XX coupling gate.
+
+        Args:
+            t (tensor_like or float): the rotation angle, in units of :math:`\pi`
+            wires (Sequence[int]): the subsystems the gate acts on
+
+        Returns:
+            list[Operator]: decomposition into lower level operations
+        """
+        return [qml.IsingXX(np.pi * t, wires=wires)]
+
+    def adjoint(self):
+        return MS(-self.parameters[0], wires=self.wires)
@@ -0,0 +1,275 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Sample store
+============
+
+**Module name:** :mod:`pennylane_aqt.sample_store`
+
+.. currentmodule:: pennylane_aqt.sample_store
+
+A compact file format to archive the raw samples returned by AQT devices.
+
+Each shot is stored as a row of bits packed into ``ceil(num_wires / 8)`` bytes, with the
+state of wire 0 in the least significant bit of the first byte. A fixed-size header
+holds the number of wires and shots, a hash of the executed circuit and the name of the
+backend. Samples are appended to the file as they arrive, and are read back through a
+memory map in chunks, such that statistics of whole runs are computed without loading
+them into memory.
+
+.. code-block:: python
+
+    store = SampleStore.create("run.aqts", dev.num_wires, dev.circuit, dev.hostname)
+    store.append(dev.samples)
+
+    SampleStore("run.aqts").expval([0, 1])
+
+Classes
+-------
+
+.. autosummary::
+   SampleStore
+
+Functions
+---------
+
+.. autosummary::
+   circuit_hash
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+MAGIC = b"AQTSMPL1"
+HEADER_SIZE = 512
+DEFAULT_CHUNK_SIZE = 2**16
+
+
+def circuit_hash(circuit):
+    """SHA-256 hash identifying an AQT circuit.
+
+    Args:
+        circuit (list[list] or str): the AQT circuit, or its JSON serialization
+
+    Returns:
+        str: the hexadecimal digest of the serialized circuit
+    """
+    if not isinstance(circuit, str):
+        circuit = json.dumps(circuit)
+    return hashlib.sha256(circuit.encode()).hexdigest()
+
+
+class SampleStore:
+    """Archive of the samples of an AQT circuit, stored as bit-packed rows in a file.
+
+    Opening an existing store reads its header. New stores are created with
+    :meth:`create`.
+
+    Args:
+        path (str): the path of the file
+
+    Raises:
+        ValueError: if the file is not a sample store
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+
+        if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not an AQT sample store.")
+        self.header = json.loads(header[len(MAGIC) :].decode())
+
+    @classmethod
+    def create(cls, path, num_wires, circuit=None, backend=""):
+        """Create an empty sample store, overwriting any existing file.
+
+        Args:
+            path (str): the path of the file
+            num_wires (int): the number of wires of the samples
+            circuit (list[list] or str): the circuit producing the samples, whose hash is
+                stored in the header
+            backend (str): the name of the backend producing the samples
+
+        Returns:
+            SampleStore: the empty sample store
+        """
+        header = {
+            "version": 1,
+            "num_wires": int(num_wires),
+            "shots": 0,
+            "circuit_hash": circuit_hash(circuit) if circuit is not None else "",
+            "backend": backend,
+        }
+        with open(path, "wb") as f:
+            f.write(cls._encode_header(header))
+        return cls(path)
+
+    @staticmethod
+    def _encode_header(header):
+        """Encode a header into its fixed-size binary form."""
+        encoded = MAGIC + json.dumps(header).encode()
+        if len(encoded) >= HEADER_SIZE:
+            raise ValueError("The header of the sample store is too large.")
+        return encoded.ljust(HEADER_SIZE - 1) + b"\n"
+
+    @property
+    def num_wires(self):
+        """int: the number of wires of the samples"""
+        return self.header["num_wires"]
+
+    @property
+    def shots(self):
+        """int: the number of stored shots"""
+        return self.header["shots"]
+
+    @property
+    def circuit_hash(self):
+        """str: the hash of the circuit producing the samples"""
+        return self.header["circuit_hash"]
+
+    @property
+    def backend(self):
+        """str: the name of the backend producing the samples"""
+        return self.header["backend"]
+
+    @property
+    def row_size(self):
+        """int: the number of bytes of each stored shot"""
+        return (self.num_wires + 7) // 8
+
+    def append(self, samples):
+        """Append samples to the store.
+
+        The samples of a broadcasted execution are appended one parameter set at a time, as
+        a two-dimensional array is read as bits.
+
+        Args:
+            samples (array[int]): the samples, either as the integer outcomes returned by
+                AQT, with wire 0 in the least significant bit, or as an array of bits of
+                shape ``(shots, num_wires)``
+
+        Raises:
+            ValueError: if the samples do not match the number of wires of the store, if
+            integer outcomes do not fit into the wires, or if bits are not 0 or 1
+        """
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            if not samples.size:
+                samples = samples.astype(np.int64)
+            elif not np.issubdtype(samples.dtype, np.integer):
+                raise ValueError(f"Expected integer samples, got samples of type {samples.dtype}.")
+            if np.any((samples < 0) | (samples >> self.num_wires != 0)):
+                raise ValueError(
+                    f"Expected integer samples in [0, {2**self.num_wires}) for "
+                    f"{self.num_wires} wires, got samples outside this range."
+                )
+            samples = (samples[:, None] >> np.arange(self.num_wires)) & 1
+        if samples.ndim != 2 or samples.shape[1] != self.num_wires:
+            raise ValueError(
+                f"Expected samples on {self.num_wires} wires, got an array of shape "
+                f"{samples.shape}."
+            )
+        if np.any((samples != 0) & (samples != 1)):
+            raise ValueError(
+                "Expected bits of shape (shots, num_wires) with the values 0 and 1, got other "
+                "values. The integer samples of broadcasted executions must be appended one "
+                "parameter set at a time."
+            )
+
+        rows = np.packbits(samples.astype(np.uint8), axis=1, bitorder="little")
+        self.header["shots"] += len(rows)
+        with open(self.path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(rows.tobytes())
+            f.seek(0)
+            f.write(self._encode_header(self.header))
+
+    def _rows(self):
+        """Memory map of the stored rows of packed bits."""
+        if self.shots == 0:
+            return np.zeros((0, self.row_size), dtype=np.uint8)
+        return np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="r",
+            offset=HEADER_SIZE,
+            shape=(self.shots, self.row_size),
+        )
+
+    def iter_samples(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Iterate over the stored samples in chunks.
+
+        Args:
+            chunk_size (int): the maximum number of shots per chunk
+
+        Yields:
+            array[uint8]: the bits of the samples in a chunk, of shape ``(shots, num_wires)``
+        """
+        rows = self._rows()
+        for start in range(0, len(rows), chunk_size):
+            chunk = np.asarray(rows[start : start + chunk_size])
+            yield np.unpackbits(chunk, axis=1, count=self.num_wires, bitorder="little")
+
+    def samples(self):
+        """Load all stored samples.
+
+        Returns:
+            array[uint8]: the bits of all samples, of shape ``(shots, num_wires)``
+        """
+        return np.concatenate([np.zeros((0, self.num_wires), dtype=np.uint8), *self.iter_samples()])
+
+    def probs(self, wires=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Estimate the marginal probabilities of the computational basis states.
+
+        Args:
+            wires (Sequence[int]): the wires of the marginal distribution, with the first
+                wire in the most significant bit, following the PennyLane convention;
+                defaults to all wires
+            chunk_size (int): the maximum number of shots processed at once
+
+        Returns:
+            array[float]: the estimated probabilities
+        """
+        wires = list(range(self.num_wires)) if wires is None else list(wires)
+        powers = 2 ** np.arange(len(wires))[::-1]
+
+        counts = np.zeros(2 ** len(wires), dtype=np.int64)
+        for chunk in self.iter_samples(chunk_size):
+            counts += np.bincount(chunk[:, wires] @ powers, minlength=len(counts))
+        return counts / max(self.shots, 1)
+
+    def expval(self, wires, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Estimate the expectation value of the product of Pauli Z operators on some wires.
+
+        Args:
+            wires (Sequence[int]): the wires of the Pauli Z operators
+            chunk_size (int): the maximum number of shots processed at once
+
+        Returns:
+            float: the estimated expectation value
+        """
+        wires = list(wires)
+        total = 0
+        for chunk in self.iter_samples(chunk_size):
+            parity = np.bitwise_xor.reduce(chunk[:, wires], axis=1) if wires else 0
+            total += len(chunk) - 2 * int(np.sum(parity))
+        return total / max(self.shots, 1)
@@ -0,0 +1,211 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Classical shadows
+=================
+
+**Module name:** :mod:`pennylane_aqt.shadows`
+
+.. currentmodule:: pennylane_aqt.shadows
+
+Measure classical shadows with AQT circuits, and estimate the expectation values of Pauli
+words from them.
+
+A classical shadow consists of snapshots, each measuring every qubit in the eigenbasis of
+a random Pauli operator :math:`X`, :math:`Y` or :math:`Z`. The random bases of the
+snapshots (the *recipes*) are encoded as ``0``, ``1`` and ``2``, and the measured bits as
+``0`` for the eigenvalue :math:`1` and ``1`` for the eigenvalue :math:`-1`, following
+:func:`pennylane.classical_shadow`.
+
+Snapshots measured in the same bases run the same circuit, so they are submitted as the
+repetitions of a single job, which appends native ``R`` rotations to the compiled circuit.
+The number of jobs is the number of distinct bases, at most ``3 ** num_qubits``, and does
+not depend on the observables estimated from the shadow. The expectation value of a Pauli
+word :math:`P` is estimated from each snapshot by
+
+.. math::
+
+    \hat{o}_t = \prod_{i \in P} 3 \, \delta_{P_i, b_{t,i}} (1 - 2 s_{t,i}),
+
+with the bases :math:`b_t` and the bits :math:`s_t` of the snapshot, and the estimates of
+the snapshots are combined by their median of means.
+
+The factor :math:`3` per qubit is the inverse of the probability that a uniformly random
+basis measures the Pauli operator of the qubit. If the snapshots are instead spread over
+a few fixed bases, this probability differs from word to word, and the estimates are
+biased. Each word is then reweighted by the inverse of the fraction of the snapshots
+measuring it, which requires at least one of the bases to measure the word.
+
+Functions
+---------
+
+.. autosummary::
+   draw_recipes
+   group_recipes
+   basis_circuit
+   pauli_words
+   pauli_expvals
+   median_of_means
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import numpy as np
+
+from .compiler import BASIS_ROTATIONS
+
+# the Pauli operator measured by each basis index of the recipes
+PAULIS = ("X", "Y", "Z")
+
+# the index of the Pauli operators X, Y and Z in the recipes
+PAULI_INDICES = {pauli: i for i, pauli in enumerate(PAULIS)}
+
+
+def draw_recipes(num_snapshots, num_qubits, seed=None, num_bases=None):
+    """Draw the random measurement bases of the snapshots of a classical shadow.
+
+    The bases are drawn as by :meth:`pennylane.devices.QubitDevice.classical_shadow`, such
+    that a seed gives the same recipes on all devices.
+
+    Args:
+        num_snapshots (int): the number of snapshots
+        num_qubits (int): the number of measured qubits
+        seed (int): the seed of the random bases
+        num_bases (int): if given, the snapshots are spread evenly over this many random
+            bases instead of drawing the bases of each snapshot, which bounds the number of
+            jobs of wide circuits; the recipes are then not uniformly random, and must be
+            reweighted by :func:`pauli_expvals`
+
+    Returns:
+        array[uint8]: the basis of each snapshot and qubit, of shape
+        ``(num_snapshots, num_qubits)``
+    """
+    rng = np.random.RandomState(seed)
+    if num_bases is None:
+        return rng.randint(0, 3, size=(num_snapshots, num_qubits)).astype(np.uint8)
+
+    bases = rng.randint(0, 3, size=(num_bases, num_qubits)).astype(np.uint8)
+    return bases[np.arange(num_snapshots) % num_bases]
+
+
+def group_recipes(recipes):
+    """Group the snapshots of a classical shadow by their measurement bases.
+
+    Args:
+        recipes (array[int]): the basis of each snapshot and qubit
+
+    Returns:
+        tuple[array[uint8], array[int], array[int]]: the distinct bases, the number of
+        snapshots measured in each of them, and the order of the snapshots sorted by
+        their bases
+    """
+    bases, inverse, counts = np.unique(recipes, axis=0, return_inverse=True, return_counts=True)
+    return bases, counts, np.argsort(inverse.ravel(), kind="stable")
+
+
+def basis_circuit(circuit, basis, wires):
+    """Append the rotations measuring the qubits of a circuit in the given bases.
+
+    Args:
+        circuit (list[list]): the compiled AQT circuit
+        basis (Sequence[int]): the basis of each measured wire, as an index of ``PAULIS``
+        wires (Sequence[int]): the measured wires
+
+    Returns:
+        list[list]: the circuit followed by the basis rotations
+    """
+    rotations = [[*gate, [w]] for b, w in zip(basis, wires) for gate in BASIS_ROTATIONS[PAULIS[b]]]
+    return circuit + rotations
+
+
+def pauli_words(observable, wires):
+    """The Pauli words of a linear combination of Pauli words.
+
+    Args:
+        observable (~.Operator): the observable
+        wires (~.Wires): the wires of the classical shadow
+
+    Returns:
+        tuple[array[float], array[int]]: the coefficient of each word, and the Pauli
+        operator of each word on each wire, as an index into ``X``, ``Y`` and ``Z``, or
+        ``-1`` for the identity
+
+    Raises:
+        ValueError: if the observable is not a real linear combination of Pauli words
+    """
+    pauli_rep = observable.pauli_rep
+    if pauli_rep is None or any(np.imag(coeff) != 0 for coeff in pauli_rep.values()):
+        raise ValueError(
+            f"Classical shadows can only estimate Pauli words and their real linear "
+            f"combinations. Got {observable}."
+        )
+
+    coeffs = np.array([np.real(coeff) for coeff in pauli_rep.values()], dtype=float)
+    words = np.full((len(pauli_rep), len(wires)), -1)
+    for i, word in enumerate(pauli_rep):
+        for wire, pauli in word.items():
+            words[i, wires.index(wire)] = PAULI_INDICES[pauli]
+    return coeffs, words
+
+
+def pauli_expvals(bits, recipes, words, reweight=False):
+    """Estimate the expectation values of Pauli words from each snapshot of a classical
+    shadow.
+
+    Args:
+        bits (array[int]): the measured bit of each snapshot and qubit
+        recipes (array[int]): the basis of each snapshot and qubit
+        words (array[int]): the Pauli operator of each word on each qubit, as returned by
+            :func:`pauli_words`
+        reweight (bool): whether to weight the snapshots measuring each word by the
+            inverse of their fraction, instead of :math:`3` per qubit of the word, for
+            recipes that are not uniformly random
+
+    Returns:
+        array[float]: the estimates, of shape ``(len(words), num_snapshots)``
+
+    Raises:
+        ValueError: if a word is not measured by any snapshot when reweighting
+    """
+    words = np.asarray(words)[:, None, :]
+    measured = words != -1
+    matches = np.all((np.asarray(recipes) == words) | ~measured, axis=-1)
+    parities = np.sum(np.asarray(bits, dtype=np.int64) * measured, axis=-1) & 1
+
+    if reweight:
+        fractions = matches.mean(axis=-1)
+        if np.any(fractions == 0):
+            raise ValueError(
+                "The Pauli words are not all measured by the bases of the classical shadow. "
+                "Use more bases."
+            )
+        weights = 1 / fractions
+    else:
+        weights = 3.0 ** measured.sum(axis=-1)[:, 0]
+    return weights[:, None] * matches * (1 - 2 * parities)
+
+
+def median_of_means(values, k=1):
+    """The median of the means of ``k`` equal parts of the last axis of an array.
+
+    Args:
+        values (array[float]): the values
+        k (int): the number of parts
+
+    Returns:
+        array[float]: the median of means, without the last axis
+    """
+    means = [part.mean(axis=-1) for part in np.array_split(values, k, axis=-1)]
+    return np.median(means, axis=0)
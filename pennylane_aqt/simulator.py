@@ -52,6 +52,9 @@ class AQTSimulatorDevice(AQTDevice):
 
     TARGET_PATH = "sim"
 
+    # idle qubits of the ideal simulator are in state zero, and need not be simulated
+    COMPACT_WIRES = True
+
 
 class AQTNoisySimulatorDevice(AQTDevice):
     r"""AQTNoisySimulatorDevice for PennyLane.
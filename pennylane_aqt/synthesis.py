@@ -0,0 +1,336 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Synthesis
+=========
+
+**Module name:** :mod:`pennylane_aqt.synthesis`
+
+.. currentmodule:: pennylane_aqt.synthesis
+
+Tools to re-synthesize blocks of AQT-native gates with as few gates as possible.
+
+Single-qubit unitaries are synthesized into at most one ``R`` gate followed by a ``Z``
+gate. Two-qubit unitaries are synthesized with the Cartan (KAK) decomposition
+
+.. math:: U = e^{i\phi} (A_0 \otimes A_1) e^{i(x XX + y YY + z ZZ)} (B_0 \otimes B_1),
+
+which requires one MS gate for each non-vanishing coefficient :math:`x, y, z`.
+
+Functions
+---------
+
+.. autosummary::
+   synthesize_single_qubit
+   fuse_single_qubit_gates
+   kak_decomposition
+   synthesize_two_qubit
+   resynthesize_two_qubit_blocks
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import numpy as np
+
+from .compiler import _is_identity, _wrap, circuit_matrix
+
+# the magic basis, in which local unitaries are real orthogonal matrices
+# and the XX, YY and ZZ interactions are diagonal
+_MAGIC = np.array([[1, 0, 0, 1j], [0, 1j, 1, 0], [0, 1j, -1, 0], [1, 0, 0, -1j]]) / np.sqrt(2)
+
+_PAULIS = {
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]]),
+    "Z": np.diag([1, -1]).astype(complex),
+}
+
+# signs of the XX, YY and ZZ interactions in the magic basis, with a column for the global phase
+_INTERACTION_SIGNS = np.column_stack(
+    [np.ones(4)]
+    + [
+        np.diag(_MAGIC.conj().T @ np.kron(_PAULIS[p], _PAULIS[p]) @ _MAGIC).real
+        for p in ("X", "Y", "Z")
+    ]
+)
+
+# local basis changes V with V X V^dagger = P, mapping an XX interaction onto PP
+_BASIS_CHANGES = {
+    "X": np.eye(2, dtype=complex),
+    "Y": np.diag([1, 1j]),
+    "Z": np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+}
+
+
+def synthesize_single_qubit(matrix, wire, tol=1e-10):
+    r"""Synthesize a single-qubit unitary into AQT-native gates.
+
+    Any single-qubit unitary is equal, up to a global phase, to a rotation
+    :math:`R(t, p)` about an axis in the XY-plane followed by a Z rotation.
+
+    Args:
+        matrix (array[complex]): the :math:`2 \times 2` unitary
+        wire: the wire label of the gates
+        tol (float): tolerance below which angles are considered to vanish
+
+    Returns:
+        list[list]: at most one ``R`` gate followed by at most one ``Z`` gate
+    """
+    matrix = np.asarray(matrix, dtype=complex)
+    matrix = matrix / np.sqrt(np.linalg.det(matrix))
+
+    # ZYZ Euler angles of matrix = RZ(alpha) RY(beta) RZ(gamma)
+    abs_cos, abs_sin = abs(matrix[1, 1]), abs(matrix[1, 0])
+    beta = 2 * np.arctan2(abs_sin, abs_cos)
+    angle_sum = 2 * np.angle(matrix[1, 1]) if abs_cos > tol else 0.0
+    angle_diff = 2 * np.angle(matrix[1, 0]) if abs_sin > tol else 0.0
+    gamma = (angle_sum - angle_diff) / 2
+
+    # RZ(alpha) RY(beta) RZ(gamma) = RZ(alpha + gamma) R(beta, pi / 2 - gamma)
+    gates = []
+    if not _is_identity(beta / np.pi, tol):
+        gates.append(["R", _wrap(beta / np.pi), _wrap(0.5 - gamma / np.pi), [wire]])
+    if not _is_identity(angle_sum / np.pi, tol):
+        gates.append(["Z", _wrap(angle_sum / np.pi), [wire]])
+    return gates
+
+
+def fuse_single_qubit_gates(circuit, tol=1e-10):
+    r"""Fuse the runs of consecutive single-qubit gates on each wire.
+
+    Each run is multiplied into a single :math:`2 \times 2` unitary and re-emitted with
+    :func:`synthesize_single_qubit`, i.e., as at most one ``R`` gate followed by a ``Z``
+    gate. A run is only replaced if this reduces its number of gates.
+
+    **Example**
+
+    A rotation about the Y axis conjugated by X rotations is a single Z rotation:
+
+    >>> fuse_single_qubit_gates([["X", 0.5, [0]], ["Y", 0.5, [0]], ["X", -0.5, [0]]])
+    [['Z', -0.5, [0]]]
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        tol (float): tolerance below which angles are considered to vanish
+
+    Returns:
+        list[list]: the fused AQT circuit, equal to ``circuit`` up to a global phase
+    """
+    result = []
+    runs = {}
+
+    def flush(wire):
+        run = runs.pop(wire)
+        fused = synthesize_single_qubit(circuit_matrix(run, [wire]), wire, tol)
+        result.extend(fused if len(fused) < len(run) else run)
+
+    for gate in circuit:
+        wires = gate[-1]
+        if len(wires) == 1:
+            runs.setdefault(wires[0], []).append(gate)
+            continue
+
+        for w in wires:
+            if w in runs:
+                flush(w)
+        result.append(gate)
+
+    for wire in list(runs):
+        flush(wire)
+
+    return result
+
+
+def _kron_factor(matrix):
+    """Factor a tensor product of two single-qubit unitaries into its factors."""
+    reshaped = matrix.reshape(2, 2, 2, 2).transpose(0, 2, 1, 3).reshape(4, 4)
+    u, s, vh = np.linalg.svd(reshaped)
+    return np.sqrt(s[0]) * u[:, 0].reshape(2, 2), np.sqrt(s[0]) * vh[0].reshape(2, 2)
+
+
+def _orthogonal_diagonalization(matrix, tol):
+    """Real orthogonal matrix with unit determinant diagonalizing a symmetric unitary.
+
+    The real and imaginary parts of a symmetric unitary are commuting real symmetric
+    matrices, which are diagonalized simultaneously by a generic linear combination.
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        coeff = rng.uniform(0.5, 2.0)
+        _, q = np.linalg.eigh(matrix.real + coeff * matrix.imag)
+        diagonal = q.T @ matrix @ q
+        if np.allclose(diagonal, np.diag(np.diag(diagonal)), atol=max(tol, 1e-8)):
+            break
+    else:  # pragma: no cover
+        raise ValueError("Could not diagonalize the unitary in the magic basis.")
+
+    if np.linalg.det(q) < 0:
+        q[:, 0] *= -1
+    return q
+
+
+def kak_decomposition(matrix, tol=1e-10):
+    r"""Cartan (KAK) decomposition of a two-qubit unitary.
+
+    Computes :math:`U = e^{i\phi} (A_0 \otimes A_1) e^{i(x XX + y YY + z ZZ)} (B_0 \otimes B_1)`,
+    with the interaction coefficients reduced to the interval :math:`(-\pi/4, \pi/4]`.
+
+    Args:
+        matrix (array[complex]): the :math:`4 \times 4` unitary
+        tol (float): numerical tolerance
+
+    Returns:
+        tuple: the local unitaries ``(A0, A1)`` applied after the interaction, the
+        coefficients ``(x, y, z)``, and the local unitaries ``(B0, B1)`` applied before
+        the interaction
+    """
+    matrix = np.asarray(matrix, dtype=complex)
+    matrix = matrix / np.linalg.det(matrix) ** 0.25
+    magic = _MAGIC.conj().T @ matrix @ _MAGIC
+
+    q = _orthogonal_diagonalization(magic.T @ magic, tol)
+    diagonal = np.sqrt(np.diag(q.T @ magic.T @ magic @ q))
+    k1 = magic @ q @ np.diag(1 / diagonal)
+    if np.linalg.det(k1.real) < 0:
+        diagonal[0] *= -1
+        k1[:, 0] *= -1
+
+    # solve for the global phase and the interaction coefficients
+    _, *coeffs = np.linalg.solve(_INTERACTION_SIGNS, np.angle(diagonal))
+
+    # exp(i k pi / 2 PP) is the local unitary (i PP)^k, which is absorbed into A
+    after = _MAGIC @ k1.real @ _MAGIC.conj().T
+    for idx, pauli in enumerate(("X", "Y", "Z")):
+        k = np.round(coeffs[idx] / (np.pi / 2))
+        if np.isclose(coeffs[idx] - k * np.pi / 2, -np.pi / 4, atol=tol):
+            k -= 1
+        coeffs[idx] -= k * np.pi / 2
+        if k % 2:
+            after = after @ np.kron(_PAULIS[pauli], _PAULIS[pauli])
+
+    before = _MAGIC @ q.T @ _MAGIC.conj().T
+    return _kron_factor(after), tuple(coeffs), _kron_factor(before)
+
+
+def synthesize_two_qubit(matrix, wires, tol=1e-10):
+    r"""Synthesize a two-qubit unitary into AQT-native gates with as few MS gates as possible.
+
+    The unitary is synthesized using its :func:`kak_decomposition`, with one MS gate for
+    each non-vanishing interaction coefficient and the local unitaries synthesized into
+    ``R`` and ``Z`` gates.
+
+    Args:
+        matrix (array[complex]): the :math:`4 \times 4` unitary
+        wires (list): the wire labels of the unitary, with the first wire corresponding
+            to the most significant bit of the matrix indices
+        tol (float): tolerance below which angles are considered to vanish
+
+    Returns:
+        list[list]: the AQT circuit, equal to the unitary up to a global phase
+    """
+    (after0, after1), coeffs, (before0, before1) = kak_decomposition(matrix, tol)
+
+    # the single-qubit unitaries between the MS gates, and the MS gate angles
+    locals_ = [[before0, before1]]
+    angles = []
+    for pauli, coeff in zip(("X", "Y", "Z"), coeffs):
+        if abs(coeff) < tol:
+            continue
+        # exp(i c PP) = (V x V) MS(-2c / pi) (V^dagger x V^dagger)
+        change = _BASIS_CHANGES[pauli]
+        locals_[-1] = [change.conj().T @ u for u in locals_[-1]]
+        angles.append(-2 * coeff / np.pi)
+        locals_.append([change, change])
+    locals_[-1] = [after0 @ locals_[-1][0], after1 @ locals_[-1][1]]
+
+    circuit = []
+    for i, (u0, u1) in enumerate(locals_):
+        if i > 0:
+            circuit.append(["MS", _wrap(angles[i - 1]), list(wires)])
+        circuit += synthesize_single_qubit(u0, wires[0], tol)
+        circuit += synthesize_single_qubit(u1, wires[1], tol)
+    return circuit
+
+
+def _num_ms_gates(circuit):
+    """Number of MS gates in an AQT circuit."""
+    return sum(gate[0] == "MS" for gate in circuit)
+
+
+def _resynthesize_block(block, tol):
+    """Re-synthesize a block of gates acting on a pair of wires if this saves gates."""
+    wires, gates = block
+    candidate = synthesize_two_qubit(circuit_matrix(gates, wires), wires, tol)
+    if (_num_ms_gates(candidate), len(candidate)) < (_num_ms_gates(gates), len(gates)):
+        return candidate
+    return gates
+
+
+def resynthesize_two_qubit_blocks(circuit, tol=1e-10):
+    """Re-synthesize the blocks of consecutive gates acting on the same pair of wires.
+
+    Starting from each MS gate, the following gates acting only on the same pair of wires
+    are collected into a block, whose unitary is re-synthesized with
+    :func:`synthesize_two_qubit`. A block is only replaced if this reduces the number of
+    MS gates, or the total number of gates.
+
+    **Example**
+
+    A ZZ rotation, decomposed into two CNOT gates, only needs a single MS gate:
+
+    >>> circuit = translate(
+    ...     [qml.CNOT([0, 1]), qml.RZ(0.3, wires=1), qml.CNOT([0, 1])], {0: 0, 1: 1}
+    ... )
+    >>> sum(gate[0] == "MS" for gate in resynthesize_two_qubit_blocks(circuit))
+    1
+
+    Args:
+        circuit (list[list]): the AQT circuit
+        tol (float): tolerance below which angles are considered to vanish
+
+    Returns:
+        list[list]: the re-synthesized AQT circuit, equal to ``circuit`` up to a global phase
+    """
+    result = []
+    blocks = {}
+
+    def flush(block):
+        for w in block[0]:
+            del blocks[w]
+        result.extend(_resynthesize_block(block, tol))
+
+    for gate in circuit:
+        wires = gate[-1]
+        block = blocks.get(wires[0])
+
+        if len(wires) == 1:
+            (block[1] if block else result).append(gate)
+            continue
+
+        if block is not None and block is blocks.get(wires[1]):
+            block[1].append(gate)
+            continue
+
+        for w in wires:
+            if w in blocks:
+                flush(blocks[w])
+
+        block = (list(wires), [gate])
+        for w in wires:
+            blocks[w] = block
+
+    for block in list({id(b): b for b in blocks.values()}.values()):
+        flush(block)
+
+    return result
@@ -0,0 +1,246 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Telemetry
+=========
+
+**Module name:** :mod:`pennylane_aqt.telemetry`
+
+.. currentmodule:: pennylane_aqt.telemetry
+
+Track the jobs submitted to AQT backends, and predict their completion times.
+
+Each job submitted by an AQT device is tracked by a :class:`JobHandle`, which records
+the times at which the job was submitted, started and finished, as observed when polling
+it, and how long after the previous query each change was observed. The queue and
+execution times of finished jobs whose changes were observed precisely are kept in a
+rolling :class:`LatencyHistory` per backend. The queue time of a new job is predicted by
+the median queue time of the recent jobs, and its execution time by a linear fit of the
+recent execution times in the number of gate applications, ``shots * (num_gates + 1)``.
+The devices use these predictions to sleep until just before a job is expected to start,
+and then to finish, instead of polling it at a fixed rate.
+
+.. code-block:: python
+
+    dev = qml.device("aqt.sim", wires=2)
+    ...
+    job = dev.jobs[-1]
+    job.status, job.eta, job.queue_time
+
+Classes
+-------
+
+.. autosummary::
+   JobHandle
+   LatencyHistory
+
+Code details
+~~~~~~~~~~~~
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+DEFAULT_MAX_RECORDS = 100
+
+
+class JobHandle:
+    """Handle of a job submitted to an AQT backend.
+
+    Times are given in seconds since the epoch, as returned by :func:`time.time`, and are
+    only as precise as the polling of the job.
+
+    Args:
+        job_id (str): the id of the job
+        backend (str): the URL of the backend
+        num_gates (int): the number of gates of the circuit
+        shots (int): the number of shots
+        prediction (tuple[float, float]): the predicted queue and execution times, if any
+        submitted (float): the time the job was submitted; defaults to now
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def __init__(self, job_id, backend, num_gates, shots, prediction=None, submitted=None):
+        self.id = job_id
+        self.backend = backend
+        self.num_gates = num_gates
+        self.shots = shots
+        self.prediction = prediction
+        self.submitted = time.time() if submitted is None else submitted
+        self.started = None
+        self.finished = None
+        self.status = "queued"
+        # the time between the query observing each change and the previous query
+        self.resolution = 0.0
+        self._observed = self.submitted
+
+    def update(self, status, timestamp=None):
+        """Update the status of the job, as returned by a query.
+
+        Args:
+            status (str): the status of the job, ``"queued"``, ``"ongoing"`` or ``"finished"``
+            timestamp (float): the time of the query; defaults to now
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        window = timestamp - self._observed
+        if status != "queued" and self.started is None:
+            self.started = timestamp
+            self.resolution = max(self.resolution, window)
+        if status == "finished" and self.finished is None:
+            self.finished = timestamp
+            self.resolution = max(self.resolution, window)
+        self.status = status
+        self._observed = timestamp
+
+    @property
+    def queue_time(self):
+        """float: the time the job was queued, or ``None`` if it did not start yet"""
+        return None if self.started is None else self.started - self.submitted
+
+    @property
+    def execution_time(self):
+        """float: the time the job was executed, or ``None`` if it did not finish yet"""
+        return None if self.finished is None else self.finished - self.started
+
+    @property
+    def predicted_start(self):
+        """float: the time the job is predicted to start, or ``None`` if there is no
+        prediction"""
+        if self.prediction is None:
+            return None
+        return self.submitted + self.prediction[0]
+
+    @property
+    def eta(self):
+        """float: the time the job finished, or is predicted to finish, or ``None`` if there
+        is no prediction
+
+        The prediction only depends on the submission time, such that a start observed
+        late, e.g., after a long sleep, does not delay it.
+        """
+        if self.finished is not None:
+            return self.finished
+        if self.prediction is None:
+            return None
+        return self.predicted_start + self.prediction[1]
+
+    def remaining(self):
+        """The predicted time until the job finishes.
+
+        Returns:
+            float: the time (in seconds), which is zero if the job is overdue, or ``None``
+            if there is no prediction
+        """
+        eta = self.eta
+        return None if eta is None else max(eta - time.time(), 0.0)
+
+    def __repr__(self):
+        return f"<JobHandle: id={self.id}, status={self.status}>"
+
+
+class LatencyHistory:
+    """Rolling history of the queue and execution times of the jobs of each backend.
+
+    The history is thread-safe, such that it can be shared by devices and by concurrent
+    jobs.
+
+    Args:
+        max_records (int): the number of recent jobs kept per backend
+    """
+
+    def __init__(self, max_records=DEFAULT_MAX_RECORDS):
+        self.max_records = max_records
+        self._records = defaultdict(lambda: deque(maxlen=self.max_records))
+        self._lock = threading.Lock()
+
+    def record(self, job, resolution=None):
+        """Add a finished job to the history of its backend.
+
+        Args:
+            job (JobHandle): the finished job; unfinished jobs are ignored
+            resolution (float): if given, jobs whose start or finish was observed more than
+                this long after the previous query are ignored, as their queue and
+                execution times are not known precisely
+        """
+        if job.finished is None:
+            return
+        if resolution is not None and job.resolution > resolution:
+            return
+        with self._lock:
+            self._records[job.backend].append(
+                (job.num_gates, job.shots, job.queue_time, job.execution_time)
+            )
+
+    def records(self, backend):
+        """The recorded jobs of a backend.
+
+        Args:
+            backend (str): the URL of the backend
+
+        Returns:
+            list[tuple]: the number of gates, the number of shots, the queue time and the
+            execution time of each recorded job, oldest first
+        """
+        with self._lock:
+            return list(self._records.get(backend, ()))
+
+    def predict(self, backend, num_gates, shots):
+        """Predict the queue and execution times of a job.
+
+        Args:
+            backend (str): the URL of the backend
+            num_gates (int): the number of gates of the circuit
+            shots (int): the number of shots
+
+        Returns:
+            tuple[float, float] or None: the predicted queue and execution times (in
+            seconds), or ``None`` if no job of the backend was recorded
+        """
+        records = self.records(backend)
+        if not records:
+            return None
+
+        gates, record_shots, queue_times, execution_times = np.array(records, dtype=float).T
+        costs = record_shots * (gates + 1)
+        cost = shots * (num_gates + 1)
+
+        slope, intercept = 0.0, np.mean(execution_times)
+        if len(np.unique(costs)) > 1:
+            slope, intercept = np.polyfit(costs, execution_times, 1)
+        if slope <= 0:
+            # scale the mean execution time by the cost, e.g., for a single recorded cost
+            slope, intercept = np.mean(execution_times) / max(np.mean(costs), 1.0), 0.0
+        execution_time = intercept + slope * cost
+
+        return float(np.median(queue_times)), max(float(execution_time), 0.0)
+
+    def clear(self, backend=None):
+        """Remove the recorded jobs of a backend, or of all backends.
+
+        Args:
+            backend (str): the URL of the backend; defaults to all backends
+        """
+        with self._lock:
+            if backend is None:
+                self._records.clear()
+            else:
+                self._records.pop(backend, None)
+
+
+LATENCY_HISTORY = LatencyHistory()
+"""LatencyHistory: the history shared by all AQT devices of the process"""
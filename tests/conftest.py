@@ -12,5 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import numpy as np
+import pytest
+
+from pennylane_aqt.device import AQTDevice
+from pennylane_aqt.mock_server import MockAQTServer
 
 np.random.seed(42)
+
+
+@pytest.fixture
+def aqt_server(monkeypatch):
+    """A mock AQT gateway running in a background thread, which the devices created
+    within the test submit their jobs to."""
+    with MockAQTServer(seed=42) as server:
+        monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+        yield server
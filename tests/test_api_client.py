@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for the api_client module"""
+import gzip
 import pytest
 
 import requests
 import json
+from urllib.parse import parse_qs
 
 from pennylane_aqt import api_client
 
@@ -81,3 +83,34 @@ class TestAPIClient:
         response = api_client.submit("POST", SOME_URL, SOME_PAYLOAD, SOME_HEADER)
         assert response.args == (SOME_URL, SOME_PAYLOAD)
         assert response.kwargs == ({"headers": SOME_HEADER, "timeout": 1.0})
+
+    def test_encode_request(self):
+        """Tests that ``encode_request`` form-encodes the payload, and optionally compresses it."""
+        request = {"data": json.dumps([["X", 0.5, [0]]] * 100), "repetitions": 10}
+
+        body = api_client.encode_request(request)
+        compressed = api_client.encode_request(request, compress=True)
+
+        assert parse_qs(body.decode()) == {"data": [request["data"]], "repetitions": ["10"]}
+        assert gzip.decompress(compressed) == body
+        assert len(compressed) < len(body)
+
+    def test_submit_compressed_request(self, monkeypatch):
+        """Tests that compressed requests are sent gzipped with the matching headers."""
+
+        def mock_put(*args, **kwargs):
+            return MockResponse(*args, **kwargs)
+
+        monkeypatch.setattr(requests, "put", mock_put)
+
+        request = {"data": "[]", "repetitions": 10}
+        response = api_client.submit("PUT", SOME_URL, request, SOME_HEADER, compress=True)
+
+        url, body = response.args
+        headers = response.kwargs["headers"]
+        assert url == SOME_URL
+        assert gzip.decompress(body) == b"data=%5B%5D&repetitions=10"
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Content-Type"] == "application/x-www-form-urlencoded"
+        assert headers["Auth-token"] == "ABC123"
+        assert "Content-Encoding" not in SOME_HEADER
@@ -0,0 +1,75 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Micro-benchmarks for the host-side overhead of the AQT devices"""
+import pytest
+
+import pennylane as qml
+
+from pennylane_aqt import ops
+from pennylane_aqt.compiler import translate
+from pennylane_aqt.device import AQTDevice
+
+pytest.importorskip("pytest_benchmark")
+
+SOME_API_KEY = "ABC123"
+NUM_GATES = 10000
+
+
+@pytest.fixture(scope="module")
+def deep_circuit():
+    """A circuit with ``NUM_GATES`` gates on three wires."""
+    gates = [
+        lambda i: qml.RX(0.1 * i, wires=i % 3),
+        lambda i: qml.Hadamard(wires=i % 3),
+        lambda i: qml.CNOT(wires=[i % 3, (i + 1) % 3]),
+        lambda i: ops.MS(0.01 * i, wires=[i % 3, (i + 2) % 3]),
+        lambda i: qml.adjoint(qml.RY(0.2 * i, wires=i % 3)),
+    ]
+    return [gates[i % len(gates)](i) for i in range(NUM_GATES)]
+
+
+class TestOperationLookup:
+    """Per-gate cost of checking whether an operation is supported by the device."""
+
+    def test_rebuilt_set(self, benchmark, deep_circuit):
+        """Reference: the set of supported operations is rebuilt on every access."""
+        dev = AQTDevice(3, api_key=SOME_API_KEY)
+        names = [op.name for op in deep_circuit]
+
+        def lookup():
+            return all(name in set(dev._operation_map.keys()) for name in names)
+
+        assert benchmark(lookup)
+
+    def test_cached_set(self, benchmark, deep_circuit):
+        """The precomputed set of supported operations of the device class."""
+        dev = AQTDevice(3, api_key=SOME_API_KEY)
+        names = [op.name for op in deep_circuit]
+
+        def lookup():
+            return all(name in dev.operations for name in names)
+
+        assert benchmark(lookup)
+
+
+class TestTranslation:
+    """Cost of translating a deep circuit into AQT-native gates."""
+
+    def test_translate(self, benchmark, deep_circuit):
+        """Translation of the whole circuit in a single pass."""
+        dev = AQTDevice(3, api_key=SOME_API_KEY)
+
+        circuit = benchmark(translate, deep_circuit, dev.wire_map, dev._decompositions)
+
+        assert len(circuit) > NUM_GATES
@@ -0,0 +1,209 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the cassette module"""
+import gzip
+import json
+
+import pytest
+import requests
+
+import pennylane as qml
+import numpy as np
+
+from pennylane_aqt.cassette import Cassette, request_key
+from pennylane_aqt.device import AQTDevice
+from pennylane_aqt.mock_server import MockAQTServer
+
+SOME_API_KEY = "ABC123"
+
+
+def run(dev):
+    """Execute a parametrized circuit at a few parameters on a device."""
+
+    @qml.set_shots(50)
+    @qml.qnode(dev)
+    def circuit(x):
+        qml.RX(x, wires=0)
+        qml.CNOT(wires=[0, 1])
+        return qml.expval(qml.PauliZ(1)), qml.sample(wires=[0, 1])
+
+    return [circuit(x) for x in [1.2, 0.3, 1.2]]
+
+
+@pytest.fixture
+def go_offline(monkeypatch):
+    """A function making every request to the network fail, and removing the API key."""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Unexpected network access.")
+
+    def _go_offline():
+        monkeypatch.setattr(requests, "put", fail)
+        monkeypatch.setattr(requests, "post", fail)
+        monkeypatch.setenv("AQT_TOKEN", "")
+
+    return _go_offline
+
+
+class TestRequestKey:
+    """Tests for the ``request_key`` function."""
+
+    def test_independent_of_host_and_token(self):
+        """Tests that the key does not depend on the host or on the access token."""
+        request = {"access_token": "a", "no_qubits": 2, "repetitions": 10, "data": "[]"}
+        key = request_key("http://127.0.0.1:1234/sim", request)
+
+        assert key == request_key("http://localhost:99/sim", {**request, "access_token": "b"})
+        assert key != request_key("http://127.0.0.1:1234/sim/noise-model-1", request)
+        assert key != request_key("http://127.0.0.1:1234/sim", {**request, "repetitions": 20})
+
+
+class TestCassette:
+    """Tests for the ``Cassette`` class."""
+
+    def test_record_and_replay(self, aqt_server, tmp_path, go_offline):
+        """Tests that a recorded run is replayed offline with identical results."""
+        path = tmp_path / "run.cassette"
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY, cassette=path)
+        recorded = run(dev)
+        dev.cassette.close()
+        cassette = Cassette(path)
+
+        assert cassette.replaying
+        assert len(cassette) == 3
+        with gzip.open(path, "rt") as f:
+            assert SOME_API_KEY not in f.read()
+
+        go_offline()
+        replayed = run(qml.device("aqt.sim", wires=2, cassette=cassette))
+
+        for (expval, samples), (expval_r, samples_r) in zip(recorded, replayed):
+            assert np.isclose(expval, expval_r)
+            assert np.array_equal(samples, samples_r)
+        assert not np.array_equal(recorded[0][1], recorded[2][1])
+
+    def test_queued_jobs(self, monkeypatch, tmp_path, go_offline):
+        """Tests that the final responses of queued jobs are recorded, and replayed
+        without polling."""
+        path = tmp_path / "run.cassette"
+        with MockAQTServer(latency=0.02, seed=1) as server:
+            monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+            with Cassette(path, mode="record") as cassette:
+                dev = AQTDevice(
+                    2,
+                    shots=10,
+                    api_key=SOME_API_KEY,
+                    retry_delay=0.01,
+                    cassette=cassette,
+                    compact=True,
+                )
+                dev.apply([qml.PauliX(wires=1)])
+
+        (entries,) = Cassette(path).interactions.values()
+        assert entries[0]["body"]["status"] == "finished"
+        # the job runs on wire 1 only
+        assert entries[0]["body"]["samples"] == [1] * 10
+
+        go_offline()
+        dev = AQTDevice(
+            2, shots=10, retry_delay=10, cassette=Cassette(path, mode="replay"), compact=True
+        )
+        dev.apply([qml.PauliX(wires=1)])
+        assert dev.samples == [2] * 10
+
+    def test_errors_replayed(self, aqt_server, tmp_path, go_offline):
+        """Tests that failed jobs and rejected submissions are replayed."""
+        path = tmp_path / "run.cassette"
+        aqt_server.inject_error("Ion loss")
+        aqt_server.inject_error("Service unavailable", status_code=503)
+
+        for replay in [False, True]:
+            if replay:
+                go_offline()
+            dev = AQTDevice(2, shots=10, cassette=Cassette(path), api_key=SOME_API_KEY)
+            assert dev.cassette.replaying == replay
+            with pytest.raises(ValueError, match="got the error message: Ion loss"):
+                dev.apply([qml.PauliX(0)])
+            with pytest.raises(requests.HTTPError, match="Service unavailable"):
+                dev.apply([qml.PauliX(0)])
+            dev.cassette.close()
+
+        assert len(aqt_server.jobs) == 1
+
+    def test_replay_exhausted(self, aqt_server, tmp_path):
+        """Tests that an error is raised if a job was not recorded."""
+        path = tmp_path / "run.cassette"
+        with Cassette(path) as cassette:
+            AQTDevice(2, shots=10, api_key=SOME_API_KEY, cassette=cassette).apply([qml.PauliX(0)])
+
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY, cassette=path)
+        dev.apply([qml.PauliX(0)])
+        with pytest.raises(ValueError, match="No recorded response left"):
+            dev.apply([qml.PauliX(0)])
+        with pytest.raises(ValueError, match="No recorded response left"):
+            dev.apply([qml.PauliX(1)])
+
+    def test_file_format(self, aqt_server, tmp_path):
+        """Tests that cassettes are gzip-compressed JSON files."""
+        path = tmp_path / "run.cassette"
+        with Cassette(path) as cassette:
+            AQTDevice(2, shots=10, api_key=SOME_API_KEY, cassette=cassette).apply([qml.PauliX(0)])
+
+        with gzip.open(path, "rt") as f:
+            data = json.load(f)
+
+        assert data["version"] == 1
+        ((key, [entry]),) = data["interactions"].items()
+        assert len(key) == 64
+        assert entry["status_code"] == 200
+        assert entry["body"]["samples"] == [1] * 10
+
+    def test_unknown_mode(self, tmp_path):
+        """Tests that unknown modes are rejected."""
+        with pytest.raises(ValueError, match="Unknown cassette mode"):
+            Cassette(tmp_path / "run.cassette", mode="rewind")
+
+    def test_written_in_batches(self, aqt_server, tmp_path):
+        """Tests that recorded jobs are written in batches, and when the cassette is closed."""
+        path = tmp_path / "run.cassette"
+        cassette = Cassette(path, mode="record", flush_every=2)
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY, cassette=cassette)
+
+        dev.apply([qml.PauliX(0)])
+        assert not path.exists()
+        dev.reset()
+        dev.apply([qml.PauliX(1)])
+        assert len(Cassette(path)) == 2
+
+        dev.reset()
+        dev.apply([qml.PauliX(0)])
+        assert len(Cassette(path)) == 2
+        cassette.close()
+        assert len(Cassette(path)) == 3
+
+    @pytest.mark.parametrize("status_code", [200, 500])
+    def test_responses_without_job_id(self, tmp_path, status_code):
+        """Tests that rejected submissions and responses without a job ID are recorded as
+        final responses."""
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = json.dumps({"detail": "Internal error"}).encode()
+        request = {"no_qubits": 2, "repetitions": 10, "data": "[]"}
+
+        with Cassette(tmp_path / "run.cassette", mode="record") as cassette:
+            submit = cassette.wrap(lambda *args, **kwargs: response)
+            assert submit("PUT", "http://localhost/sim", request, {}) is response
+
+        (entries,) = Cassette(tmp_path / "run.cassette").interactions.values()
+        assert entries == [{"status_code": status_code, "body": {"detail": "Internal error"}}]
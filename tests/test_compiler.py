@@ -0,0 +1,341 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the compiler module"""
+import pytest
+
+import pennylane as qml
+import numpy as np
+
+from pennylane_aqt import ops
+from pennylane_aqt.compiler import (
+    DECOMPOSITIONS,
+    circuit_matrix,
+    compact_wires,
+    estimate_resources,
+    gate_matrix,
+    schedule,
+    translate,
+)
+
+WIRE_MAP = {"a": 0, "b": 1, "c": 2}
+
+
+def assert_equal_up_to_phase(U, V):
+    """Asserts that two unitary matrices are equal up to a global phase."""
+    overlap = np.trace(U.conj().T @ V) / len(U)
+    assert np.isclose(abs(overlap), 1.0)
+
+
+def random_circuit(num_gates, num_wires, seed):
+    """A random AQT circuit, including runs of gates that can be merged."""
+    rng = np.random.default_rng(seed)
+    circuit = []
+    for _ in range(num_gates):
+        wires = [int(w) for w in rng.choice(num_wires, size=2, replace=False)]
+        name = rng.choice(["X", "Y", "Z", "R", "MS", "MS"])
+        angle = float(rng.choice([0.5, -0.5, 1.0, rng.uniform(-1, 1)]))
+        if name == "R":
+            circuit.append(["R", angle, float(rng.choice([0.0, 0.25])), wires[:1]])
+        elif name == "MS":
+            circuit.append(["MS", angle, wires])
+        else:
+            circuit.append([name, angle, wires[:1]])
+    return circuit
+
+
+class TestTranslate:
+    """Tests for the ``translate`` function."""
+
+    def test_translate_sequence(self):
+        """Tests that a sequence of operations is translated in order, with the
+        parameters converted to the AQT convention."""
+        operations = [
+            qml.RX(0.4, wires="a"),
+            qml.CNOT(wires=["c", "a"]),
+            ops.R(0.1, 0.2, wires="b"),
+            qml.adjoint(ops.MS(0.3, wires=["a", "b"])),
+        ]
+
+        res = translate(operations, WIRE_MAP)
+
+        assert res == [
+            ["X", 0.4 / np.pi, [0]],
+            ["Y", 0.5, [2]],
+            ["MS", 0.5, [2, 0]],
+            ["X", -0.5, [2]],
+            ["X", -0.5, [0]],
+            ["Y", -0.5, [2]],
+            ["R", 0.1, 0.2, [1]],
+            ["MS", -0.3, [0, 1]],
+        ]
+
+    def test_translate_empty(self):
+        """Tests that an empty sequence of operations gives an empty circuit."""
+        assert translate([], WIRE_MAP) == []
+
+    def test_translate_returns_python_floats(self):
+        """Tests that the translated parameters are plain Python floats, so that
+        the circuit can be serialized to JSON."""
+        res = translate([qml.RY(np.float32(0.2), wires="a"), qml.PauliX(wires="b")], WIRE_MAP)
+
+        assert all(type(gate[1]) is float for gate in res)
+
+    def test_translate_unsupported_operation(self):
+        """Tests that an exception is raised for operations without decomposition."""
+        with pytest.raises(qml.exceptions.DeviceError, match="Operation Toffoli is not supported"):
+            translate([qml.Toffoli(wires=["a", "b", "c"])], WIRE_MAP)
+
+    def test_translate_broadcasted(self):
+        """Tests that broadcasted operations are translated into one circuit per
+        parameter set."""
+        x = np.array([0.1, 0.2, 0.3])
+        operations = [
+            qml.RX(x, wires="a"),
+            qml.CRZ(0.4, wires=["a", "b"]),
+            ops.R(x, 0.5, wires="c"),
+            qml.adjoint(qml.U3(0.1, x, -x, wires="b")),
+        ]
+
+        res = translate(operations, WIRE_MAP, batch_size=3)
+
+        assert len(res) == 3
+        for i, circuit in enumerate(res):
+            unbatched = [
+                qml.RX(x[i], wires="a"),
+                qml.CRZ(0.4, wires=["a", "b"]),
+                ops.R(x[i], 0.5, wires="c"),
+                qml.adjoint(qml.U3(0.1, x[i], -x[i], wires="b")),
+            ]
+            assert circuit == translate(unbatched, WIRE_MAP)
+
+    @pytest.mark.parametrize("name", [k for k in DECOMPOSITIONS if not k.startswith("Adjoint")])
+    def test_adjoint_in_table(self, name):
+        """Tests that every operation in the decomposition table has an adjoint entry."""
+        assert f"Adjoint({name})" in DECOMPOSITIONS
+
+
+NATIVE_LOWERINGS = [
+    qml.PauliX(0),
+    qml.PauliY(0),
+    qml.PauliZ(0),
+    qml.Hadamard(0),
+    qml.S(0),
+    qml.T(0),
+    qml.SX(0),
+    qml.RX(0.3, wires=0),
+    qml.RY(-0.4, wires=0),
+    qml.RZ(1.2, wires=0),
+    qml.PhaseShift(0.7, wires=0),
+    qml.U1(-0.2, wires=0),
+    qml.Rot(0.1, -0.6, 0.9, wires=0),
+    qml.U2(0.4, -0.7, wires=0),
+    qml.U3(0.5, 0.1, -0.8, wires=0),
+    qml.CNOT(wires=[0, 1]),
+    qml.CZ(wires=[0, 1]),
+    qml.CY(wires=[1, 0]),
+    qml.ControlledPhaseShift(0.4, wires=[0, 1]),
+    qml.CRX(-0.3, wires=[1, 0]),
+    qml.CRY(0.8, wires=[0, 1]),
+    qml.CRZ(0.5, wires=[0, 1]),
+    qml.SWAP(wires=[0, 1]),
+    qml.ISWAP(wires=[0, 1]),
+    qml.IsingXX(0.6, wires=[0, 1]),
+    qml.IsingYY(-0.2, wires=[0, 1]),
+    qml.IsingZZ(0.9, wires=[1, 0]),
+]
+
+
+class TestNativeLowerings:
+    """Parity tests of the decomposition table against the matrices of PennyLane."""
+
+    @pytest.mark.parametrize("adjoint", [False, True])
+    @pytest.mark.parametrize("op", NATIVE_LOWERINGS, ids=lambda op: op.name)
+    def test_unitary(self, op, adjoint):
+        """Tests that the native decomposition of an operation and of its adjoint
+        implement the same unitary as the operation, up to a global phase."""
+        if adjoint:
+            op = qml.adjoint(op)
+        wire_order = [0, 1]
+
+        circuit = translate([op], {0: 0, 1: 1})
+
+        assert_equal_up_to_phase(
+            circuit_matrix(circuit, wire_order), qml.matrix(op, wire_order=wire_order)
+        )
+
+    @pytest.mark.parametrize("op", NATIVE_LOWERINGS, ids=lambda op: op.name)
+    def test_minimal_ms_gates(self, op):
+        """Tests that the decompositions use as few MS gates as possible."""
+        num_ms = {"SWAP": 3, "ISWAP": 2}.get(op.name, len(op.wires) - 1)
+        circuit = translate([op], {0: 0, 1: 1})
+
+        assert sum(gate[0] == "MS" for gate in circuit) == num_ms
+
+
+class TestCompactWires:
+    """Tests for the ``compact_wires`` function."""
+
+    def test_idle_wires_dropped(self):
+        """Tests that the active wires are relabelled with a dense range in their order."""
+        circuit = [["X", 0.5, [4]], ["MS", 0.5, [4, 1]], ["R", 0.5, 0.1, [6]]]
+        compacted, wires = compact_wires(circuit)
+
+        assert compacted == [["X", 0.5, [1]], ["MS", 0.5, [1, 0]], ["R", 0.5, 0.1, [2]]]
+        assert wires == [1, 4, 6]
+        assert circuit[0] == ["X", 0.5, [4]]
+
+    def test_empty_circuit(self):
+        """Tests that an empty circuit is compacted to a single wire."""
+        assert compact_wires([]) == ([], [0])
+
+    def test_min_wires(self):
+        """Tests that idle wires are kept up to the minimum number of wires."""
+        assert compact_wires([["X", 0.5, [2]]], min_wires=3) == ([["X", 0.5, [2]]], [0, 1, 2])
+
+
+class TestEstimateResources:
+    """Tests for the ``estimate_resources`` function."""
+
+    DURATIONS = {"X": 1.0, "Y": 1.0, "Z": 0.0, "R": 2.0, "MS": 10.0}
+
+    def test_empty_circuit(self):
+        """Tests the resources of an empty circuit."""
+        res = estimate_resources([], self.DURATIONS)
+
+        assert res["num_gates"] == 0
+        assert res["two_qubit_depth"] == 0
+        assert res["duration"] == 0.0
+
+    def test_parallel_gates(self):
+        """Tests that gates on disjoint wires are counted as parallel."""
+        circuit = [
+            ["X", 0.5, [0]],
+            ["R", 0.5, 0.1, [1]],
+            ["MS", 0.5, [0, 1]],
+            ["MS", 0.5, [2, 3]],
+            ["Z", 0.5, [3]],
+            ["MS", 0.5, [1, 2]],
+        ]
+        res = estimate_resources(circuit, self.DURATIONS)
+
+        assert res["gate_counts"] == {"X": 1, "Y": 0, "Z": 1, "R": 1, "MS": 3}
+        assert res["num_gates"] == 6
+        assert res["two_qubit_depth"] == 2
+        assert res["duration"] == 22.0
+
+
+class TestGateMatrix:
+    """Tests for the matrices of the native AQT gates."""
+
+    @pytest.mark.parametrize("t", [0.0, 0.3, -1.2])
+    @pytest.mark.parametrize(
+        "name, op", [("X", qml.RX), ("Y", qml.RY), ("Z", qml.RZ), ("MS", qml.IsingXX)]
+    )
+    def test_rotations(self, name, op, t):
+        """Tests the matrices of the native rotations against PennyLane."""
+        wires = [0, 1] if name == "MS" else [0]
+        assert np.allclose(gate_matrix([name, t, wires]), qml.matrix(op(t * np.pi, wires=wires)))
+
+    @pytest.mark.parametrize("t, p", [(0.5, 0.0), (0.5, 0.5), (-0.3, 0.7)])
+    def test_r(self, t, p):
+        """Tests the matrix of the R gate, which is a rotation about an axis in the XY-plane."""
+        expected = qml.matrix(qml.RZ(p * np.pi, 0) @ qml.RX(t * np.pi, 0) @ qml.RZ(-p * np.pi, 0))
+        assert np.allclose(gate_matrix(["R", t, p, [0]]), expected)
+
+    def test_unknown_gate(self):
+        """Tests that an exception is raised for unknown gates."""
+        with pytest.raises(ValueError, match="Unknown AQT gate"):
+            gate_matrix(["CZ", 0.5, [0, 1]])
+
+    def test_circuit_matrix_wire_order(self):
+        """Tests that the first wire corresponds to the most significant bit."""
+        res = circuit_matrix([["X", 1.0, [1]]], [0, 1])
+        assert np.allclose(res, np.kron(np.eye(2), -1j * qml.matrix(qml.PauliX(0))))
+
+
+class TestSchedule:
+    """Tests for the ``schedule`` function."""
+
+    def test_merge_rotations(self):
+        """Tests that consecutive rotations about the same axis are merged, and that
+        the angles are wrapped into (-1, 1]."""
+        circuit = [["X", 0.5, [0]], ["X", 0.75, [0]], ["Y", 0.1, [0]], ["Y", 0.2, [1]]]
+        assert schedule(circuit) == [["X", -0.75, [0]], ["Y", 0.1, [0]], ["Y", 0.2, [1]]]
+
+    def test_merge_r(self):
+        """Tests that R gates are only merged if they rotate about the same axis."""
+        circuit = [["R", 0.5, 0.25, [0]], ["R", 0.25, 0.25, [0]], ["R", 0.25, 0.5, [0]]]
+        assert schedule(circuit) == [["R", 0.75, 0.25, [0]], ["R", 0.25, 0.5, [0]]]
+
+    def test_merge_ms_through_x(self):
+        """Tests that MS gates on the same pair are merged through X rotations, but not
+        through other gates."""
+        circuit = [
+            ["MS", 0.5, [0, 1]],
+            ["X", 0.1, [0]],
+            ["MS", 0.25, [1, 0]],
+            ["Y", 0.1, [1]],
+            ["MS", 0.25, [0, 1]],
+        ]
+        res = schedule(circuit)
+
+        assert res == [
+            ["MS", 0.75, [0, 1]],
+            ["X", 0.1, [0]],
+            ["Y", 0.1, [1]],
+            ["MS", 0.25, [0, 1]],
+        ]
+
+    def test_remove_identities(self):
+        """Tests that gates cancelling each other are removed, allowing further merges."""
+        circuit = [["X", 0.3, [0]], ["Y", 0.5, [0]], ["Y", -0.5, [0]], ["X", 0.2, [0]]]
+        assert schedule(circuit) == [["X", 0.5, [0]]]
+
+    def test_cnot_pair_cancels(self):
+        """Tests that the MS gates of two consecutive CNOTs are merged."""
+        circuit = translate([qml.CNOT(wires=["a", "b"])] * 2, WIRE_MAP)
+        res = schedule(circuit)
+
+        assert [gate[0] for gate in res].count("MS") == 1
+        assert_equal_up_to_phase(circuit_matrix(res, [0, 1]), np.eye(4))
+
+    def test_layers(self):
+        """Tests that MS gates on disjoint wires are scheduled into the same layer, with
+        the single-qubit gates compacted between the layers."""
+        circuit = [
+            ["MS", 0.5, [0, 1]],
+            ["Y", 0.5, [1]],
+            ["MS", 0.5, [1, 2]],
+            ["Y", 0.5, [3]],
+            ["MS", 0.5, [3, 4]],
+        ]
+        res = schedule(circuit)
+
+        assert res == [
+            ["Y", 0.5, [3]],
+            ["MS", 0.5, [0, 1]],
+            ["MS", 0.5, [3, 4]],
+            ["Y", 0.5, [1]],
+            ["MS", 0.5, [1, 2]],
+        ]
+        assert estimate_resources(res, TestEstimateResources.DURATIONS)["two_qubit_depth"] == 2
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_circuits(self, seed):
+        """Tests that scheduling preserves the unitary of random circuits."""
+        circuit = random_circuit(60, 4, seed)
+        res = schedule(circuit)
+
+        assert len(res) <= len(circuit)
+        assert_equal_up_to_phase(circuit_matrix(circuit, range(4)), circuit_matrix(res, range(4)))
@@ -0,0 +1,154 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the cutting module"""
+import pytest
+
+import numpy as np
+
+from pennylane_aqt.compiler import circuit_matrix
+from pennylane_aqt.cutting import (
+    contract,
+    find_wire_cuts,
+    fragment_circuit,
+    fragment_tensor,
+    parity,
+)
+
+# two pairs of qubits, coupled by a single MS gate between wires 1 and 2
+CIRCUIT = [
+    ["R", 0.3, 0.1, [0]],
+    ["R", 0.6, -0.4, [1]],
+    ["R", -0.2, 0.7, [2]],
+    ["R", 0.8, 0.25, [3]],
+    ["MS", 0.3, [0, 1]],
+    ["MS", 0.4, [2, 3]],
+    ["R", 0.3, 0.2, [1]],
+    ["MS", 0.35, [1, 2]],
+    ["R", 0.7, 0.1, [2]],
+    ["MS", -0.2, [0, 1]],
+    ["MS", 0.25, [2, 3]],
+    ["Z", 0.3, [3]],
+]
+MASKS = [1, 2, 4, 8, 3, 6, 9, 15]
+
+
+def probabilities(circuit, num_qubits):
+    """The exact probabilities of a circuit, with qubit 0 in the least significant bit."""
+    return np.abs(circuit_matrix(circuit, list(reversed(range(num_qubits))))[:, 0]) ** 2
+
+
+def exact_expvals(circuit, num_qubits, masks):
+    """The exact expectation values of the Pauli Z words on the wires of the masks."""
+    indices = np.arange(2**num_qubits)
+    probs = probabilities(circuit, num_qubits)
+    return np.array(
+        [probs @ (1 - 2 * (np.bitwise_count(indices & m).astype(int) & 1)) for m in masks]
+    )
+
+
+def reconstruct(circuit, cuts, masks, shots=100000, seed=0):
+    """Reconstruct the expectation values of a cut circuit from sampled fragments."""
+    rng = np.random.default_rng(seed)
+    fragments = fragment_circuit(circuit, cuts)
+    tensors = []
+    for fragment in fragments:
+        samples = [
+            rng.choice(2**fragment.num_qubits, size=shots, p=probabilities(c, fragment.num_qubits))
+            for c in fragment.variants()
+        ]
+        tensors.append(fragment_tensor(fragment, samples, masks))
+    return contract(fragments, tensors, len(cuts))
+
+
+class TestFindWireCuts:
+    """Tests for the ``find_wire_cuts`` function."""
+
+    def test_no_cuts_needed(self):
+        """Tests that circuits fitting into a fragment are not cut."""
+        assert find_wire_cuts(CIRCUIT, 4) == []
+
+    def test_cuts(self):
+        """Tests that the circuit is cut at the fewest wires, with the fewest fragment
+        circuits."""
+        cuts = find_wire_cuts(CIRCUIT, 3)
+        assert cuts == [(1, 7), (1, 9)]
+
+        fragments = fragment_circuit(CIRCUIT, cuts)
+        assert [f.num_qubits for f in fragments] == [3, 3]
+
+    def test_impossible(self):
+        """Tests that an error is raised if the circuit cannot be cut into small enough
+        fragments."""
+        with pytest.raises(ValueError, match="cannot be cut into fragments of at most 2"):
+            find_wire_cuts(CIRCUIT, 2, max_cuts=2)
+
+
+class TestFragmentCircuit:
+    """Tests for the ``fragment_circuit`` function."""
+
+    def test_fragments(self):
+        """Tests the structure of the fragments, where wire 1 moves to the second fragment
+        for the MS gate with wire 2, and back."""
+        first, second = fragment_circuit(CIRCUIT, [(1, 7), (1, 9)])
+
+        assert first.inputs == [(1, 2)] and first.outputs == [(0, 1)]
+        assert first.wires == {0: 0, 1: 2}
+        assert first.circuit == [
+            ["R", 0.3, 0.1, [0]],
+            ["R", 0.6, -0.4, [1]],
+            ["MS", 0.3, [0, 1]],
+            ["R", 0.3, 0.2, [1]],
+            ["MS", -0.2, [0, 2]],
+        ]
+        assert second.inputs == [(0, 0)] and second.outputs == [(1, 0)]
+        assert second.wires == {2: 1, 3: 2}
+
+    def test_variants(self):
+        """Tests that the fragments are prepared in four states and measured in three bases
+        at their cuts."""
+        fragment = fragment_circuit(CIRCUIT, [(1, 7), (1, 9)])[0]
+        variants = fragment.variants()
+
+        assert len(variants) == 12
+        assert variants[0] == fragment.circuit
+        # |1> on the input, measured in the eigenbasis of X
+        assert variants[4] == [["X", 1.0, [2]], *fragment.circuit, ["Y", -0.5, [1]]]
+
+
+class TestReconstruction:
+    """Tests for the reconstruction of expectation values from fragments."""
+
+    def test_two_fragments(self):
+        """Tests that the expectation values of a circuit cut into two fragments match the
+        uncut circuit."""
+        res = reconstruct(CIRCUIT, [(1, 7), (1, 9)], MASKS)
+        assert np.allclose(res, exact_expvals(CIRCUIT, 4, MASKS), atol=0.03)
+
+    def test_cut_within_fragment(self):
+        """Tests that a cut whose segments end up in the same fragment is traced out."""
+        circuit = [["R", 0.3, 0.1, [0]], ["MS", 0.3, [0, 1]], ["R", 0.4, 0.6, [0]]]
+        circuit += [["MS", 0.7, [0, 1]]]
+        fragments = fragment_circuit(circuit, [(0, 3)])
+
+        assert len(fragments) == 1
+        # the downstream segment of wire 0 is placed on qubit 1
+        assert fragments[0].inputs == [(0, 1)] and fragments[0].outputs == [(0, 0)]
+        res = reconstruct(circuit, [(0, 3)], [1, 2, 3])
+        assert np.allclose(res, exact_expvals(circuit, 2, [1, 2, 3]), atol=0.03)
+
+
+def test_parity():
+    """Tests that the parity of the number of set bits is computed for 64-bit integers."""
+    values = np.array([0, 1, 3, 7, 2**40 + 1, 2**63 - 1], dtype=np.int64)
+    assert parity(values).tolist() == [0, 1, 0, 1, 0, 1]
@@ -13,15 +13,22 @@
 # limitations under the License.
 """Tests for the AQTDevice class"""
 import os
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import appdirs
 import requests
 
 import pennylane as qml
 import numpy as np
+from pennylane.devices import QubitDevice
 
 import pennylane_aqt.device
 from pennylane_aqt import ops
+from pennylane_aqt.compiler import circuit_matrix
 from pennylane_aqt.device import AQTDevice
 from pennylane_aqt.simulator import AQTSimulatorDevice, AQTNoisySimulatorDevice
 
@@ -56,6 +63,51 @@ REF_SAMPLES_111 = [7, 7, 7, 7, 7, 7, 7, 7, 7, 7]
 MOCK_SAMPLES = [1, 0, 1, 3, 0, 2, 0, 1, 0, 3]
 
 
+class SimulatingBackend:
+    """Replacement for ``submit`` that samples the submitted circuits from their exact
+    unitaries, and records the submitted circuits."""
+
+    class Response:
+        def __init__(self, job):
+            self.status_code = 200
+            self.job = job
+
+        def json(self):
+            return self.job
+
+    def __init__(self, num_wires, seed=42):
+        self.num_wires = num_wires
+        self.rng = np.random.default_rng(seed)
+        self.circuits = []
+
+    def __call__(self, method, url, request, headers, compress=False):
+        circuit = json.loads(request["data"])
+        self.circuits.append(circuit)
+
+        # AQT encodes the state of wire 0 in the least significant bit
+        wire_order = list(reversed(range(self.num_wires)))
+        probs = np.abs(circuit_matrix(circuit, wire_order)[:, 0]) ** 2
+        samples = self.rng.choice(len(probs), size=request["repetitions"], p=probs / sum(probs))
+        return self.Response({"id": len(self.circuits), "status": "finished", "samples": samples})
+
+
+def patch_submit(monkeypatch, backend, record=None, delay=0.0):
+    """Patch ``submit`` with a backend, and return the list of the values of the ``record``
+    field of the submitted jobs. With a ``delay``, the backend answers after that many
+    seconds, such that the jobs of concurrent executions interleave."""
+    recorded = []
+
+    def submit(method, url, request, headers, compress=False):
+        if record is not None:
+            recorded.append(request[record])
+        if delay:
+            time.sleep(delay)
+        return backend(method, url, request, headers, compress)
+
+    monkeypatch.setattr(pennylane_aqt.device, "submit", submit)
+    return recorded
+
+
 class TestAQTDevice:
     """Tests for the AQTDevice base class."""
 
@@ -152,6 +204,46 @@ class TestAQTDevice:
         res = dev.serialize(circuit)
         assert res == expected
 
+    def test_serialize_precision(self):
+        """Tests that the parameters are rounded and the whitespace is removed if a
+        precision is given."""
+        circuit = [["X", 1 / 3, [1]], ["R", 0.1 + 0.2, -1e-9, [0]], ["MS", 0.5, [0, 1]]]
+        res = AQTDevice.serialize(circuit, precision=4)
+        assert res == '[["X",0.3333,[1]],["R",0.3,0.0,[0]],["MS",0.5,[0,1]]]'
+
+    def test_invalid_precision(self):
+        """Tests that a negative precision raises an error."""
+        with pytest.raises(ValueError, match="The precision must be non-negative"):
+            AQTDevice(2, api_key=SOME_API_KEY, precision=-1)
+
+    def test_compressed_rounded_submission(self, monkeypatch):
+        """Tests that the device submits rounded circuits, compressed if requested, and
+        that the estimated payload size accounts for both."""
+        backend = SimulatingBackend(2)
+        calls = []
+
+        def submit(*args, **kwargs):
+            calls.append(kwargs)
+            return backend(*args, **kwargs)
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", submit)
+        gates = [qml.RX(0.1 * i, wires=i % 2) for i in range(1, 200)]
+        tape = qml.tape.QuantumScript(gates, [qml.expval(qml.PauliZ(0))], shots=10)
+
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+        dev_compact = AQTDevice(2, shots=10, api_key=SOME_API_KEY, compress=True, precision=6)
+        dev.apply(gates)
+        dev_compact.apply(gates)
+
+        assert calls == [{"compress": False}, {"compress": True}]
+        assert dev_compact.circuit_json == AQTDevice.serialize(dev.circuit, 6)
+        assert np.allclose(
+            [g[1] for g in json.loads(dev_compact.circuit_json)],
+            [g[1] for g in dev.circuit],
+            atol=1e-6,
+        )
+        assert dev_compact.estimate(tape)["payload_size"] < dev.estimate(tape)["payload_size"] / 2
+
     @pytest.mark.parametrize(
         "samples, indices",
         [
@@ -362,7 +454,7 @@ class TestAQTDevice:
             (qml.RY, [1.3], [1], [["Y", -1.3 / np.pi, [1]]]),
             (qml.RZ, [2.2], [0], [["Z", -2.2 / np.pi, [0]]]),
             (ops.MS, [0.1], [0, 1], [["MS", -0.1, [0, 1]]]),
-            (ops.R, [0.3, 0.4], [0], [["R", -0.3, -0.4, [0]]]),
+            (ops.R, [0.3, 0.4], [0], [["R", -0.3, 0.4, [0]]]),
             (qml.BasisState, [np.array([1, 1])], [0, 1], [["X", 1.0, [0]], ["X", 1.0, [1]]]),
             (qml.BasisState, [np.array([0, 1])], [0, 1], [["X", 1.0, [1]]]),
         ],
@@ -403,6 +495,142 @@ class TestAQTDevice:
 
         assert dev.circuit == [["R", par0, par1, wires]]
 
+    def test_operations_cached(self):
+        """Tests that the supported operations are precomputed once per class."""
+
+        dev1 = AQTDevice(1, api_key=SOME_API_KEY)
+        dev2 = AQTDevice(2, api_key=SOME_API_KEY)
+
+        assert isinstance(dev1.operations, frozenset)
+        assert dev1.operations is dev2.operations
+        assert dev1.operations == set(AQTDevice._operation_map)
+        assert dev1._native_names == {"RX": "X", "RY": "Y", "RZ": "Z", "R": "R", "MS": "MS"}
+
+        with pytest.raises(TypeError):
+            dev1._operation_map["Toffoli"] = None
+
+    def test_subclass_operation_map(self):
+        """Tests that subclasses overriding the operation map get their own
+        capability structures."""
+
+        class RestrictedDevice(AQTDevice):
+            _operation_map = {"RX": "X", "MS": "MS"}
+
+        dev = RestrictedDevice(2, api_key=SOME_API_KEY)
+
+        assert dev.operations == {"RX", "MS"}
+        assert set(dev._decompositions) == {"RX", "MS"}
+        assert AQTDevice._supported_operations != dev.operations
+
+        with pytest.raises(qml.exceptions.DeviceError, match="CNOT is not supported"):
+            dev._apply_operation(qml.CNOT(wires=[0, 1]))
+
+    def test_subclass_operation_without_decomposition(self):
+        """Tests that an exception is raised when a subclass declares support for an
+        operation without a known decomposition."""
+
+        with pytest.raises(ValueError, match="No decomposition into AQT-native gates"):
+
+            class BadDevice(AQTDevice):  # pylint: disable=unused-variable
+                _operation_map = {"RX": "X", "Toffoli": None}
+
+    def test_estimate(self):
+        """Tests that ``estimate`` reports the resources of the compiled tape without
+        submitting it."""
+
+        dev = AQTDevice(2, shots=100, api_key=SOME_API_KEY)
+        tape = qml.tape.QuantumScript([qml.CNOT(wires=[0, 1])], [qml.expval(qml.PauliX(1))])
+
+        res = dev.estimate(tape)
+
+        # the diagonalizing Hadamard adds one X and one Y gate to the CNOT decomposition
+        assert res["gate_counts"] == {"X": 3, "Y": 3, "Z": 0, "R": 0, "MS": 1}
+        assert res["num_gates"] == 7
+        assert res["two_qubit_depth"] == 1
+        assert res["shots"] == 100
+        assert np.isclose(res["shot_duration"], 20e-6 + 250e-6 + 3 * 20e-6 + 1.5e-3)
+        assert np.isclose(res["duration"], 100 * res["shot_duration"])
+        assert res["payload_size"] > len(dev.serialize(dev.compile(tape.operations)))
+        assert dev.circuit == []
+
+    def test_estimate_expands_tape(self):
+        """Tests that ``estimate`` decomposes operations not supported by the device."""
+
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+        tape = qml.tape.QuantumScript([qml.SWAP(wires=[0, 1])], [qml.expval(qml.PauliZ(0))])
+
+        res = dev.estimate(tape)
+
+        assert res["gate_counts"]["MS"] == 3
+        assert res["two_qubit_depth"] == 3
+
+    def test_estimate_custom_gate_durations(self):
+        """Tests that the gate durations used by ``estimate`` can be configured, and that
+        the total duration is unknown without shots."""
+
+        dev = AQTDevice(2, api_key=SOME_API_KEY, gate_durations={"MS": 1.0, "measure": 0.0})
+        tape = qml.tape.QuantumScript([ops.MS(0.5, wires=[0, 1]), ops.MS(0.5, wires=[0, 1])])
+
+        res = dev.estimate(tape)
+
+        assert dev.gate_durations["X"] == AQTDevice.GATE_DURATIONS["X"]
+        assert res["shot_duration"] == 2.0
+        assert res["shots"] is None
+        assert res["duration"] is None
+
+    @pytest.mark.parametrize(
+        "op",
+        [
+            qml.U2(0.1, 0.2, wires=0),
+            qml.U3(0.1, 0.2, 0.3, wires=0),
+            qml.CZ(wires=[0, 1]),
+            qml.CY(wires=[0, 1]),
+            qml.CRX(0.3, wires=[0, 1]),
+            qml.CRY(0.3, wires=[0, 1]),
+            qml.CRZ(0.3, wires=[0, 1]),
+            qml.IsingXX(0.3, wires=[0, 1]),
+            qml.IsingZZ(0.3, wires=[0, 1]),
+            qml.ControlledPhaseShift(0.3, wires=[0, 1]),
+            qml.SWAP(wires=[0, 1]),
+        ],
+    )
+    def test_native_lowering_shorter_than_generic(self, op):
+        """Tests that operations lowered directly to native gates compile to shorter
+        circuits than with the generic PennyLane decompositions."""
+
+        basic = ["BasisState", "PauliX", "PauliY", "PauliZ", "Hadamard", "S", "CNOT"]
+        basic += ["RX", "RY", "RZ", "R", "MS"]
+        basic += [f"Adjoint({name})" for name in basic]
+
+        class GenericDevice(AQTDevice):
+            _operation_map = {
+                name: native
+                for name, native in AQTDevice._operation_map.items()
+                if name in basic
+            }
+
+        tape = qml.tape.QuantumScript([op], shots=10)
+        native = AQTDevice(2, api_key=SOME_API_KEY).estimate(tape)
+        generic = GenericDevice(2, api_key=SOME_API_KEY).estimate(tape)
+
+        assert native["num_gates"] < generic["num_gates"]
+        assert native["gate_counts"]["MS"] <= generic["gate_counts"]["MS"]
+
+    def test_compile_optimize(self):
+        """Tests that circuits are scheduled and merged if the device optimizes them."""
+
+        operations = [qml.CNOT(wires=[0, 1]), qml.CNOT(wires=[0, 1]), qml.CNOT(wires=[2, 3])]
+        dev = AQTDevice(4, api_key=SOME_API_KEY)
+        opt_dev = AQTDevice(4, api_key=SOME_API_KEY, optimize=True)
+
+        circuit = dev.compile(operations)
+        optimized = opt_dev.compile(operations)
+
+        assert len(optimized) < len(circuit)
+        tape = qml.tape.QuantumScript(operations, shots=10)
+        assert opt_dev.estimate(tape)["two_qubit_depth"] == 1
+        assert dev.estimate(tape)["two_qubit_depth"] == 2
+
     def test_unsupported_operation_exception(self):
         """Tests whether an exception is raised if an unsupported operation
         is attempted to be appended to queue."""
@@ -424,7 +652,8 @@ class TestAQTDeviceIntegration:
         dev = qml.device("aqt.sim", wires=num_wires, api_key=SOME_API_KEY)
 
         assert dev.num_wires == num_wires
-        # Due to the deprecation of device.shots, the following two properties (shots, analytic) should be changed.
+        # Due to the deprecation of device.shots, the following two properties (shots, analytic)
+        # should be changed.
         assert dev.shots.total_shots is None
         assert dev.analytic == True
         assert dev.circuit == []
@@ -482,7 +711,8 @@ class TestAQTDeviceIntegration:
         monkeypatch.setattr("os.curdir", tmpdir.join("folder_without_a_config_file"))
 
         c = qml.Configuration("config.toml")
-        monkeypatch.setattr("pennylane.devices.device_constructor.default_config", c)  # force loading of config
+        # force loading of config
+        monkeypatch.setattr("pennylane.devices.device_constructor.default_config", c)
 
         dev = qml.device("aqt.sim", wires=2)
 
@@ -539,7 +769,10 @@ class TestAQTDeviceIntegration:
         class MockResponse:
             def __init__(self):
                 self.status_code = 200
-                self.mock_json1 = {"id": "8c05f8aa-513d-4a04-b3ec-05f3a4c53fb6", "status": "queued"}
+                self.mock_json1 = {
+                    "id": "8c05f8aa-513d-4a04-b3ec-05f3a4c53fb6",
+                    "status": "queued",
+                }
                 self.mock_json2 = {"samples": MOCK_SAMPLES, "status": "finished"}
                 self.num_calls = 0
 
@@ -609,11 +842,11 @@ class TestAQTSimulatorDevices:
         assert API_HEADER_KEY in dev.header.keys()
         assert dev.header[API_HEADER_KEY] == SOME_API_KEY
 
-    @pytest.mark.skip("API key needs to be inputted")
-    def test_simulator_cnot(self):
+    def test_simulator_cnot(self, aqt_server):
         """Test that the CNOT operation is decomposed correctly."""
-        dev = qml.device("aqt.sim", wires=2, api_key="<Insert API Key here>")
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
 
+        @qml.set_shots(100)
         @qml.qnode(dev)
         def circuit():
             qml.CNOT(wires=[0, 1])
@@ -621,11 +854,11 @@ class TestAQTSimulatorDevices:
 
         assert circuit() == 1
 
-    @pytest.mark.skip("API key needs to be inputted")
-    def test_too_many_shots_for_aqt(self):
+    def test_too_many_shots_for_aqt(self, aqt_server):
         """Test >200 shots is invalid with AQT."""
-        dev = qml.device("aqt.sim", wires=2, api_key="<Insert API Key here>", shots=201)
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
 
+        @qml.set_shots(201)
         @qml.qnode(dev)
         def circuit():
             qml.CNOT(wires=[0, 1])
@@ -633,3 +866,1111 @@ class TestAQTSimulatorDevices:
 
         with pytest.raises(requests.HTTPError, match="Invalid number of repetitions provided!"):
             circuit()
+
+
+class TestBroadcasting:
+    """Tests for executing broadcasted tapes on AQT devices."""
+
+    def test_broadcasted_expval(self, monkeypatch):
+        """Tests that a broadcasted tape is executed as one job per parameter set, and that
+        the results keep the broadcasting dimension."""
+        backend = SimulatingBackend(2)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
+
+        @qml.set_shots(20)
+        @qml.qnode(dev)
+        def circuit(x):
+            qml.RX(x, wires=0)
+            qml.CNOT(wires=[0, 1])
+            return qml.expval(qml.PauliZ(1))
+
+        res = circuit(np.array([0.0, np.pi, 0.0, np.pi]))
+
+        assert np.allclose(res, [1, -1, 1, -1])
+        assert len(backend.circuits) == 4
+        # the tape is executed by the device, instead of being split by PennyLane
+        assert dev.target_device.capabilities()["supports_broadcasting"]
+        assert len(dev.samples) == 4
+        assert [[g[0] for g in c] for c in backend.circuits[1:]] == [
+            [g[0] for g in backend.circuits[0]]
+        ] * 3
+
+    def test_broadcasted_multiple_measurements(self, monkeypatch):
+        """Tests broadcasted tapes with several measurements and broadcasted samples."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", SimulatingBackend(2))
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
+
+        @qml.set_shots(10)
+        @qml.qnode(dev)
+        def circuit(x, y):
+            qml.RX(x, wires=0)
+            qml.RY(y, wires=1)
+            return qml.probs(wires=[0, 1]), qml.sample(qml.PauliZ(0))
+
+        probs, samples = circuit(np.array([0.0, np.pi, np.pi]), np.array([np.pi, 0.0, np.pi]))
+
+        assert np.allclose(probs, [[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+        assert np.allclose(samples, np.outer([1, -1, -1], np.ones(10)))
+
+    def test_jobs_submitted_concurrently(self, monkeypatch):
+        """Tests that the jobs of a broadcasted tape are submitted concurrently."""
+        backend = SimulatingBackend(1)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def submit(*args, **kwargs):
+            barrier.wait()
+            return backend(*args, **kwargs)
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", submit)
+        dev = AQTDevice(1, shots=5, api_key=SOME_API_KEY)
+        dev.apply([qml.RY(np.array([0.1, 0.2, 0.3]), wires=0)])
+
+        assert len(dev.samples) == 3
+        assert len(dev.circuit) == 3
+        assert dev.generate_samples().shape == (3, 5, 1)
+
+
+class TestSampleCodeEstimators:
+    """Tests for the estimators computed directly from the integer samples returned by AQT."""
+
+    @pytest.fixture
+    def dev(self):
+        """A device holding random samples, together with the bits unpacked from them."""
+        dev = AQTDevice(3, shots=40, api_key=SOME_API_KEY)
+        dev.samples = np.random.default_rng(0).integers(0, 8, size=40).tolist()
+        dev._samples = dev.generate_samples()
+        return dev
+
+    @pytest.mark.parametrize(
+        "obs",
+        [
+            qml.PauliZ(0),
+            qml.PauliZ(2),
+            qml.PauliZ(0) @ qml.PauliZ(1),
+            qml.PauliZ(0) @ qml.PauliZ(1) @ qml.PauliZ(2),
+            -0.5 * qml.PauliZ(1) @ qml.PauliZ(2),
+            qml.Identity(1),
+        ],
+    )
+    def test_pauli_words(self, dev, obs):
+        """Tests that expectation values and variances of Pauli words agree with the
+        estimators computed from the unpacked samples."""
+        assert np.allclose(dev.expval(obs), QubitDevice.expval(dev, obs))
+        assert np.allclose(dev.var(obs), QubitDevice.var(dev, obs))
+
+    @pytest.mark.parametrize("wires", [None, [0], [2], [2, 0], [1, 2]])
+    def test_marginal_probabilities(self, dev, wires):
+        """Tests that marginal probabilities agree with those of the unpacked samples."""
+        assert np.allclose(
+            dev.estimate_probability(wires), QubitDevice.estimate_probability(dev, wires)
+        )
+
+    def test_shot_range_and_bins(self, dev):
+        """Tests the estimators on ranges of shots split into bins."""
+        obs = qml.PauliZ(0) @ qml.PauliZ(2)
+        kwargs = {"shot_range": [10, 40], "bin_size": 10}
+
+        assert np.allclose(dev.expval(obs, **kwargs), QubitDevice.expval(dev, obs, **kwargs))
+        assert np.allclose(dev.var(obs, **kwargs), QubitDevice.var(dev, obs, **kwargs))
+        assert np.allclose(
+            dev.estimate_probability([1, 0], **kwargs),
+            QubitDevice.estimate_probability(dev, [1, 0], **kwargs),
+        )
+
+    def test_broadcasted_samples(self, dev):
+        """Tests the estimators on the samples of broadcasted executions."""
+        dev.samples = np.random.default_rng(1).integers(0, 8, size=(3, 40)).tolist()
+        dev._samples = dev.generate_samples()
+        obs = qml.PauliZ(1) @ qml.PauliZ(2)
+
+        assert np.allclose(dev.expval(obs), QubitDevice.expval(dev, obs))
+        assert np.allclose(
+            dev.estimate_probability([2, 1]), QubitDevice.estimate_probability(dev, [2, 1])
+        )
+
+    def test_statistics_single_pass(self, dev, monkeypatch):
+        """Tests that the Pauli words of a tape are estimated in a single pass, and that
+        other observables fall back to the unpacked samples."""
+        hermitian = qml.Hermitian(np.diag([1.0, 2.0]), wires=1)
+        tape = qml.tape.QuantumScript(
+            [],
+            [
+                qml.expval(qml.PauliZ(0)),
+                qml.var(qml.PauliZ(0) @ qml.PauliZ(1)),
+                qml.expval(2.0 * qml.PauliZ(0)),
+                qml.expval(hermitian),
+            ],
+            shots=40,
+        )
+        calls = []
+        parity_means = dev._parity_means
+        monkeypatch.setattr(
+            dev, "_parity_means", lambda *args: calls.append(args) or parity_means(*args)
+        )
+
+        res = dev.statistics(tape)
+
+        assert len(calls) == 1
+        assert np.allclose(
+            res,
+            [
+                QubitDevice.expval(dev, qml.PauliZ(0)),
+                QubitDevice.var(dev, qml.PauliZ(0) @ qml.PauliZ(1)),
+                2 * QubitDevice.expval(dev, qml.PauliZ(0)),
+                QubitDevice.expval(dev, hermitian),
+            ],
+        )
+        assert dev._parity_cache == {}
+
+    def test_shot_vector_integration(self, monkeypatch):
+        """Tests that shot vectors give the same results as the unpacked samples."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", SimulatingBackend(2))
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
+
+        @qml.set_shots([(10, 3)])
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=1)
+            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1)), qml.probs(wires=[1])
+
+        res = circuit()
+
+        assert len(res) == 3
+        for expval, probs in res:
+            assert np.allclose(expval, -1)
+            assert np.allclose(probs, [0, 1])
+
+    def test_samples_unpacked_only_if_needed(self, monkeypatch):
+        """Tests that the samples are only unpacked into bits for measurements that are
+        not estimated from the integer samples."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", SimulatingBackend(2))
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+        ops = [qml.PauliX(wires=1)]
+
+        tape = qml.tape.QuantumScript(
+            ops, [qml.expval(qml.PauliZ(1)), qml.var(qml.PauliZ(0)), qml.probs([1])], shots=10
+        )
+        expval, var, probs = dev.execute(tape)
+        assert np.allclose([expval, var], [-1, 0])
+        assert np.allclose(probs, [0, 1])
+        assert dev._samples is None
+
+        dev.reset()
+        tape = qml.tape.QuantumScript(ops, [qml.expval(qml.PauliZ(1)), qml.sample()], shots=10)
+        expval, samples = dev.execute(tape)
+        assert np.allclose(expval, -1)
+        assert np.array_equal(samples, np.tile([0, 1], (10, 1)))
+        assert dev._samples.shape == (10, 2)
+
+
+class TestResultCache:
+    """Tests for the opt-in LRU cache of job results."""
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Tests that repeated circuits are resubmitted if the cache is disabled."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY)
+
+        for _ in range(2):
+            dev.reset()
+            dev.apply([qml.RX(0.5, wires=0)])
+
+        assert len(backend.circuits) == 2
+        assert dev.cache_hits == dev.cache_misses == 0
+
+    def test_repeated_circuit(self, monkeypatch):
+        """Tests that a repeated circuit returns the cached samples without a new job."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY, cache_size=4)
+
+        dev.apply([qml.RX(0.5, wires=0)])
+        samples = dev.samples
+        dev.reset()
+        dev.apply([qml.RX(0.5, wires=0)])
+
+        assert dev.samples is samples
+        assert len(backend.circuits) == 1
+        assert (dev.cache_hits, dev.cache_misses) == (1, 1)
+
+    def test_key_includes_shots(self, monkeypatch):
+        """Tests that the same circuit with a different number of shots is resubmitted."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY, cache_size=4)
+
+        dev.apply([qml.RX(0.5, wires=0)])
+        dev.reset()
+        dev.shots = 20
+        dev.apply([qml.RX(0.5, wires=0)])
+
+        assert len(dev.samples) == 20
+        assert len(backend.circuits) == 2
+        assert dev.cache_misses == 2
+
+    def test_least_recently_used_evicted(self, monkeypatch):
+        """Tests that the least recently used result is evicted once the cache is full."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY, cache_size=2)
+
+        for x in [0.1, 0.2, 0.1, 0.3, 0.1, 0.2]:
+            dev.reset()
+            dev.apply([qml.RX(x, wires=0)])
+
+        # 0.2 is evicted by 0.3, since 0.1 was used more recently
+        assert len(backend.circuits) == 4
+        assert (dev.cache_hits, dev.cache_misses) == (2, 4)
+        assert len(dev._cache) == 2
+
+    def test_clear_cache(self, monkeypatch):
+        """Tests that clearing the cache removes the results and resets the counters."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY, cache_size=2)
+
+        dev.apply([qml.RX(0.5, wires=0)])
+        dev.clear_cache()
+        dev.reset()
+        dev.apply([qml.RX(0.5, wires=0)])
+
+        assert len(backend.circuits) == 2
+        assert (dev.cache_hits, dev.cache_misses) == (0, 1)
+
+    def test_qnode_gradient_reuses_results(self, monkeypatch):
+        """Tests that a QNode evaluated again at the same point is served from the cache."""
+        backend = SimulatingBackend(1)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY, cache_size=8)
+
+        @qml.set_shots(10)
+        @qml.qnode(dev)
+        def circuit(x):
+            qml.RX(x, wires=0)
+            return qml.expval(qml.PauliZ(0))
+
+        first = circuit(0.4)
+        assert circuit(0.4) == first
+        assert len(backend.circuits) == 1
+        assert dev.cache_hits == 1
+
+
+class TestWireCompaction:
+    """Tests for submitting circuits on their active wires only."""
+
+    def test_compacted_submission(self, monkeypatch):
+        """Tests that a circuit is submitted on its active wires, and that the samples are
+        expanded back to the device wires."""
+        requests_sent = []
+
+        def submit(method, url, request, headers, compress=False):
+            requests_sent.append(request)
+            circuit = json.loads(request["data"])
+            samples = [1] * request["repetitions"] if circuit else [0] * request["repetitions"]
+            return SimulatingBackend.Response({"id": 0, "status": "finished", "samples": samples})
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", submit)
+        dev = AQTDevice(6, shots=5, api_key=SOME_API_KEY, compact=True)
+        dev.apply([qml.PauliX(wires=4)])
+
+        assert requests_sent[0]["no_qubits"] == 1
+        assert all(g[-1] == [0] for g in json.loads(dev.circuit_json))
+        assert all(g[-1] == [4] for g in dev.circuit)
+        assert dev.samples == [16] * 5
+
+    def test_compaction_disabled(self, monkeypatch):
+        """Tests that all device wires are submitted if compaction is disabled."""
+        backend = SimulatingBackend(4)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(4, shots=5, api_key=SOME_API_KEY, compact=False)
+        dev.apply([qml.PauliX(wires=2)])
+
+        assert json.loads(dev.circuit_json) == dev.circuit
+        assert np.array_equal(dev.samples, [4] * 5)
+
+    @pytest.mark.parametrize(
+        "device_class, compact",
+        [(AQTDevice, False), (AQTSimulatorDevice, True), (AQTNoisySimulatorDevice, False)],
+    )
+    def test_compaction_default(self, device_class, compact):
+        """Tests that circuits are compacted by default on the ideal simulator only, such
+        that they keep their physical qubits on noisy backends."""
+        assert device_class(2, api_key=SOME_API_KEY).compact == compact
+        assert device_class(2, api_key=SOME_API_KEY, compact=not compact).compact != compact
+
+    def test_results_on_mock_server(self, aqt_server):
+        """Tests the results of a circuit on a few wires of a large device."""
+        dev = qml.device("aqt.sim", wires=11, api_key=SOME_API_KEY)
+
+        @qml.set_shots(50)
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=7)
+            qml.CNOT(wires=[7, 2])
+            return qml.probs(wires=[2, 5, 7]), qml.expval(qml.PauliZ(2) @ qml.PauliZ(3))
+
+        probs, expval = circuit()
+
+        assert np.allclose(probs, np.eye(8)[5])
+        assert np.isclose(expval, -1)
+        assert {job.num_wires for job in aqt_server.jobs.values()} == {2}
+
+    def test_estimate_payload(self):
+        """Tests that the estimated payload accounts for the compacted circuit."""
+        tape = qml.tape.QuantumScript([qml.RX(0.5, wires=3)], [qml.expval(qml.PauliZ(3))])
+        dev = AQTDevice(11, shots=10, api_key=SOME_API_KEY, compact=True)
+        dev_full = AQTDevice(11, shots=10, api_key=SOME_API_KEY)
+
+        assert dev.estimate(tape)["payload_size"] < dev_full.estimate(tape)["payload_size"]
+
+
+class TestMultiplexing:
+    """Tests for packing the circuits of a batch onto disjoint wires of shared jobs."""
+
+    @staticmethod
+    def bell_tape(x, wires=(0, 1)):
+        """A tape preparing a rotated Bell state on two wires."""
+        ops = [qml.RY(x, wires=wires[0]), qml.CNOT(wires=wires)]
+        measurements = [qml.expval(qml.PauliZ(wires[1])), qml.probs(wires=wires)]
+        return qml.tape.QuantumScript(ops, measurements, shots=100)
+
+    def test_batch_packed_into_jobs(self, aqt_server):
+        """Tests that a batch of two-qubit circuits is executed in few wide jobs."""
+        dev = qml.device("aqt.sim", wires=6, api_key=SOME_API_KEY, multiplex=True)
+        tapes = [self.bell_tape(x) for x in [0.0, np.pi, 0.0, np.pi, 0.0]]
+
+        res = qml.execute(tapes, dev)
+
+        assert sorted(job.num_wires for job in aqt_server.jobs.values()) == [4, 6]
+        for (expval, probs), x in zip(res, [0.0, np.pi, 0.0, np.pi, 0.0]):
+            assert np.isclose(expval, np.cos(x))
+            assert np.allclose(probs, [np.cos(x / 2) ** 2, 0, 0, np.sin(x / 2) ** 2])
+
+    def test_samples_of_each_circuit(self, monkeypatch):
+        """Tests that the samples of the circuits are split from their jobs and expanded
+        to the wires of the circuits."""
+        backend = SimulatingBackend(4)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(4, shots=10, api_key=SOME_API_KEY, multiplex=True)
+
+        tapes = [
+            qml.tape.QuantumScript([qml.PauliX(2)], [qml.sample(wires=[0, 1, 2, 3])], shots=10),
+            qml.tape.QuantumScript([qml.PauliX(3)], [qml.sample(wires=[2, 3])], shots=10),
+            qml.tape.QuantumScript([qml.PauliX(0), qml.PauliX(1)], [qml.counts()], shots=10),
+        ]
+        res = dev.batch_execute(tapes)
+
+        assert len(backend.circuits) == 1
+        assert np.array_equal(res[0], np.tile([0, 0, 1, 0], (10, 1)))
+        assert np.array_equal(res[1], np.tile([0, 1], (10, 1)))
+        assert res[2] == {"1100": 10}
+        assert dev._multiplexed == deque()
+
+    def test_budget(self, monkeypatch):
+        """Tests that the jobs do not exceed the qubit budget, and that circuits are
+        assigned to the first job with enough free qubits."""
+        backend = SimulatingBackend(6)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = AQTDevice(6, shots=10, api_key=SOME_API_KEY, multiplex=True, multiplex_qubits=4)
+
+        tapes = [
+            self.bell_tape(0.1, wires=(0, 1)),
+            qml.tape.QuantumScript([qml.RX(0.2, 0), qml.CNOT([0, 1]), qml.CNOT([1, 2])], [], 10),
+            self.bell_tape(0.3, wires=(4, 5)),
+            qml.tape.QuantumScript([qml.RX(0.4, 3)], [qml.expval(qml.PauliZ(3))], shots=10),
+        ]
+        dev.batch_execute(tapes)
+
+        widths = sorted(1 + max(w for gate in c for w in gate[-1]) for c in backend.circuits)
+        assert widths == [4, 4]
+
+    def test_broadcasted_and_disabled(self, monkeypatch):
+        """Tests that broadcasted circuits are not multiplexed, and that circuits are
+        submitted separately by default."""
+        backend = SimulatingBackend(4)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        tapes = [
+            self.bell_tape(np.array([0.1, 0.2])),
+            self.bell_tape(0.3),
+            self.bell_tape(0.4, wires=(2, 3)),
+        ]
+
+        AQTDevice(4, shots=10, api_key=SOME_API_KEY, multiplex=True).batch_execute(tapes)
+        assert len(backend.circuits) == 3
+
+        AQTDevice(4, shots=10, api_key=SOME_API_KEY).batch_execute(tapes)
+        assert len(backend.circuits) == 7
+
+
+class NoisyReadoutBackend(SimulatingBackend):
+    """Replacement for ``submit`` that flips each sampled bit of qubit ``q`` from 0 to 1 with
+    probability ``flips[q][0]``, and from 1 to 0 with probability ``flips[q][1]``."""
+
+    def __init__(self, num_wires, flips, seed=42):
+        super().__init__(num_wires, seed)
+        self.flips = np.asarray(flips)
+
+    def __call__(self, method, url, request, headers, compress=False):
+        response = super().__call__(method, url, request, headers, compress)
+        samples = np.asarray(response.job["samples"])
+        num_qubits = request["no_qubits"]
+
+        bits = (samples[:, None] >> np.arange(num_qubits)) & 1
+        flip_probs = np.where(bits, self.flips[:num_qubits, 1], self.flips[:num_qubits, 0])
+        bits ^= self.rng.random(bits.shape) < flip_probs
+        response.job["samples"] = (bits << np.arange(num_qubits)).sum(axis=1).tolist()
+        return response
+
+
+class TestReadoutMitigation:
+    """Tests for the mitigation of readout errors."""
+
+    FLIPS = [[0.05, 0.1], [0.1, 0.2], [0.02, 0.15]]
+
+    def test_mitigated_expvals_and_probs(self, monkeypatch):
+        """Tests that mitigation removes the bias of readout errors."""
+        monkeypatch.setattr(
+            pennylane_aqt.device, "submit", NoisyReadoutBackend(3, self.FLIPS, seed=1)
+        )
+
+        def circuit(dev):
+            @qml.set_shots(4000)
+            @qml.qnode(dev)
+            def _circuit():
+                qml.PauliX(wires=1)
+                qml.Hadamard(wires=2)
+                return (
+                    qml.expval(qml.PauliZ(0) @ qml.PauliZ(1)),
+                    qml.var(qml.PauliZ(1)),
+                    qml.probs(wires=[1, 0]),
+                )
+
+            return _circuit()
+
+        raw = circuit(qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY, compact=False))
+        dev = qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY, readout_mitigation=True)
+        expval, var, probs = circuit(dev)
+
+        assert not np.isclose(raw[0], -1, atol=0.1)
+        assert np.isclose(expval, -1, atol=0.05)
+        assert np.isclose(var, 0, atol=0.1)
+        assert np.allclose(probs, [0, 0, 1, 0], atol=0.05)
+        assert np.allclose(dev.readout_calibration.matrices[:, 1, 0], [0.05, 0.1, 0.02], atol=0.02)
+
+    def test_calibration_reused(self, monkeypatch):
+        """Tests that the calibration jobs are submitted once, until the calibration expires."""
+        backend = NoisyReadoutBackend(2, self.FLIPS)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        tape = qml.tape.QuantumScript([qml.PauliX(0)], [qml.expval(qml.PauliZ(0))], shots=50)
+
+        dev = AQTDevice(2, shots=50, api_key=SOME_API_KEY, readout_mitigation=True)
+        dev.batch_execute([tape, tape])
+        assert len(backend.circuits) == 2 + 2
+
+        dev.readout_calibration_ttl = 0.0
+        dev._readout_calibration.timestamp -= 1
+        dev.batch_execute([tape])
+        assert len(backend.circuits) == 4 + 3
+
+    def test_idle_wires_not_corrected(self, monkeypatch):
+        """Tests that wires that were not submitted are not corrected."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", NoisyReadoutBackend(3, self.FLIPS))
+        dev = AQTDevice(3, shots=100, api_key=SOME_API_KEY, readout_mitigation=True, compact=True)
+        dev.apply([qml.PauliX(wires=0)])
+
+        assert np.allclose(dev.estimate_probability(wires=[2]), [1, 0])
+        assert np.allclose(dev._readout_inverses()[1:], np.eye(2))
+        assert not np.allclose(dev._readout_inverses()[0], np.eye(2))
+
+    def test_broadcasted_and_binned(self, monkeypatch):
+        """Tests mitigation of broadcasted executions and of shot vectors."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", NoisyReadoutBackend(2, self.FLIPS))
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY, readout_mitigation=True)
+
+        @qml.set_shots([(3000, 2)])
+        @qml.qnode(dev)
+        def circuit(x):
+            qml.RX(x, wires=0)
+            qml.CNOT(wires=[0, 1])
+            return qml.expval(qml.PauliZ(1)), qml.probs(wires=[0])
+
+        for expval, probs in circuit(np.array([0.0, np.pi])):
+            assert np.allclose(expval, [1, -1], atol=0.06)
+            assert np.allclose(probs, [[1, 0], [0, 1]], atol=0.05)
+
+
+class DepolarizingMSBackend(SimulatingBackend):
+    """Replacement for ``submit`` that depolarizes the state with probability ``p`` after
+    every MS gate, such that the measured distribution is mixed with the uniform one."""
+
+    def __init__(self, num_wires, p, seed=42):
+        super().__init__(num_wires, seed)
+        self.p = p
+
+    def __call__(self, method, url, request, headers, compress=False):
+        circuit = json.loads(request["data"])
+        self.circuits.append(circuit)
+
+        num_qubits = request["no_qubits"]
+        probs = np.abs(circuit_matrix(circuit, list(reversed(range(num_qubits))))[:, 0]) ** 2
+        fidelity = (1 - self.p) ** sum(gate[0] == "MS" for gate in circuit)
+        probs = fidelity * probs + (1 - fidelity) / len(probs)
+
+        samples = self.rng.choice(len(probs), size=request["repetitions"], p=probs / sum(probs))
+        return self.Response({"id": len(self.circuits), "status": "finished", "samples": samples})
+
+
+class TestZeroNoiseExtrapolation:
+    """Tests for zero-noise extrapolation of expectation values."""
+
+    @pytest.mark.parametrize("method", ["linear", "richardson", "exponential"])
+    def test_mitigated_expval(self, monkeypatch, method):
+        """Tests that extrapolation reduces the bias of noisy MS gates."""
+        backend = DepolarizingMSBackend(2, p=0.1, seed=3)
+        monkeypatch.setattr(pennylane_aqt.device, "submit", backend)
+        dev = qml.device(
+            "aqt.sim", wires=2, api_key=SOME_API_KEY, zne_scales=[1, 2, 3], zne_method=method
+        )
+
+        @qml.set_shots(20000)
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=0)
+            qml.CNOT(wires=[0, 1])
+            qml.CNOT(wires=[0, 1])
+            qml.CNOT(wires=[0, 1])
+            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1)), qml.probs(wires=[0, 1])
+
+        expval, probs = circuit()
+
+        # the unmitigated expectation value is 0.9 ** 3 = 0.729, and the exponential fit
+        # matches the decay of the noise model
+        assert abs(expval - 1) < (1 - 0.9**3) / 2
+        if method == "exponential":
+            assert np.isclose(expval, 1, atol=0.05)
+        assert np.isclose(probs[3], 0.9**3 + (1 - 0.9**3) / 4, atol=0.02)
+        # a scale factor of 2 folds two of the three MS gates, and is used as 7 / 3
+        assert sorted(sum(g[0] == "MS" for g in c) for c in backend.circuits) == [3, 7, 9]
+        assert np.allclose(dev._zne_factors, [1, 7 / 3, 3])
+
+    def test_broadcasted_and_binned(self, monkeypatch):
+        """Tests extrapolation of broadcasted executions with shot vectors."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", DepolarizingMSBackend(2, p=0.1))
+        dev = qml.device(
+            "aqt.sim", wires=2, api_key=SOME_API_KEY, zne_scales=[1, 3], zne_method="exponential"
+        )
+
+        @qml.set_shots([(5000, 2)])
+        @qml.qnode(dev)
+        def circuit(x):
+            qml.RX(x, wires=0)
+            qml.CNOT(wires=[0, 1])
+            return qml.expval(qml.PauliZ(1)), qml.var(qml.PauliZ(1))
+
+        for expval, var in circuit(np.array([0.0, np.pi])):
+            assert np.allclose(expval, [1, -1], atol=0.05)
+            assert np.allclose(var, 0, atol=0.1)
+
+    def test_submitted_concurrently(self, monkeypatch):
+        """Tests that the circuits of all scale factors are submitted concurrently."""
+        backend = SimulatingBackend(2)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def submit(*args, **kwargs):
+            barrier.wait()
+            return backend(*args, **kwargs)
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", submit)
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY, zne_scales=[1, 3, 5])
+        dev.apply([qml.CNOT(wires=[0, 1])])
+
+        assert len(dev.zne_samples) == 3
+        assert dev.samples is dev.zne_samples[0]
+        assert dev._zne_factors == [1, 3, 5]
+
+    @pytest.mark.parametrize(
+        "kwargs, match",
+        [
+            ({"zne_scales": [1]}, "at least two scale factors"),
+            ({"zne_scales": [0.5, 1]}, "at least two scale factors"),
+            ({"zne_scales": [1, 3], "zne_method": "cubic"}, "Unknown extrapolation method"),
+        ],
+    )
+    def test_invalid_options(self, kwargs, match):
+        """Tests that invalid options of zero-noise extrapolation are rejected."""
+        with pytest.raises(ValueError, match=match):
+            AQTDevice(2, api_key=SOME_API_KEY, **kwargs)
+
+
+class TestAdaptiveShots:
+    """Tests for the adaptive allocation of shots."""
+
+    def test_stops_at_target(self, monkeypatch):
+        """Tests that rounds are submitted until the target standard error is reached."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(2), "repetitions")
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY, target_error=0.06)
+
+        @qml.set_shots(100)
+        @qml.qnode(dev)
+        def circuit():
+            qml.Hadamard(wires=0)
+            return qml.expval(qml.PauliZ(0)), qml.expval(qml.PauliZ(1)), qml.probs(wires=0)
+
+        expval, expval_idle, probs = circuit()
+
+        # the standard error of a Pauli word of variance close to 1 is 1 / sqrt(shots)
+        assert repetitions == [100] * 3
+        assert len(dev.samples) == 300
+        assert dev.standard_errors[0] <= 0.06
+        assert np.isclose(dev.standard_errors[0], np.sqrt((1 - expval**2) / 299))
+        assert dev.standard_errors[1] == 0
+        assert np.isnan(dev.standard_errors[2])
+        assert np.isclose(expval, 0, atol=0.15)
+        assert expval_idle == 1
+        assert np.isclose(probs[0], (1 + expval) / 2)
+
+    def test_deterministic_single_round(self, monkeypatch):
+        """Tests that expectation values without shot noise need a single round."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(2), "repetitions")
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY, target_error=1e-3)
+
+        @qml.set_shots(50)
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=0)
+            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
+
+        assert circuit() == -1
+        assert repetitions == [50]
+        assert np.array_equal(dev.standard_errors, [0])
+
+    def test_shot_ceiling(self, monkeypatch):
+        """Tests that the rounds stop at the shot ceiling, with the last round truncated."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(1), "repetitions")
+        dev = qml.device(
+            "aqt.sim", wires=1, api_key=SOME_API_KEY, target_error=1e-3, max_shots=250
+        )
+
+        @qml.set_shots(100)
+        @qml.qnode(dev)
+        def circuit():
+            qml.RY(1.0, wires=0)
+            return qml.expval(qml.PauliZ(0)), qml.var(qml.PauliZ(0))
+
+        circuit()
+
+        assert repetitions == [100, 100, 50]
+        assert len(dev.samples) == 250
+        assert dev.standard_errors[0] > 1e-3
+        assert np.isnan(dev.standard_errors[1])
+
+    @pytest.mark.parametrize("measurement", [qml.sample, qml.counts])
+    def test_samples_unsupported(self, monkeypatch, measurement):
+        """Tests that samples and counts, whose number of shots would differ from the shots
+        of the tape, are rejected."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(1), "repetitions")
+        dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY, target_error=0.1)
+
+        @qml.set_shots(50)
+        @qml.qnode(dev)
+        def circuit():
+            qml.Hadamard(wires=0)
+            return qml.expval(qml.PauliZ(0)), measurement(wires=0)
+
+        with pytest.raises(qml.exceptions.DeviceError, match="does not support samples"):
+            circuit()
+        assert repetitions == []
+
+    def test_broadcasted(self, monkeypatch):
+        """Tests that the parameter sets of a broadcasted tape are executed in shared rounds
+        until all of them reach the target."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(1), "repetitions")
+        dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY, target_error=0.115)
+
+        @qml.set_shots(20)
+        @qml.qnode(dev)
+        def circuit(x):
+            qml.RX(x, wires=0)
+            return qml.expval(qml.PauliZ(0))
+
+        res = circuit(np.array([np.pi, np.pi / 2]))
+
+        assert res[0] == -1
+        assert repetitions == [20] * 8
+        assert dev.standard_errors.shape == (2, 1)
+        assert dev.standard_errors[0, 0] == 0
+        assert dev.standard_errors[1, 0] <= 0.115
+
+    def test_readout_mitigation(self, monkeypatch):
+        """Tests that the standard errors of mitigated expectation values account for the
+        readout weights."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", NoisyReadoutBackend(1, [[0.1, 0.0]]))
+        dev = qml.device(
+            "aqt.sim", wires=1, api_key=SOME_API_KEY, readout_mitigation=True, target_error=0.02
+        )
+
+        @qml.set_shots(1000)
+        @qml.qnode(dev)
+        def circuit():
+            return qml.expval(qml.PauliZ(0))
+
+        assert np.isclose(circuit(), 1, atol=0.05)
+        # the mitigated eigenvalues are 11 / 9 and -1, with probabilities 0.9 and 0.1, such
+        # that the standard deviation is 2 / 3 instead of 0.6 without mitigation
+        assert len(dev.samples) == 2000
+        assert np.isclose(dev.standard_errors[0], 2 / 3 / np.sqrt(2000), rtol=0.1)
+
+    def test_shot_vectors_unsupported(self, monkeypatch):
+        """Tests that shot vectors are rejected."""
+        patch_submit(monkeypatch, SimulatingBackend(1))
+        dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY, target_error=0.1)
+
+        @qml.set_shots([10, 10])
+        @qml.qnode(dev)
+        def circuit():
+            return qml.expval(qml.PauliZ(0))
+
+        with pytest.raises(qml.exceptions.DeviceError, match="does not support shot vectors"):
+            circuit()
+
+    @pytest.mark.parametrize(
+        "kwargs, match",
+        [
+            ({"target_error": 0}, "must be positive"),
+            ({"target_error": 0.1, "zne_scales": [1, 3]}, "cannot be combined"),
+            ({"target_error": 0.1, "max_shots": 0}, "must be positive"),
+            ({"target_error": 0.1, "shots": 100, "max_shots": 50}, "at least the number"),
+        ],
+    )
+    def test_invalid_options(self, kwargs, match):
+        """Tests that invalid options of adaptive shot allocation are rejected."""
+        with pytest.raises(ValueError, match=match):
+            AQTDevice(2, api_key=SOME_API_KEY, **kwargs)
+
+
+class TestCircuitCutting:
+    """Tests for the execution of wide circuits by circuit cutting."""
+
+    @staticmethod
+    def ansatz(x):
+        """Two pairs of wires, coupled by a single two-qubit gate."""
+        for wire in range(4):
+            qml.RY(x + wire / 4, wires=wire)
+        qml.IsingXX(0.6, wires=[0, 1])
+        qml.IsingXX(0.8, wires=[2, 3])
+        qml.IsingXX(0.7, wires=[1, 2])
+        qml.IsingXX(-0.4, wires=[0, 1])
+        qml.IsingXX(0.5, wires=[2, 3])
+
+    def test_cut_expvals(self, monkeypatch):
+        """Tests that the expectation values and variances of a circuit cut into fragments
+        match the uncut circuit."""
+        num_qubits = patch_submit(monkeypatch, SimulatingBackend(4), "no_qubits")
+        dev = qml.device("aqt.sim", wires=4, api_key=SOME_API_KEY, cut_qubits=3)
+
+        def circuit(x):
+            self.ansatz(x)
+            return (
+                qml.expval(qml.PauliZ(0)),
+                qml.expval(qml.PauliZ(1) @ qml.PauliZ(2)),
+                qml.expval(qml.PauliX(3)),
+                qml.var(qml.PauliZ(0)),
+            )
+
+        res = qml.set_shots(qml.QNode(circuit, dev), 20000)(0.4)
+        expected = qml.QNode(circuit, qml.device("default.qubit"))(0.4)
+
+        assert np.allclose(res, expected, atol=0.05)
+        # two fragments of three qubits, measured in three bases and prepared in four states
+        assert num_qubits == [3] * 24
+        assert dev.samples is None
+
+    def test_broadcasted(self, monkeypatch):
+        """Tests that the parameter sets of a broadcasted tape are cut at the same wires."""
+        num_qubits = patch_submit(monkeypatch, SimulatingBackend(4), "no_qubits")
+        dev = qml.device("aqt.sim", wires=4, api_key=SOME_API_KEY, cut_qubits=3)
+
+        def circuit(x):
+            self.ansatz(x)
+            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(3))
+
+        x = np.array([0.2, 1.3])
+        res = qml.set_shots(qml.QNode(circuit, dev), 20000)(x)
+        expected = qml.QNode(circuit, qml.device("default.qubit"))(x)
+
+        assert np.allclose(res, expected, atol=0.05)
+        assert len(num_qubits) == 48
+
+    def test_narrow_circuits_not_cut(self, monkeypatch):
+        """Tests that circuits fitting into a fragment are executed as usual."""
+        num_qubits = patch_submit(monkeypatch, SimulatingBackend(4), "no_qubits")
+        dev = qml.device("aqt.sim", wires=4, api_key=SOME_API_KEY, cut_qubits=3)
+
+        @qml.set_shots(10)
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=0)
+            qml.CNOT(wires=[0, 3])
+            return qml.probs(wires=[0, 3])
+
+        assert np.allclose(circuit(), [0, 0, 0, 1])
+        assert num_qubits == [2]
+
+    def test_unsupported_measurements(self, monkeypatch):
+        """Tests that cut circuits only support expectation values and variances of Pauli
+        words."""
+        num_qubits = patch_submit(monkeypatch, SimulatingBackend(4), "no_qubits")
+        dev = qml.device("aqt.sim", wires=4, api_key=SOME_API_KEY, cut_qubits=3)
+
+        @qml.set_shots(10)
+        @qml.qnode(dev)
+        def circuit():
+            self.ansatz(0.1)
+            return qml.expval(qml.PauliZ(0)), qml.probs(wires=[0, 3])
+
+        with pytest.raises(qml.exceptions.DeviceError, match="only supports expectation values"):
+            circuit()
+        assert num_qubits == []
+
+    def test_too_many_cuts(self, monkeypatch):
+        """Tests that an error is raised if a circuit needs more cuts than allowed."""
+        patch_submit(monkeypatch, SimulatingBackend(4))
+        dev = AQTDevice(4, shots=10, api_key=SOME_API_KEY, cut_qubits=2, max_cuts=1)
+
+        with pytest.raises(
+            qml.exceptions.DeviceError, match="cannot be cut into fragments of at most 2"
+        ):
+            dev.execute(
+                qml.tape.QuantumScript(
+                    [qml.CNOT([0, 1]), qml.CNOT([1, 2]), qml.CNOT([2, 3])],
+                    [qml.expval(qml.PauliZ(3))],
+                    shots=10,
+                )
+            )
+
+    def test_invalid_options(self):
+        """Tests that circuit cutting cannot be combined with error mitigation."""
+        with pytest.raises(ValueError, match="Circuit cutting cannot be combined"):
+            AQTDevice(4, api_key=SOME_API_KEY, cut_qubits=3, readout_mitigation=True)
+
+
+class TestClassicalShadows:
+    """Tests for the measurement of classical shadows."""
+
+    @staticmethod
+    def ansatz(x):
+        """A Bell state on wires 0 and 1, and a rotated wire 2."""
+        qml.Hadamard(wires=0)
+        qml.CNOT(wires=[0, 1])
+        qml.RX(x, wires=2)
+
+    def test_shadow_expval(self, monkeypatch):
+        """Tests that the expectation values estimated from a classical shadow match the
+        exact values, with one job per distinct basis, whatever the number of observables."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(3), "repetitions")
+        dev = qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY)
+        H = [
+            qml.PauliX(0) @ qml.PauliX(1),
+            qml.PauliZ(0) @ qml.PauliZ(1),
+            0.5 * qml.PauliY(2) + qml.PauliZ(2),
+        ]
+
+        @qml.set_shots(3000)
+        @qml.qnode(dev)
+        def circuit(x, observables):
+            self.ansatz(x)
+            return qml.shadow_expval(observables, seed=3)
+
+        res = circuit(0.7, H)
+        expected = [1, 1, -0.5 * np.sin(0.7) + np.cos(0.7)]
+
+        assert np.allclose(res, expected, atol=0.15)
+        assert len(repetitions) == 27
+        assert sum(repetitions) == 3000
+        assert dev.samples is None
+
+        # a single observable on the same wires is measured with the same jobs
+        repetitions.clear()
+        circuit(0.7, qml.PauliZ(0) @ qml.PauliZ(1) @ qml.PauliZ(2))
+        assert len(repetitions) == 27
+
+    def test_classical_shadow(self, monkeypatch):
+        """Tests that the bits and the recipes of a classical shadow are returned in the
+        shape of PennyLane, with the recipes drawn from the seed."""
+        patch_submit(monkeypatch, SimulatingBackend(3))
+        dev = qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY)
+
+        @qml.set_shots(2000)
+        @qml.qnode(dev)
+        def circuit():
+            self.ansatz(0.0)
+            return qml.classical_shadow(wires=[0, 1], seed=5)
+
+        bits, recipes = circuit()
+        assert bits.shape == recipes.shape == (2000, 2)
+        assert np.array_equal(recipes, np.random.RandomState(5).randint(0, 3, size=(2000, 2)))
+
+        # the Z outcomes of the Bell state are correlated, and the Y outcomes anticorrelated
+        zz = np.all(recipes == 2, axis=1)
+        yy = np.all(recipes == 1, axis=1)
+        assert np.all(bits[zz, 0] == bits[zz, 1])
+        assert np.all(bits[yy, 0] != bits[yy, 1])
+
+        shadow = qml.ClassicalShadow(bits, recipes)
+        assert np.isclose(shadow.expval(qml.PauliX(0) @ qml.PauliX(1)), 1, atol=0.2)
+
+    def test_shadow_bases(self, monkeypatch):
+        """Tests that the snapshots are spread over a limited number of bases."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(3), "repetitions")
+        dev = qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY, shadow_bases=4)
+
+        @qml.set_shots(100)
+        @qml.qnode(dev)
+        def circuit():
+            self.ansatz(0.0)
+            return qml.classical_shadow(wires=[0, 1, 2], seed=5)
+
+        circuit()
+        assert sorted(repetitions) == [25] * 4
+
+    def test_shadow_bases_unbiased(self, monkeypatch):
+        """Tests that the expectation values estimated from snapshots spread over a few
+        bases are reweighted, such that they stay unbiased."""
+        patch_submit(monkeypatch, SimulatingBackend(3))
+        dev = qml.device("aqt.sim", wires=3, api_key=SOME_API_KEY, shadow_bases=20)
+        H = [qml.PauliX(0) @ qml.PauliX(1), qml.PauliZ(0) @ qml.PauliZ(1), qml.PauliY(2)]
+
+        @qml.set_shots(20000)
+        @qml.qnode(dev)
+        def circuit(observables):
+            self.ansatz(0.7)
+            return qml.shadow_expval(observables, seed=3)
+
+        assert np.allclose(circuit(H), [1, 1, -np.sin(0.7)], atol=0.05)
+
+        # a word that none of the bases measures cannot be estimated
+        with pytest.raises(ValueError, match="not all measured by the bases"):
+            circuit(qml.PauliX(0) @ qml.PauliY(1) @ qml.PauliZ(2))
+
+    def test_not_multiplexed(self, monkeypatch):
+        """Tests that tapes measuring classical shadows are not packed into shared jobs."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(4), "repetitions")
+        dev = AQTDevice(4, shots=300, api_key=SOME_API_KEY, multiplex=True)
+        tapes = [
+            qml.tape.QuantumScript([qml.PauliX(0)], [qml.expval(qml.PauliZ(0))], shots=300),
+            qml.tape.QuantumScript([qml.PauliX(1)], [qml.expval(qml.PauliZ(1))], shots=300),
+            qml.tape.QuantumScript(
+                [qml.PauliX(0)], [qml.shadow_expval(qml.PauliZ(0), seed=1)], shots=300
+            ),
+        ]
+
+        res = dev.batch_execute(tapes)
+        assert np.allclose(res, -1, atol=0.3)
+        # one multiplexed job, and the X, Y and Z bases of the shadow
+        assert len(repetitions) == 4
+        assert repetitions[0] == 300 and sum(repetitions[1:]) == 300
+
+    def test_unsupported(self, monkeypatch):
+        """Tests that classical shadows do not support broadcasting and shot vectors."""
+        repetitions = patch_submit(monkeypatch, SimulatingBackend(2), "repetitions")
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+
+        broadcasted = qml.tape.QuantumScript(
+            [qml.RX([0.1, 0.2], wires=0)], [qml.classical_shadow(wires=[0])], shots=10
+        )
+        with pytest.raises(qml.exceptions.DeviceError, match="parameter broadcasting"):
+            dev.execute(broadcasted)
+
+        shot_vector = qml.tape.QuantumScript(
+            [qml.RX(0.1, wires=0)], [qml.classical_shadow(wires=[0])], shots=[5, 5]
+        )
+        with pytest.raises(qml.exceptions.DeviceError, match="do not support shot vectors"):
+            dev.execute(shot_vector)
+        assert repetitions == []
+
+    def test_invalid_shadow_bases(self):
+        """Tests that an error is raised for a non-positive number of shadow bases."""
+        with pytest.raises(ValueError, match="number of shadow bases must be positive"):
+            AQTDevice(2, shots=10, api_key=SOME_API_KEY, shadow_bases=0)
+
+
+class TestThreadSafety:
+    """Tests for the concurrent execution of circuits on a single device."""
+
+    def test_concurrent_qnodes(self, monkeypatch):
+        """Tests that QNodes evaluated concurrently on one device, with different circuits
+        and shots, get the samples of their own jobs, also for the concurrent jobs of
+        broadcasted tapes."""
+        patch_submit(monkeypatch, SimulatingBackend(2), delay=0.02)
+        dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY)
+
+        def evaluate(i):
+            @qml.set_shots(10 + i)
+            @qml.qnode(dev)
+            def circuit(x):
+                qml.RX(x, wires=i // 2)
+                return qml.sample(wires=[0, 1])
+
+            return circuit(np.pi * np.array([i % 2, 1 - i % 2]))
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(evaluate, range(4)))
+
+        for i, res in enumerate(results):
+            flipped = np.zeros(2, dtype=int)
+            flipped[i // 2] = 1
+            expected = [flipped * (i % 2), flipped * (1 - i % 2)]
+            assert np.array_equal(res, np.repeat(np.array(expected)[:, None], 10 + i, axis=1))
+
+    def test_context_per_thread(self, monkeypatch):
+        """Tests that the state of the executions is kept per thread, and that new threads
+        start with the shots last set on the device."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", SimulatingBackend(2))
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+
+        def other_thread():
+            return dev.shots, dev.samples, dev.circuit
+
+        with ThreadPoolExecutor(1) as old_executor:
+            assert old_executor.submit(other_thread).result() == (10, None, [])
+            dev.shots = 20
+            dev.apply([qml.PauliX(wires=0)])
+
+            with ThreadPoolExecutor(1) as executor:
+                assert executor.submit(other_thread).result() == (20, None, [])
+            assert old_executor.submit(other_thread).result() == (10, None, [])
+
+        assert dev.shots == 20
+        assert np.array_equal(dev.samples, [1] * 20)
+        assert dev.context is not None and dev.context.samples is dev.samples
+
+    def test_qnode_shots_restored(self, monkeypatch):
+        """Tests that new threads do not start with the shots of an executed QNode."""
+        monkeypatch.setattr(pennylane_aqt.device, "submit", SimulatingBackend(1))
+        dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY)
+        dev.target_device.shots = 10
+
+        @qml.set_shots(30)
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=0)
+            return qml.sample(wires=0)
+
+        assert len(circuit()) == 30
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(lambda: dev.target_device.shots).result() == 10
+
+    def test_shared_calibration(self, monkeypatch):
+        """Tests that concurrent executions share a single readout calibration."""
+        backend = NoisyReadoutBackend(2, [[0.0, 0.0]] * 2)
+        patch_submit(monkeypatch, backend, delay=0.02)
+        dev = AQTDevice(2, shots=50, api_key=SOME_API_KEY, readout_mitigation=True)
+        tape = qml.tape.QuantumScript([qml.PauliX(0)], [qml.expval(qml.PauliZ(0))], shots=50)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(dev.execute, [tape] * 4))
+
+        assert np.allclose(results, -1)
+        assert len(backend.circuits) == 2 + 4
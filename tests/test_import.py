@@ -0,0 +1,88 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the import behaviour and import time of the pennylane_aqt package"""
+import subprocess
+import sys
+
+import pytest
+
+import pennylane_aqt
+
+HEAVY_MODULES = ["pennylane", "numpy", "requests", "pennylane_aqt.device"]
+
+# generous upper bound on the cumulative import time of the package itself
+MAX_IMPORT_TIME_US = 200_000
+
+
+def _run_python(code, *flags):
+    """Run ``code`` in a fresh Python interpreter and return the completed process."""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def _import_times(stderr):
+    """Parse the output of ``python -X importtime`` into a dict mapping module names
+    to their cumulative import time in microseconds."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestLazyImport:
+    """Tests for the lazy import of the pennylane_aqt package."""
+
+    def test_import_does_not_load_heavy_modules(self):
+        """Tests that importing the package does not import PennyLane, NumPy,
+        the HTTP client or the device modules."""
+        res = _run_python(
+            f"import sys, pennylane_aqt; print([m for m in {HEAVY_MODULES} if m in sys.modules])"
+        )
+        assert res.stdout.strip() == "[]"
+
+    def test_import_time(self):
+        """Benchmarks the import time of the package with ``python -X importtime``."""
+        res = _run_python("import pennylane_aqt", "-X", "importtime")
+        times = _import_times(res.stderr)
+
+        assert not set(HEAVY_MODULES) & set(times)
+        assert times["pennylane_aqt"] < MAX_IMPORT_TIME_US
+
+    def test_api_client_does_not_load_requests(self):
+        """Tests that the HTTP client is only imported once a request is submitted."""
+        res = _run_python("import sys, pennylane_aqt.api_client; print('requests' in sys.modules)")
+        assert res.stdout.strip() == "False"
+
+    @pytest.mark.parametrize("name", ["AQTSimulatorDevice", "AQTNoisySimulatorDevice"])
+    def test_lazy_device_classes(self, name):
+        """Tests that the device classes are accessible from the top level module."""
+        from pennylane_aqt import simulator
+
+        assert getattr(pennylane_aqt, name) is getattr(simulator, name)
+        assert name in dir(pennylane_aqt)
+
+    def test_lazy_ops_module(self):
+        """Tests that the ops module is accessible from the top level module."""
+        from pennylane_aqt import ops
+
+        assert pennylane_aqt.ops is ops
+
+    def test_unknown_attribute(self):
+        """Tests that accessing an unknown attribute raises an AttributeError."""
+        with pytest.raises(AttributeError, match="has no attribute 'Unknown'"):
+            pennylane_aqt.Unknown  # pylint: disable=pointless-statement
@@ -0,0 +1,166 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the mitigation module"""
+from functools import reduce
+
+import pytest
+import numpy as np
+
+from pennylane_aqt.compiler import circuit_matrix
+from pennylane_aqt.mitigation import (
+    ReadoutCalibration,
+    expval_weights,
+    extrapolate,
+    fold_ms_gates,
+    tensored_inverse,
+)
+
+
+def random_confusion_matrices(num_qubits, seed=0):
+    """Random confusion matrices with flip probabilities below 20%."""
+    flips = np.random.default_rng(seed).uniform(0, 0.2, size=(num_qubits, 2))
+    return np.stack([[[1 - e0, e1], [e0, 1 - e1]] for e0, e1 in flips])
+
+
+class TestReadoutCalibration:
+    """Tests for the ``ReadoutCalibration`` class."""
+
+    def test_from_samples(self):
+        """Tests that the confusion matrices are estimated from the calibration samples."""
+        # qubit 0 flips 0 -> 1 in a quarter of the shots, qubit 1 flips 1 -> 0 in half
+        samples_zero = [0, 0, 0, 1]
+        samples_one = [3, 1, 3, 1]
+        calibration = ReadoutCalibration.from_samples(samples_zero, samples_one, 2)
+
+        assert calibration.num_qubits == 2
+        assert np.allclose(calibration.matrices[0], [[0.75, 0], [0.25, 1]])
+        assert np.allclose(calibration.matrices[1], [[1, 0.5], [0, 0.5]])
+        assert np.allclose(calibration.inverses @ calibration.matrices, np.eye(2))
+
+    def test_expiry(self):
+        """Tests the time to live of a calibration."""
+        calibration = ReadoutCalibration(np.tile(np.eye(2), (2, 1, 1)), timestamp=0.0)
+
+        assert calibration.age() > 0
+        assert calibration.expired(60)
+        assert not calibration.expired(None)
+        assert not ReadoutCalibration(calibration.matrices).expired(60)
+
+
+class TestTensoredInverse:
+    """Tests for the ``tensored_inverse`` and ``expval_weights`` functions."""
+
+    @pytest.mark.parametrize("num_qubits", [1, 2, 3])
+    def test_matches_full_inverse(self, num_qubits):
+        """Tests that the tensored inverse equals the inverse of the full confusion matrix,
+        with the first qubit in the most significant bit."""
+        matrices = random_confusion_matrices(num_qubits)
+        probs = np.random.default_rng(1).dirichlet(np.ones(2**num_qubits), size=4)
+
+        full = reduce(np.kron, matrices)
+        expected = np.linalg.solve(full, probs.T).T
+
+        res = tensored_inverse(probs, np.linalg.inv(matrices))
+        assert np.allclose(res, expected)
+        assert np.allclose(res.sum(axis=-1), 1)
+
+    def test_batched_inverses(self):
+        """Tests inverse confusion matrices with leading dimensions."""
+        matrices = np.stack([random_confusion_matrices(2, seed) for seed in range(3)])
+        probs = np.random.default_rng(1).dirichlet(np.ones(4), size=3)
+
+        res = tensored_inverse(probs, np.linalg.inv(matrices))
+
+        for r, p, m in zip(res, probs, matrices):
+            assert np.allclose(r, np.linalg.solve(np.kron(*m), p))
+
+    def test_expval_weights(self):
+        """Tests that weighting the outcomes gives the corrected expectation value."""
+        matrices = random_confusion_matrices(2)
+        probs = np.array([0.1, 0.2, 0.3, 0.4])
+        corrected = np.linalg.solve(np.kron(*matrices), probs)
+        expected = corrected @ np.kron([1, -1], [1, -1])
+
+        weights = expval_weights(np.linalg.inv(matrices))
+        res = probs @ np.kron(weights[0], weights[1])
+        assert np.isclose(res, expected)
+
+
+class TestFoldMSGates:
+    """Tests for the ``fold_ms_gates`` function."""
+
+    CIRCUIT = [
+        ["X", 0.5, [0]],
+        ["MS", 0.25, [0, 1]],
+        ["R", 0.5, 0.1, [1]],
+        ["MS", 0.5, [1, 2]],
+        ["MS", -0.3, [0, 2]],
+    ]
+
+    @pytest.mark.parametrize("scale, num_ms", [(1, 3), (3, 9), (5, 15), (2, 7), (1.6, 5)])
+    def test_number_of_ms_gates(self, scale, num_ms):
+        """Tests that the number of MS gates is multiplied by the scale factor, rounded to
+        the nearest achievable factor."""
+        folded = fold_ms_gates(self.CIRCUIT, scale)
+
+        assert sum(gate[0] == "MS" for gate in folded) == num_ms
+        assert [gate for gate in folded if gate[0] != "MS"] == self.CIRCUIT[::2][:2]
+
+    @pytest.mark.parametrize("scale", [1, 2, 3, 4.5])
+    def test_unitary_unchanged(self, scale):
+        """Tests that folding does not change the unitary of the circuit."""
+        folded = fold_ms_gates(self.CIRCUIT, scale)
+        expected = circuit_matrix(self.CIRCUIT, [0, 1, 2])
+        assert np.allclose(circuit_matrix(folded, [0, 1, 2]), expected)
+
+    def test_invalid_scale(self):
+        """Tests that scale factors smaller than one are rejected."""
+        with pytest.raises(ValueError, match="must be at least 1"):
+            fold_ms_gates(self.CIRCUIT, 0.5)
+
+
+class TestExtrapolate:
+    """Tests for the ``extrapolate`` function."""
+
+    SCALES = [1, 3, 5]
+
+    def test_linear(self):
+        """Tests the least-squares linear extrapolation."""
+        values = [0.8, 0.6, 0.2]
+        expected = np.polyfit(self.SCALES, values, 1)[-1]
+        assert np.isclose(extrapolate(self.SCALES, values, "linear"), expected)
+
+    def test_richardson(self):
+        """Tests that the Richardson extrapolation is exact for quadratic decays."""
+        values = [1 - 0.1 * s + 0.01 * s**2 for s in self.SCALES]
+        assert np.isclose(extrapolate(self.SCALES, values, "richardson"), 1)
+
+    def test_exponential(self):
+        """Tests that the exponential extrapolation is exact for exponential decays, of
+        either sign."""
+        values = np.outer(0.9 ** np.array(self.SCALES), [0.5, -0.7])
+        assert np.allclose(extrapolate(self.SCALES, values, "exponential"), [0.5, -0.7])
+
+    def test_vectorized(self):
+        """Tests that values of any shape are extrapolated elementwise."""
+        values = np.random.default_rng(0).random((3, 4, 2))
+        res = extrapolate(self.SCALES, values, "richardson")
+
+        assert res.shape == (4, 2)
+        assert np.isclose(res[2, 1], extrapolate(self.SCALES, values[:, 2, 1]))
+
+    def test_unknown_method(self):
+        """Tests that unknown extrapolation methods are rejected."""
+        with pytest.raises(ValueError, match="Unknown extrapolation method"):
+            extrapolate(self.SCALES, [1, 1, 1], "cubic")
@@ -0,0 +1,201 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the mock AQT gateway"""
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import pennylane as qml
+import numpy as np
+
+from pennylane_aqt.device import AQTDevice
+from pennylane_aqt.mock_server import MockAQTServer, simulate
+
+SOME_API_KEY = "ABC123"
+
+
+def job(circuit, num_wires=2, repetitions=10, access_token=SOME_API_KEY):
+    """The payload of a job submission."""
+    return {
+        "access_token": access_token,
+        "no_qubits": num_wires,
+        "repetitions": repetitions,
+        "data": json.dumps(circuit),
+    }
+
+
+class TestSimulate:
+    """Tests for the ``simulate`` function."""
+
+    def test_basis_states(self):
+        """Tests that the samples encode the state of qubit 0 in the least significant bit."""
+        circuit = [["X", 1.0, [0]], ["Y", 1.0, [2]]]
+        assert simulate(circuit, 3, 5) == [5] * 5
+
+    def test_bell_state(self):
+        """Tests that an entangled state gives correlated samples."""
+        circuit = [["MS", 0.5, [0, 1]]]
+        samples = simulate(circuit, 2, 1000, np.random.default_rng(1))
+
+        assert set(samples) == {0, 3}
+        assert 400 < samples.count(0) < 600
+
+    def test_unknown_gate(self):
+        """Tests that an error is raised for unknown gates."""
+        with pytest.raises(ValueError, match="Unknown AQT gate"):
+            simulate([["CNOT", 0.5, [0, 1]]], 2, 1)
+
+
+class TestMockAQTServer:
+    """Tests for the ``MockAQTServer`` class."""
+
+    def test_submit_finished_without_latency(self, aqt_server):
+        """Tests that jobs are finished on submission if there is no queue latency."""
+        response = requests.put(aqt_server.url + "/sim", job([["X", 1.0, [1]]]), timeout=1)
+        result = response.json()
+
+        assert response.status_code == 200
+        assert result["status"] == "finished"
+        assert result["samples"] == [2] * 10
+        assert result["id"] in aqt_server.jobs
+
+    def test_queue_latency(self):
+        """Tests that jobs are queued until the latency has passed."""
+        with MockAQTServer(latency=0.2) as server:
+            result = requests.put(server.url, job([]), timeout=1).json()
+            assert result["status"] == "queued"
+
+            query = {"id": result["id"], "access_token": SOME_API_KEY}
+            assert requests.put(server.url, query, timeout=1).json()["status"] == "queued"
+
+            server.jobs[result["id"]].ready_at = 0
+            result = requests.put(server.url, query, timeout=1).json()
+            assert result["status"] == "finished"
+            assert result["samples"] == [0] * 10
+
+    @pytest.mark.parametrize(
+        "payload, status, message",
+        [
+            (job([], repetitions=201), 400, "Invalid number of repetitions provided!"),
+            (job([], repetitions=0), 400, "Invalid number of repetitions provided!"),
+            (job([], num_wires=12), 400, "Invalid number of qubits provided!"),
+            (job([["X", 1.0, [2]]]), 400, "Invalid circuit provided!"),
+            (job([], access_token=""), 401, "No access token provided!"),
+            ({"id": "unknown", "access_token": SOME_API_KEY}, 404, "Unknown job id!"),
+        ],
+    )
+    def test_invalid_requests(self, aqt_server, payload, status, message):
+        """Tests that invalid requests are rejected."""
+        response = requests.put(aqt_server.url, payload, timeout=1)
+
+        assert response.status_code == status
+        assert response.text == message
+
+    def test_injected_job_error(self, aqt_server):
+        """Tests that injected errors are reported by the device."""
+        aqt_server.inject_error("Ion loss")
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+
+        with pytest.raises(ValueError, match="got the error message: Ion loss"):
+            dev.apply([qml.PauliX(0)])
+
+        dev.reset()
+        dev.apply([qml.PauliX(0)])
+        assert dev.samples == [1] * 10
+
+    def test_injected_http_error(self, aqt_server):
+        """Tests that injected HTTP errors are raised by the device."""
+        aqt_server.inject_error("Service unavailable", status_code=503)
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+
+        with pytest.raises(requests.HTTPError, match="Service unavailable"):
+            dev.apply([qml.PauliX(0)])
+
+    def test_compressed_submission(self, aqt_server):
+        """Tests that gzip-compressed job submissions are accepted."""
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY, compress=True, precision=8)
+        dev.apply([qml.PauliX(0), qml.CNOT(wires=[0, 1])])
+
+        assert dev.samples == [3] * 10
+
+    def test_device_polls_queued_jobs(self, monkeypatch):
+        """Tests an execution on a device polling for queued jobs."""
+        with MockAQTServer(latency=0.05, seed=1) as server:
+            monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+            dev = qml.device("aqt.sim", wires=2, api_key=SOME_API_KEY, retry_delay=0.01)
+
+            @qml.set_shots(200)
+            @qml.qnode(dev)
+            def circuit(x):
+                qml.RY(x, wires=0)
+                qml.CNOT(wires=[0, 1])
+                return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1)), qml.expval(qml.PauliZ(1))
+
+            res = circuit(np.pi / 3)
+
+            assert np.allclose(res, [1, 0.5], atol=0.15)
+            assert server.num_requests > len(server.jobs) == 1
+
+    def test_concurrent_broadcasted_jobs(self, monkeypatch):
+        """Tests a broadcasted execution, whose jobs are submitted concurrently."""
+        with MockAQTServer(latency=0.02, seed=1) as server:
+            monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+            dev = qml.device("aqt.sim", wires=1, api_key=SOME_API_KEY, retry_delay=0.01)
+
+            @qml.set_shots(10)
+            @qml.qnode(dev)
+            def circuit(x):
+                qml.RX(x, wires=0)
+                return qml.expval(qml.PauliZ(0))
+
+            x = np.array([0.0, np.pi] * 4)
+            assert np.allclose(circuit(x), np.cos(x))
+            assert len(server.jobs) == 8
+
+    def test_concurrent_devices(self, monkeypatch):
+        """Tests that the connections of several threads submitting concurrent jobs are
+        all accepted."""
+        with MockAQTServer(latency=0.02, seed=1) as server:
+            monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+            dev = AQTDevice(1, shots=10, api_key=SOME_API_KEY, retry_delay=0.01)
+            x = np.array([np.pi] * 2 * AQTDevice.MAX_CONCURRENT_JOBS)
+
+            def run(_):
+                dev.reset()
+                dev.apply([qml.RX(x, wires=0)])
+                return dev.samples
+
+            with ThreadPoolExecutor(4) as executor:
+                results = list(executor.map(run, range(4)))
+
+            assert results == [[[1] * 10] * len(x)] * 4
+            assert server._server.request_queue_size > 4 * AQTDevice.MAX_CONCURRENT_JOBS
+
+    def test_subprocess(self):
+        """Tests running the mock gateway as a subprocess."""
+        cmd = [sys.executable, "-m", "pennylane_aqt.mock_server", "--port", "0", "--seed", "1"]
+        cmd += ["--max-qubits", "1"]
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as process:
+            try:
+                url = process.stdout.readline().split()[-1]
+                result = requests.put(url, job([["X", 1.0, [0]]], num_wires=1), timeout=5).json()
+                assert result["samples"] == [1] * 10
+                response = requests.put(url, job([["X", 1.0, [0]]]), timeout=5)
+                assert response.text == "Invalid number of qubits provided!"
+            finally:
+                process.terminate()
@@ -0,0 +1,162 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the custom AQT operations"""
+import pytest
+
+import pennylane as qml
+from pennylane import numpy as pnp
+import numpy as np
+
+from pennylane_aqt import ops
+from pennylane_aqt.compiler import gate_matrix
+
+
+def r_matrix(t, p):
+    """The matrix of the R gate, as given in the AQT gate definitions."""
+    c, s = np.cos(t * np.pi / 2), np.sin(t * np.pi / 2)
+    return np.array(
+        [[c, -1j * np.exp(-1j * p * np.pi) * s], [-1j * np.exp(1j * p * np.pi) * s, c]]
+    )
+
+
+def ms_matrix(t):
+    """The matrix of the MS gate, as given in the AQT gate definitions."""
+    c, s = np.cos(t * np.pi / 2), -1j * np.sin(t * np.pi / 2)
+    return np.array([[c, 0, 0, s], [0, c, s, 0], [0, s, c, 0], [s, 0, 0, c]])
+
+
+PARAMETERS = [(0.3, 0.7), (-1.2, 0.25), (0.5, 0.0)]
+
+
+class TestR:
+    """Tests for the ``R`` operation."""
+
+    @pytest.mark.parametrize("t, p", PARAMETERS)
+    def test_matrix(self, t, p):
+        """Tests that the matrix agrees with the AQT gate definition and the compiler."""
+        op = ops.R(t, p, wires=0)
+
+        assert np.allclose(qml.matrix(op), r_matrix(t, p))
+        assert np.allclose(qml.matrix(op), gate_matrix(["R", t, p, [0]]))
+
+    def test_matrix_broadcasted(self):
+        """Tests that the matrix supports parameter broadcasting in either parameter."""
+        t = np.array([0.1, 0.4, -0.9])
+
+        res = ops.R.compute_matrix(t, 0.3)
+        assert res.shape == (3, 2, 2)
+        assert np.allclose(res, [r_matrix(x, 0.3) for x in t])
+
+        res = ops.R.compute_matrix(t, -t)
+        assert np.allclose(res, [r_matrix(x, -x) for x in t])
+
+    @pytest.mark.parametrize("t, p", PARAMETERS)
+    def test_decomposition(self, t, p):
+        """Tests that the decomposition implements the matrix."""
+        decomposition = ops.R.compute_decomposition(t, p, wires=0)
+        assert np.allclose(qml.matrix(qml.prod(*decomposition[::-1])), r_matrix(t, p))
+
+    @pytest.mark.parametrize("t, p", PARAMETERS)
+    def test_adjoint(self, t, p):
+        """Tests that the adjoint is the rotation about the same axis by the negated angle."""
+        adjoint = ops.R(t, p, wires=0).adjoint()
+
+        assert isinstance(adjoint, ops.R)
+        assert adjoint.parameters == [-t, p]
+        assert np.allclose(qml.matrix(adjoint) @ r_matrix(t, p), np.eye(2))
+
+
+class TestMS:
+    """Tests for the ``MS`` operation."""
+
+    @pytest.mark.parametrize("t", [0.3, -1.2, 0.5])
+    def test_matrix(self, t):
+        """Tests that the matrix agrees with the AQT gate definition and the compiler."""
+        op = ops.MS(t, wires=[0, 1])
+
+        assert np.allclose(qml.matrix(op), ms_matrix(t))
+        assert np.allclose(qml.matrix(op), gate_matrix(["MS", t, [0, 1]]))
+
+    def test_matrix_broadcasted(self):
+        """Tests that the matrix supports parameter broadcasting."""
+        t = np.array([0.1, 0.4, -0.9])
+        res = ops.MS.compute_matrix(t)
+
+        assert res.shape == (3, 4, 4)
+        assert np.allclose(res, [ms_matrix(x) for x in t])
+
+    @pytest.mark.parametrize("t", [0.3, -1.2])
+    def test_generator(self, t):
+        """Tests that the matrix is generated by the generator."""
+        op = ops.MS(t, wires=[0, 1])
+        generator = qml.matrix(op.generator(), wire_order=[0, 1])
+
+        assert np.allclose(qml.math.expm(1j * t * generator), ms_matrix(t))
+
+    @pytest.mark.parametrize("t", [0.3, -1.2])
+    def test_decomposition_and_adjoint(self, t):
+        """Tests the decomposition and the adjoint of the gate."""
+        op = ops.MS(t, wires=[0, 1])
+
+        assert np.allclose(qml.matrix(op.decomposition()[0]), ms_matrix(t))
+        assert isinstance(op.adjoint(), ops.MS)
+        assert np.allclose(qml.matrix(op.adjoint()), ms_matrix(-t))
+
+
+class TestSimulation:
+    """Tests for simulating and differentiating the AQT operations locally."""
+
+    @staticmethod
+    def circuit(t, p, s):
+        """A circuit using both AQT operations."""
+        qml.Hadamard(wires=0)
+        ops.R(t, p, wires=0)
+        ops.MS(s, wires=[0, 1])
+        ops.R(p, t, wires=1)
+        return qml.expval(qml.PauliZ(0) @ qml.PauliY(1))
+
+    def test_broadcasted_execution(self):
+        """Tests that broadcasted circuits are executed on ``default.qubit``."""
+        dev = qml.device("default.qubit", wires=2)
+        qnode = qml.QNode(self.circuit, dev)
+
+        t = np.array([0.1, 0.5, -0.7])
+        res = qnode(t, 0.2, 0.3)
+
+        assert qml.math.shape(res) == (3,)
+        assert np.allclose(res, [qnode(x, 0.2, 0.3) for x in t])
+
+    def test_parameter_shift(self):
+        """Tests that the parameter-shift rules agree with backpropagation."""
+        dev = qml.device("default.qubit", wires=2)
+        args = pnp.array([0.3, 0.8, -0.4], requires_grad=True)
+
+        shift = qml.QNode(self.circuit, dev, diff_method="parameter-shift")
+        backprop = qml.QNode(self.circuit, dev, diff_method="backprop")
+
+        assert np.allclose(qml.jacobian(shift)(*args), qml.jacobian(backprop)(*args))
+
+    def test_parameter_shift_uses_shift_rules(self):
+        """Tests that the gradient is computed from shifted circuits of the AQT operations,
+        without decomposing them."""
+        dev = qml.device("default.qubit", wires=2)
+        tape = qml.tape.QuantumScript(
+            [ops.R(0.3, 0.8, wires=0), ops.MS(-0.4, wires=[0, 1])],
+            [qml.expval(qml.PauliZ(0) @ qml.PauliY(1))],
+        )
+        tapes, _ = qml.gradients.param_shift(tape)
+
+        # two shifts for t, four for p, two for the MS gate
+        assert len(tapes) == 8
+        assert all(isinstance(t.operations[0], ops.R) for t in tapes)
@@ -0,0 +1,145 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the sample store"""
+import json
+import os
+
+import pytest
+
+import numpy as np
+
+from pennylane_aqt.device import AQTDevice
+from pennylane_aqt.sample_store import HEADER_SIZE, SampleStore, circuit_hash
+
+CIRCUIT = [["X", 1.0, [0]], ["MS", 0.5, [0, 1]]]
+
+
+@pytest.fixture
+def codes():
+    """Random AQT samples on ten wires."""
+    return np.random.default_rng(0).integers(0, 2**10, size=1000)
+
+
+@pytest.fixture
+def store(tmp_path, codes):
+    """A sample store containing the random samples."""
+    store = SampleStore.create(tmp_path / "run.aqts", 10, CIRCUIT, "sim")
+    store.append(codes[:600])
+    store.append(codes[600:])
+    return store
+
+
+def unpack(codes, num_wires):
+    """Bits of AQT samples, with the same convention as ``AQTDevice.generate_samples``."""
+    dev = AQTDevice(num_wires, api_key="ABC123")
+    dev.samples = list(codes)
+    return dev.generate_samples()
+
+
+class TestSampleStore:
+    """Tests for the ``SampleStore`` class."""
+
+    def test_header(self, store, tmp_path):
+        """Tests that the header is written and read back."""
+        reopened = SampleStore(tmp_path / "run.aqts")
+
+        assert reopened.num_wires == 10
+        assert reopened.shots == 1000
+        assert reopened.circuit_hash == circuit_hash(CIRCUIT) == circuit_hash(json.dumps(CIRCUIT))
+        assert reopened.backend == "sim"
+
+    def test_bit_packed(self, store):
+        """Tests that each shot on ten wires is stored in two bytes."""
+        assert store.row_size == 2
+        assert os.path.getsize(store.path) == HEADER_SIZE + 2 * 1000
+
+    def test_samples(self, store, codes):
+        """Tests that the samples are read back with the device conventions."""
+        assert np.array_equal(store.samples(), unpack(codes, 10))
+
+    def test_append_bits(self, tmp_path, codes):
+        """Tests appending samples given as an array of bits."""
+        store = SampleStore.create(tmp_path / "bits.aqts", 10)
+        store.append(unpack(codes, 10))
+
+        assert store.circuit_hash == ""
+        assert np.array_equal(store.samples(), unpack(codes, 10))
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000, 2**16])
+    def test_iter_samples(self, store, codes, chunk_size):
+        """Tests that the samples are read in chunks."""
+        chunks = list(store.iter_samples(chunk_size))
+
+        assert max(len(chunk) for chunk in chunks) <= chunk_size
+        assert np.array_equal(np.concatenate(chunks), unpack(codes, 10))
+
+    @pytest.mark.parametrize("wires", [None, [0], [3, 1], [9, 0, 4]])
+    def test_probs(self, store, codes, wires):
+        """Tests the marginal probabilities, with the first wire in the most significant bit."""
+        bits = unpack(codes, 10)
+        wires = list(range(10)) if wires is None else wires
+        indices = bits[:, wires] @ (2 ** np.arange(len(wires))[::-1])
+        expected = np.bincount(indices, minlength=2 ** len(wires)) / 1000
+
+        assert np.allclose(store.probs(wires, chunk_size=64), expected)
+
+    @pytest.mark.parametrize("wires", [[], [0], [3, 1], [9, 0, 4]])
+    def test_expval(self, store, codes, wires):
+        """Tests the expectation values of products of Pauli Z operators."""
+        bits = unpack(codes, 10)
+        expected = np.mean(np.prod(1 - 2 * bits[:, wires], axis=1))
+
+        assert np.isclose(store.expval(wires, chunk_size=64), expected)
+
+    def test_empty(self, tmp_path):
+        """Tests statistics of an empty store."""
+        store = SampleStore.create(tmp_path / "empty.aqts", 3)
+
+        assert store.samples().shape == (0, 3)
+        assert np.allclose(store.probs(), 0)
+
+    def test_wrong_number_of_wires(self, store):
+        """Tests that an error is raised if the samples do not match the wires."""
+        with pytest.raises(ValueError, match="Expected samples on 10 wires"):
+            store.append(np.zeros((5, 3)))
+
+    @pytest.mark.parametrize(
+        "samples, message",
+        [
+            ([0, 1024], r"Expected integer samples in \[0, 1024\) for 10 wires"),
+            ([-1], r"Expected integer samples in \[0, 1024\) for 10 wires"),
+            ([0.0, 1.5], "Expected integer samples, got samples of type float64"),
+            (np.full((2, 10), 3), "Expected bits of shape"),
+        ],
+    )
+    def test_invalid_samples(self, store, samples, message):
+        """Tests that integer samples that do not fit into the wires, and arrays of bits
+        with other values, such as the integer samples of broadcasted executions, are
+        rejected instead of being truncated."""
+        with pytest.raises(ValueError, match=message):
+            store.append(samples)
+        assert store.shots == 1000
+
+    def test_append_empty(self, store):
+        """Tests that appending no samples leaves the store unchanged."""
+        store.append([])
+        assert store.shots == 1000
+
+    def test_not_a_sample_store(self, tmp_path):
+        """Tests that an error is raised for files that are not sample stores."""
+        path = tmp_path / "other.txt"
+        path.write_text("not samples")
+
+        with pytest.raises(ValueError, match="is not an AQT sample store"):
+            SampleStore(path)
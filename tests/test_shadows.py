@@ -0,0 +1,141 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the shadows module"""
+
+import pytest
+
+import pennylane as qml
+import numpy as np
+
+from pennylane_aqt.compiler import circuit_matrix
+from pennylane_aqt.shadows import (
+    basis_circuit,
+    draw_recipes,
+    group_recipes,
+    median_of_means,
+    pauli_expvals,
+    pauli_words,
+)
+
+
+class TestRecipes:
+    """Tests for drawing and grouping the bases of the snapshots."""
+
+    def test_draw_recipes(self):
+        """Tests that the recipes are drawn as by PennyLane devices."""
+        recipes = draw_recipes(50, 3, seed=7)
+        expected = np.random.RandomState(7).randint(0, 3, size=(50, 3))
+
+        assert recipes.dtype == np.uint8
+        assert np.array_equal(recipes, expected)
+
+    def test_num_bases(self):
+        """Tests that the snapshots are spread evenly over a limited number of bases."""
+        recipes = draw_recipes(10, 8, seed=7, num_bases=4)
+        bases, counts, _ = group_recipes(recipes)
+
+        assert len(bases) == 4
+        assert sorted(counts) == [2, 2, 3, 3]
+
+    def test_group_recipes(self):
+        """Tests that the snapshots are sorted by their distinct bases."""
+        recipes = draw_recipes(40, 2, seed=1)
+        bases, counts, order = group_recipes(recipes)
+
+        assert len(bases) == len(np.unique(recipes, axis=0))
+        assert np.array_equal(recipes[order], np.repeat(bases, counts, axis=0))
+
+
+class TestBasisCircuit:
+    """Tests for the ``basis_circuit`` function."""
+
+    @pytest.mark.parametrize(
+        "basis, eigenstate",
+        [(0, [1, 1]), (1, [1, 1j]), (2, [1, 0])],
+    )
+    def test_rotations(self, basis, eigenstate):
+        """Tests that the rotations map the eigenstate of eigenvalue 1 of each Pauli
+        operator onto the state zero."""
+        circuit = basis_circuit([], [basis], [0])
+        state = circuit_matrix(circuit, [0]) @ (np.array(eigenstate) / np.linalg.norm(eigenstate))
+
+        assert np.isclose(np.abs(state[0]), 1)
+
+    def test_appended(self):
+        """Tests that the rotations are appended to the circuit on the measured wires."""
+        circuit = [["MS", 0.5, [0, 2]]]
+        assert basis_circuit(circuit, [2, 1, 0], [0, 2, 3]) == [
+            ["MS", 0.5, [0, 2]],
+            ["X", 0.5, [2]],
+            ["Y", -0.5, [3]],
+        ]
+
+
+class TestEstimation:
+    """Tests for the estimation of the expectation values of Pauli words."""
+
+    def test_pauli_words(self):
+        """Tests the words of a linear combination of Pauli words."""
+        obs = 0.5 * qml.PauliX("a") @ qml.PauliY("c") - qml.PauliZ("b")
+        coeffs, words = pauli_words(obs, qml.wires.Wires(["a", "b", "c"]))
+
+        assert np.allclose(coeffs, [0.5, -1])
+        assert words.tolist() == [[0, -1, 1], [-1, 2, -1]]
+
+    def test_not_pauli(self):
+        """Tests that an error is raised for observables that are not Pauli words."""
+        obs = qml.Hermitian(np.eye(2), wires=0)
+        with pytest.raises(ValueError, match="can only estimate Pauli words"):
+            pauli_words(obs, qml.wires.Wires([0]))
+
+    def test_pauli_expvals(self):
+        """Tests the estimates of single snapshots."""
+        bits = np.array([[0, 1], [1, 1]])
+        recipes = np.array([[0, 2], [0, 1]])
+        words = [[0, 2], [0, -1], [-1, 1], [-1, -1]]
+
+        res = pauli_expvals(bits, recipes, words)
+        assert np.array_equal(res, [[-9, 0], [3, -3], [0, -3], [1, 1]])
+
+    def test_reweighted(self):
+        """Tests that the snapshots measuring a word are weighted by the inverse of their
+        fraction, such that deterministic outcomes are estimated exactly."""
+        bits = np.array([[1, 0], [1, 1], [1, 0], [0, 0]])
+        recipes = np.array([[0, 2], [0, 0], [0, 2], [1, 1]])
+
+        res = pauli_expvals(bits, recipes, [[0, 2], [0, -1]], reweight=True)
+        assert np.allclose(res, [[-2, 0, -2, 0], [-4 / 3, -4 / 3, -4 / 3, 0]])
+        assert np.allclose(res.mean(axis=-1), [-1, -1])
+
+        with pytest.raises(ValueError, match="not all measured by the bases"):
+            pauli_expvals(bits, recipes, [[2, 2]], reweight=True)
+
+    def test_median_of_means(self):
+        """Tests the median of the means of parts of the snapshots."""
+        values = np.array([[1.0, 1.0, 2.0, 4.0, 9.0, 9.0], [0, 0, 0, 0, 0, 6]])
+
+        assert np.allclose(median_of_means(values), [13 / 3, 1])
+        assert np.allclose(median_of_means(values, 3), [3, 0])
+
+    def test_matches_pennylane(self):
+        """Tests that the estimates match the classical shadows of PennyLane."""
+        rng = np.random.default_rng(0)
+        bits = rng.integers(0, 2, size=(300, 3))
+        recipes = draw_recipes(300, 3, seed=0)
+        obs = qml.PauliX(0) @ qml.PauliZ(2) + 0.3 * qml.PauliY(1)
+
+        coeffs, words = pauli_words(obs, qml.wires.Wires(range(3)))
+        res = coeffs @ median_of_means(pauli_expvals(bits, recipes, words), 4)
+        expected = qml.ClassicalShadow(bits, recipes).expval(obs, k=4)
+        assert np.isclose(res, expected)
@@ -0,0 +1,211 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the synthesis module"""
+import pytest
+
+import pennylane as qml
+import numpy as np
+from scipy.stats import unitary_group
+
+from pennylane_aqt.compiler import circuit_matrix, translate
+from pennylane_aqt.synthesis import (
+    fuse_single_qubit_gates,
+    kak_decomposition,
+    resynthesize_two_qubit_blocks,
+    synthesize_single_qubit,
+    synthesize_two_qubit,
+)
+
+WIRE_MAP = {0: 0, 1: 1, 2: 2}
+
+
+def assert_equal_up_to_phase(U, V):
+    """Asserts that two unitary matrices are equal up to a global phase."""
+    overlap = np.trace(U.conj().T @ V) / len(U)
+    assert np.isclose(abs(overlap), 1.0)
+
+
+def num_ms_gates(circuit):
+    """Number of MS gates in an AQT circuit."""
+    return sum(gate[0] == "MS" for gate in circuit)
+
+
+class TestSynthesizeSingleQubit:
+    """Tests for the ``synthesize_single_qubit`` function."""
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_random_unitaries(self, seed):
+        """Tests that random unitaries are synthesized into an R and a Z gate."""
+        U = unitary_group.rvs(2, random_state=seed)
+        res = synthesize_single_qubit(U, "w")
+
+        assert [gate[0] for gate in res] == ["R", "Z"]
+        assert all(gate[-1] == ["w"] for gate in res)
+        assert_equal_up_to_phase(circuit_matrix(res, ["w"]), U)
+
+    @pytest.mark.parametrize(
+        "op, expected",
+        [
+            (qml.Identity(0), []),
+            (qml.RZ(0.4, 0), ["Z"]),
+            (qml.RX(0.4, 0), ["R"]),
+            (qml.Hadamard(0), ["R", "Z"]),
+        ],
+    )
+    def test_special_unitaries(self, op, expected):
+        """Tests that vanishing rotations are omitted."""
+        U = qml.matrix(op)
+        res = synthesize_single_qubit(U, 0)
+
+        assert [gate[0] for gate in res] == expected
+        if res:
+            assert_equal_up_to_phase(circuit_matrix(res, [0]), U)
+
+
+class TestKAKDecomposition:
+    """Tests for the ``kak_decomposition`` function."""
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_reconstruction(self, seed):
+        """Tests that the decomposition reconstructs random unitaries."""
+        U = unitary_group.rvs(4, random_state=seed)
+        (a0, a1), (x, y, z), (b0, b1) = kak_decomposition(U)
+
+        paulis = [qml.matrix(P(0) @ P(1)) for P in (qml.PauliX, qml.PauliY, qml.PauliZ)]
+        interaction = qml.math.expm(1j * (x * paulis[0] + y * paulis[1] + z * paulis[2]))
+
+        assert_equal_up_to_phase(np.kron(a0, a1) @ interaction @ np.kron(b0, b1), U)
+        assert all(-np.pi / 4 < c <= np.pi / 4 for c in (x, y, z))
+
+    def test_local_unitary(self):
+        """Tests that local unitaries have vanishing interaction coefficients."""
+        U = np.kron(unitary_group.rvs(2, random_state=1), unitary_group.rvs(2, random_state=2))
+        _, coeffs, _ = kak_decomposition(U)
+
+        assert np.allclose(coeffs, 0)
+
+
+class TestSynthesizeTwoQubit:
+    """Tests for the ``synthesize_two_qubit`` function."""
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_random_unitaries(self, seed):
+        """Tests that random unitaries are synthesized with three MS gates."""
+        U = unitary_group.rvs(4, random_state=seed)
+        res = synthesize_two_qubit(U, ["a", "b"])
+
+        assert num_ms_gates(res) == 3
+        assert {gate[0] for gate in res} <= {"R", "Z", "MS"}
+        assert_equal_up_to_phase(circuit_matrix(res, ["a", "b"]), U)
+
+    @pytest.mark.parametrize(
+        "op, num_ms",
+        [
+            (qml.CNOT(wires=[0, 1]), 1),
+            (qml.CZ(wires=[0, 1]), 1),
+            (qml.IsingZZ(0.3, wires=[0, 1]), 1),
+            (qml.CRX(0.4, wires=[1, 0]), 1),
+            (qml.ISWAP(wires=[0, 1]), 2),
+            (qml.SWAP(wires=[0, 1]), 3),
+            (qml.Identity(0) @ qml.Identity(1), 0),
+        ],
+    )
+    def test_minimal_ms_gates(self, op, num_ms):
+        """Tests that two-qubit gates are synthesized with the minimal number of MS gates."""
+        U = qml.matrix(op, wire_order=[0, 1])
+        res = synthesize_two_qubit(U, [0, 1])
+
+        assert num_ms_gates(res) == num_ms
+        if res:
+            assert_equal_up_to_phase(circuit_matrix(res, [0, 1]), U)
+
+
+class TestResynthesizeTwoQubitBlocks:
+    """Tests for the ``resynthesize_two_qubit_blocks`` function."""
+
+    def test_zz_ladder(self):
+        """Tests that a CNOT-RZ-CNOT ladder is re-synthesized with a single MS gate."""
+        operations = [qml.CNOT(wires=[0, 1]), qml.RZ(0.3, wires=1), qml.CNOT(wires=[0, 1])]
+        circuit = translate(operations, WIRE_MAP)
+        res = resynthesize_two_qubit_blocks(circuit)
+
+        assert num_ms_gates(circuit) == 2
+        assert num_ms_gates(res) == 1
+        assert_equal_up_to_phase(circuit_matrix(res, [0, 1]), circuit_matrix(circuit, [0, 1]))
+
+    def test_block_not_replaced_without_savings(self):
+        """Tests that blocks are kept if re-synthesis does not save gates."""
+        circuit = [["MS", 0.3, [0, 1]], ["X", 0.2, [0]]]
+        assert resynthesize_two_qubit_blocks(circuit) == circuit
+
+    def test_blocks_on_overlapping_pairs(self):
+        """Tests that blocks are closed by gates acting on other pairs of wires."""
+        operations = [
+            qml.CNOT(wires=[0, 1]),
+            qml.CNOT(wires=[0, 1]),
+            qml.RX(0.1, wires=2),
+            qml.CNOT(wires=[1, 2]),
+            qml.RY(0.2, wires=1),
+            qml.CNOT(wires=[2, 1]),
+            qml.CNOT(wires=[0, 1]),
+        ]
+        circuit = translate(operations, WIRE_MAP)
+        res = resynthesize_two_qubit_blocks(circuit)
+
+        assert num_ms_gates(res) < num_ms_gates(circuit)
+        assert_equal_up_to_phase(circuit_matrix(res, [0, 1, 2]), circuit_matrix(circuit, [0, 1, 2]))
+
+
+class TestFuseSingleQubitGates:
+    """Tests for the ``fuse_single_qubit_gates`` function."""
+
+    def test_run_fused(self):
+        """Tests that a run of single-qubit gates is fused into at most an R and a Z gate."""
+        operations = [qml.Hadamard(0), qml.RX(0.3, wires=0), qml.RY(-0.2, wires=0), qml.S(0)]
+        circuit = translate(operations, WIRE_MAP)
+        res = fuse_single_qubit_gates(circuit)
+
+        assert len(res) <= 2
+        assert {gate[0] for gate in res} <= {"R", "Z"}
+        assert_equal_up_to_phase(circuit_matrix(res, [0]), circuit_matrix(circuit, [0]))
+
+    def test_identity_run_removed(self):
+        """Tests that runs multiplying to the identity are removed."""
+        circuit = [["X", 0.5, [0]], ["Y", 0.3, [0]], ["Y", -0.3, [0]], ["X", -0.5, [0]]]
+        assert fuse_single_qubit_gates(circuit) == []
+
+    def test_run_not_replaced_without_savings(self):
+        """Tests that runs are kept if fusing them does not save gates."""
+        circuit = [["X", 1.0, [0]], ["Y", -0.5, [0]], ["MS", 0.5, [0, 1]], ["Z", 0.2, [1]]]
+        assert fuse_single_qubit_gates(circuit) == circuit
+
+    def test_runs_separated_by_ms_gates(self):
+        """Tests that runs are not fused across MS gates acting on their wire."""
+        circuit = [
+            ["X", 0.3, [0]],
+            ["Y", 0.1, [0]],
+            ["X", 0.2, [2]],
+            ["MS", 0.5, [0, 1]],
+            ["X", 0.4, [0]],
+            ["Y", 0.2, [0]],
+            ["Z", 0.1, [0]],
+            ["Y", 0.7, [2]],
+            ["X", 0.1, [2]],
+            ["Y", 0.3, [2]],
+        ]
+        res = fuse_single_qubit_gates(circuit)
+
+        assert len(res) == 7
+        assert [gate[0] for gate in res].count("MS") == 1
+        assert_equal_up_to_phase(circuit_matrix(res, [0, 1, 2]), circuit_matrix(circuit, [0, 1, 2]))
@@ -0,0 +1,260 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the telemetry module"""
+import pytest
+
+import pennylane as qml
+import numpy as np
+
+import pennylane_aqt.device
+import pennylane_aqt.telemetry
+from pennylane_aqt.device import AQTDevice
+from pennylane_aqt.mock_server import MockAQTServer
+from pennylane_aqt.telemetry import JobHandle, LatencyHistory
+
+SOME_API_KEY = "ABC123"
+BACKEND = "https://gateway.aqt.eu/marmot/sim"
+
+
+def finished_job(num_gates, shots, queue_time, execution_time, backend=BACKEND):
+    """A handle of a finished job with the given durations."""
+    job = JobHandle("id", backend, num_gates, shots, submitted=100.0)
+    job.update("ongoing", timestamp=100.0 + queue_time)
+    job.update("finished", timestamp=100.0 + queue_time + execution_time)
+    return job
+
+
+class TestJobHandle:
+    """Tests for the ``JobHandle`` class."""
+
+    def test_durations(self):
+        """Tests that the queue and execution times follow the observed statuses."""
+        job = JobHandle("id", BACKEND, 3, 100, submitted=10.0)
+        assert job.queue_time is None and job.execution_time is None
+
+        job.update("queued", timestamp=11.0)
+        job.update("ongoing", timestamp=12.0)
+        job.update("ongoing", timestamp=13.0)
+        assert job.status == "ongoing"
+        assert job.queue_time == 2.0
+        assert job.execution_time is None
+
+        job.update("finished", timestamp=15.0)
+        assert job.execution_time == 3.0
+        assert job.eta == 15.0
+        assert job.remaining() == 0.0
+
+    def test_finished_without_ongoing(self):
+        """Tests that a job seen finished right after being queued has no execution time."""
+        job = JobHandle("id", BACKEND, 3, 100, submitted=10.0)
+        job.update("finished", timestamp=12.0)
+
+        assert job.queue_time == 2.0
+        assert job.execution_time == 0.0
+
+    def test_eta(self):
+        """Tests that the ETA is predicted from the submission, and is not delayed by a start
+        observed late."""
+        job = JobHandle("id", BACKEND, 3, 100, prediction=(5.0, 2.0), submitted=10.0)
+        assert job.predicted_start == 15.0
+        assert job.eta == 17.0
+
+        job.update("ongoing", timestamp=20.0)
+        assert job.eta == 17.0
+
+    def test_resolution(self):
+        """Tests that the resolution is the longest time between a query observing a change
+        and the previous query."""
+        job = JobHandle("id", BACKEND, 3, 100, submitted=10.0)
+        job.update("queued", timestamp=11.0)
+        job.update("ongoing", timestamp=11.5)
+        assert job.resolution == 0.5
+
+        job.update("ongoing", timestamp=20.0)
+        job.update("finished", timestamp=21.0)
+        assert job.resolution == 1.0
+
+        late = JobHandle("id", BACKEND, 3, 100, submitted=10.0)
+        late.update("finished", timestamp=30.0)
+        assert late.resolution == 20.0
+
+    def test_no_prediction(self):
+        """Tests that jobs without a prediction have no ETA."""
+        job = JobHandle("id", BACKEND, 3, 100)
+        assert job.eta is None
+        assert job.remaining() is None
+
+
+class TestLatencyHistory:
+    """Tests for the ``LatencyHistory`` class."""
+
+    def test_empty(self):
+        """Tests that no prediction is made without recorded jobs."""
+        assert LatencyHistory().predict(BACKEND, 3, 100) is None
+
+    def test_linear_execution_time(self):
+        """Tests that the execution time is fitted linearly in the number of gate applications,
+        and that the queue time is the median of the recent queue times."""
+        history = LatencyHistory()
+        for num_gates, shots, queue_time in [(1, 100, 1.0), (3, 100, 9.0), (1, 200, 2.0)]:
+            cost = shots * (num_gates + 1)
+            history.record(finished_job(num_gates, shots, queue_time, 0.5 + 1e-3 * cost))
+
+        queue_time, execution_time = history.predict(BACKEND, 4, 100)
+        assert queue_time == 2.0
+        assert np.isclose(execution_time, 1.0)
+
+    def test_single_cost(self):
+        """Tests that execution times of a single cost are scaled to other costs."""
+        history = LatencyHistory()
+        history.record(finished_job(1, 100, 0.0, 2.0))
+        history.record(finished_job(1, 100, 0.0, 4.0))
+
+        assert history.predict(BACKEND, 1, 100) == (0.0, 3.0)
+        assert history.predict(BACKEND, 3, 100) == (0.0, 6.0)
+
+    def test_imprecise_jobs_ignored(self):
+        """Tests that jobs observed less precisely than the given resolution are ignored."""
+        history = LatencyHistory()
+        precise = finished_job(1, 100, 1.0, 2.0)
+        late = JobHandle("id", BACKEND, 1, 100, submitted=100.0)
+        late.update("finished", timestamp=120.0)
+
+        history.record(precise, resolution=2.0)
+        history.record(late, resolution=2.0)
+        assert history.records(BACKEND) == [(1, 100, 1.0, 2.0)]
+
+    def test_rolling_per_backend(self):
+        """Tests that the history keeps the recent finished jobs of each backend."""
+        history = LatencyHistory(max_records=2)
+        for queue_time in [1.0, 2.0, 3.0]:
+            history.record(finished_job(1, 100, queue_time, 0.0))
+        history.record(finished_job(1, 100, 10.0, 0.0, backend="other"))
+        history.record(JobHandle("id", BACKEND, 1, 100))
+
+        assert [r[2] for r in history.records(BACKEND)] == [2.0, 3.0]
+        assert history.predict("other", 1, 100) == (10.0, 0.0)
+
+        history.clear(BACKEND)
+        assert history.predict(BACKEND, 1, 100) is None
+        history.clear()
+        assert history.records("other") == []
+
+
+class TestDevicePolling:
+    """Tests for the polling of jobs by AQT devices."""
+
+    @staticmethod
+    def count_queries(monkeypatch):
+        """Patch ``submit`` to count the queries of jobs, and return the counts."""
+        queries = []
+        submit = pennylane_aqt.device.submit
+
+        def counting_submit(method, url, request, headers, **kwargs):
+            if "data" not in request:
+                queries.append(request["id"])
+            return submit(method, url, request, headers, **kwargs)
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", counting_submit)
+        return queries
+
+    def test_predicted_polling(self, monkeypatch):
+        """Tests that jobs are polled at a fixed rate without history, and just before their
+        predicted completion with history."""
+        queries = self.count_queries(monkeypatch)
+        with MockAQTServer(latency=0.3, seed=1) as server:
+            monkeypatch.setattr(AQTDevice, "BASE_HOSTNAME", server.url)
+            dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY, retry_delay=0.05)
+            dev.latency_history = LatencyHistory()
+
+            dev.apply([qml.PauliX(wires=0)])
+            first = dev.jobs[-1]
+            assert first.eta == first.finished
+            assert len(queries) >= 5
+
+            queries.clear()
+            dev.reset()
+            dev.apply([qml.PauliX(wires=0)])
+
+        (record, _) = dev.latency_history.records(dev.hostname)
+        assert record[:2] == (1, 10)
+        assert 0.3 <= record[2] < 0.5
+
+        second = dev.jobs[-1]
+        assert second.prediction == pytest.approx((record[2], 0.0))
+        assert len(queries) <= 2
+        assert dev.samples == [1] * 10
+
+    def test_fake_clock(self, monkeypatch):
+        """Tests that many jobs in a row finish within a retry delay of their true
+        completion, and that the history records their true queue and execution times."""
+        clock = {"now": 1000.0}
+        # the queue time, and the execution time per shot, of the backend
+        backend = {"queue": 1.0, "per_shot": 0.01}
+        jobs = {}
+
+        def fake_sleep(seconds):
+            clock["now"] += seconds
+
+        def fake_submit(method, url, request, headers, compress=False):
+            now = clock["now"]
+            if "data" in request:
+                job_id = str(len(jobs))
+                start = now + backend["queue"]
+                jobs[job_id] = (start, start + backend["per_shot"] * request["repetitions"])
+            else:
+                job_id = request["id"]
+            start, end = jobs[job_id]
+            status = "queued" if now < start else "ongoing" if now < end else "finished"
+            job = {"id": job_id, "status": status, "samples": [0] * 10}
+            return type("Response", (), {"status_code": 200, "json": lambda self: job})()
+
+        monkeypatch.setattr(pennylane_aqt.device, "submit", fake_submit)
+        monkeypatch.setattr(pennylane_aqt.device, "sleep", fake_sleep)
+        monkeypatch.setattr(pennylane_aqt.device, "time", lambda: clock["now"])
+        monkeypatch.setattr(pennylane_aqt.telemetry.time, "time", lambda: clock["now"])
+
+        dev = AQTDevice(1, api_key=SOME_API_KEY, retry_delay=0.5)
+        dev.latency_history = LatencyHistory()
+
+        def run(shots):
+            submitted = clock["now"]
+            dev._submit_job("[]", [0], 0, shots)
+            return clock["now"] - submitted
+
+        durations = [run(1000) for _ in range(20)]
+        assert all(10.0 < d <= 11.5 for d in durations)
+        # the predicted jobs are polled around their start, and just before their completion
+        assert durations[1:] == pytest.approx([11.0] * 19)
+
+        records = dev.latency_history.records(dev.hostname)
+        assert len(records) == 20
+        assert all(1.0 <= r[2] <= 1.5 and 9.5 <= r[3] <= 10.5 for r in records)
+
+        # faster jobs of fewer shots are predicted from the same history
+        backend["queue"] = 0.1
+        durations = [run(100) for _ in range(20)]
+        assert all(1.1 <= d <= 2.1 for d in durations)
+
+    def test_jobs(self, aqt_server):
+        """Tests that the handles of the recent jobs are kept."""
+        dev = AQTDevice(2, shots=10, api_key=SOME_API_KEY)
+        for _ in range(3):
+            dev.reset()
+            dev.apply([qml.PauliX(wires=1)])
+
+        assert len(dev.jobs) == 3
+        assert all(job.status == "finished" for job in dev.jobs)
+        assert [job.shots for job in dev.jobs] == [10] * 3
+        assert len({job.id for job in dev.jobs}) == 3